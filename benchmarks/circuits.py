@@ -0,0 +1,284 @@
+"""Parameterized circuits for the benchmarks, generated without Qt.
+
+Every generator returns a Bench: the circuit plus its input switches and
+output bulbs, least significant bit first. Nodes get grid positions and
+``circuit.wires`` entries as if the circuit had been loaded from a file,
+so generated circuits can also be saved and drawn.
+
+    ripple_adder(bits)          full adders chained through their carries
+    cla_adder(bits, block)      carry-lookahead within blocks, rippled between
+    array_multiplier(bits)      AND partial products summed by adder rows
+    ring_oscillator(stages)     NOT gates in a loop gated by EN; never settles
+    not_chain(length)           one switch through ``length`` inverters
+    nested_ic(depth, copies)    ICs built from ICs, ``depth`` levels deep
+    random_dag(gates, ...)      random 1- and 2-input gates, seeded
+"""
+import json
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model import chips
+from src.model.chips import ChipRegistry
+from src.model.circuit import Circuit
+from src.model.gates import (AndGate, CustomGate, InputSwitch, NandGate,
+                             NorGate, NotGate, OrGate, OutputBulb, XorGate)
+from src.model.serializer import CircuitSerializer
+
+# Layout pitch of generated circuits, in scene units.
+PITCH_X = 120
+PITCH_Y = 80
+
+NESTED_CHIP = "bench_nest"
+
+
+class Bench:
+    def __init__(self, name: str):
+        self.name = name
+        self.circuit = Circuit()
+        self.inputs = []
+        self.outputs = []
+
+    def node(self, node, col: float, row: float):
+        node.position = (col * PITCH_X, row * PITCH_Y)
+        self.circuit.add_node(node)
+        return node
+
+    def wire(self, source, target):
+        self.circuit.connect(source, target)
+        self.circuit.wires.append({"from": source, "to": target, "points": []})
+
+    def gate(self, node, sources, col: float, row: float):
+        """Add ``node`` fed by the output pins ``sources``; returns its first output."""
+        self.node(node, col, row)
+        for source, pin in zip(sources, node.inputs):
+            self.wire(source, pin)
+        return node.outputs[0]
+
+    def switch(self, name: str, row: float):
+        node = self.node(InputSwitch(), 0, row)
+        node.name = name
+        self.inputs.append(node)
+        return node.outputs[0]
+
+    def bulb(self, name: str, source, col: float, row: float):
+        node = self.node(OutputBulb(), col, row)
+        node.name = name
+        self.wire(source, node.inputs[0])
+        self.outputs.append(node)
+
+
+def node_count(circuit: Circuit) -> int:
+    """Nodes in ``circuit`` including everything inside its ICs."""
+    total = 0
+    for node in circuit.nodes:
+        total += 1
+        if isinstance(node, CustomGate):
+            total += node_count(node.internal_circuit)
+    return total
+
+
+def _half_adder(bench, a, b, col, row):
+    s = bench.gate(XorGate(), (a, b), col, row)
+    c = bench.gate(AndGate(), (a, b), col, row + 1)
+    return s, c
+
+
+def _full_adder(bench, a, b, cin, col, row):
+    p = bench.gate(XorGate(), (a, b), col, row)
+    g = bench.gate(AndGate(), (a, b), col, row + 1)
+    s = bench.gate(XorGate(), (p, cin), col + 1, row)
+    t = bench.gate(AndGate(), (p, cin), col + 1, row + 1)
+    cout = bench.gate(OrGate(), (g, t), col + 2, row + 1)
+    return s, cout
+
+
+def ripple_adder(bits: int) -> Bench:
+    """``bits``-wide ripple-carry adder. Inputs A0.., B0.., Cin; outputs S0.., Cout."""
+    bench = Bench(f"ripple_adder_{bits}")
+    a = [bench.switch(f"A{i}", 3 * i) for i in range(bits)]
+    b = [bench.switch(f"B{i}", 3 * i + 1) for i in range(bits)]
+    carry = bench.switch("Cin", 3 * bits)
+    for i in range(bits):
+        s, carry = _full_adder(bench, a[i], b[i], carry, 1 + i, 3 * i)
+        bench.bulb(f"S{i}", s, bits + 4, 3 * i)
+    bench.bulb("Cout", carry, bits + 4, 3 * bits)
+    return bench
+
+
+def cla_adder(bits: int, block: int = 4) -> Bench:
+    """Carry-lookahead adder: each ``block`` bits compute their carries in
+    two gate levels from the block's carry-in, and blocks ripple. Same
+    pins as ripple_adder."""
+    bench = Bench(f"cla_adder_{bits}")
+    a = [bench.switch(f"A{i}", 3 * i) for i in range(bits)]
+    b = [bench.switch(f"B{i}", 3 * i + 1) for i in range(bits)]
+    carry = bench.switch("Cin", 3 * bits)
+    p = [bench.gate(XorGate(), (a[i], b[i]), 1, 3 * i) for i in range(bits)]
+    g = [bench.gate(AndGate(), (a[i], b[i]), 1, 3 * i + 1) for i in range(bits)]
+    for k in range(0, bits, block):
+        carries = [carry]
+        col = 2 + k // block * 3
+        for j in range(k, min(k + block, bits)):
+            # c[j+1] = g[j] | p[j]g[j-1] | ... | p[j]..p[k]c[k]
+            terms = [g[j]]
+            for m in range(j - 1, k - 1, -1):
+                sources = p[m + 1:j + 1] + [g[m]]
+                terms.append(bench.gate(AndGate(len(sources)), sources, col, 3 * j + 2))
+            sources = p[k:j + 1] + [carry]
+            terms.append(bench.gate(AndGate(len(sources)), sources, col, 3 * j + 2))
+            carries.append(bench.gate(OrGate(len(terms)), terms, col + 1, 3 * j + 2))
+        for j in range(k, min(k + block, bits)):
+            s = bench.gate(XorGate(), (p[j], carries[j - k]), col + 2, 3 * j)
+            bench.bulb(f"S{j}", s, bits // block * 3 + 6, 3 * j)
+        carry = carries[-1]
+    bench.bulb("Cout", carry, bits // block * 3 + 6, 3 * bits)
+    return bench
+
+
+def _add_rows(bench, x, y, col, row):
+    """Sum two little-endian bit lists; one bit longer than the longer one."""
+    out = []
+    carry = None
+    for k in range(max(len(x), len(y))):
+        bits = [v for v in (x[k] if k < len(x) else None, y[k] if k < len(y) else None, carry) if v is not None]
+        if len(bits) == 1:
+            out.append(bits[0])
+            carry = None
+        elif len(bits) == 2:
+            s, carry = _half_adder(bench, bits[0], bits[1], col + k, row)
+            out.append(s)
+        else:
+            s, carry = _full_adder(bench, bits[0], bits[1], bits[2], col + k, row)
+            out.append(s)
+    if carry is not None:
+        out.append(carry)
+    return out
+
+
+def array_multiplier(bits: int) -> Bench:
+    """Unsigned ``bits`` x ``bits`` array multiplier. Inputs A0.., B0..;
+    outputs P0..P(2*bits-1)."""
+    bench = Bench(f"array_multiplier_{bits}")
+    a = [bench.switch(f"A{i}", i) for i in range(bits)]
+    b = [bench.switch(f"B{i}", bits + i) for i in range(bits)]
+
+    def row_of(i):
+        return [bench.gate(AndGate(), (a[j], b[i]), 1 + j, 4 * i) for j in range(bits)]
+
+    product = []
+    acc = row_of(0)
+    for i in range(1, bits):
+        product.append(acc[0])
+        acc = _add_rows(bench, acc[1:], row_of(i), 1, 4 * i + 1)
+    product.extend(acc)
+    for k, bit in enumerate(product[:2 * bits]):
+        bench.bulb(f"P{k}", bit, 3 * bits + 6, 2 * k)
+    return bench
+
+
+def ring_oscillator(stages: int) -> Bench:
+    """Loop of an odd number of NOT gates closed through AND(EN, loop).
+
+    Nets start UNDEFINED, so drive EN LOW first to settle the loop; it
+    then oscillates for as long as EN is HIGH.
+    """
+    stages |= 1
+    bench = Bench(f"ring_oscillator_{stages}")
+    enable = bench.switch("EN", 0)
+    gate = AndGate()
+    bench.node(gate, 1, 0)
+    bench.wire(enable, gate.inputs[0])
+    out = gate.outputs[0]
+    for k in range(stages):
+        out = bench.gate(NotGate(), (out,), 2 + k % 32, k // 32)
+    bench.wire(out, gate.inputs[1])
+    bench.bulb("Q", out, 35, 0)
+    return bench
+
+
+def not_chain(length: int) -> Bench:
+    """Switch IN through ``length`` inverters to bulb OUT."""
+    bench = Bench(f"not_chain_{length}")
+    out = bench.switch("IN", 0)
+    for k in range(length):
+        out = bench.gate(NotGate(), (out,), 1 + k % 64, k // 64)
+    bench.bulb("OUT", out, 66, 0)
+    return bench
+
+
+def use_library(path: str):
+    """Read and write IC definitions in ``path`` instead of the user's library."""
+    os.makedirs(path, exist_ok=True)
+    chips.LIBRARY_PATH = path
+    ChipRegistry.invalidate()
+
+
+def _save_chip(name: str, bench: Bench):
+    data = CircuitSerializer.serialize(bench.circuit)
+    data["input_names"] = sorted(node.name for node in bench.inputs)
+    data["output_names"] = sorted(node.name for node in bench.outputs)
+    with open(ChipRegistry.path_for(name), "w") as f:
+        json.dump(data, f)
+    ChipRegistry.invalidate(name)
+
+
+def nested_ic(depth: int, copies: int) -> Bench:
+    """``copies`` instances of an IC nested ``depth`` levels deep.
+
+    Level 0 is a half adder; level ``k`` feeds one level ``k-1`` IC into
+    another, so the top IC holds ``2**depth`` half adders. The chips are
+    written to the current library folder; call use_library first.
+    """
+    for level in range(depth + 1):
+        inner = Bench(f"{NESTED_CHIP}{level}")
+        x, y = inner.switch("In1", 0), inner.switch("In2", 1)
+        if level == 0:
+            s, c = _half_adder(inner, x, y, 1, 0)
+        else:
+            chip = f"{NESTED_CHIP}{level - 1}"
+            first = CustomGate(chip, definition=ChipRegistry.load(chip))
+            second = CustomGate(chip, definition=ChipRegistry.load(chip))
+            inner.gate(first, (x, y), 1, 0)
+            inner.gate(second, first.outputs, 2, 0)
+            s, c = second.outputs
+        inner.bulb("Out1", s, 3, 0)
+        inner.bulb("Out2", c, 3, 1)
+        _save_chip(f"{NESTED_CHIP}{level}", inner)
+
+    bench = Bench(f"nested_ic_{depth}x{copies}")
+    chip = f"{NESTED_CHIP}{depth}"
+    definition = ChipRegistry.load(chip)
+    for k in range(copies):
+        x, y = bench.switch(f"X{k}", 2 * k), bench.switch(f"Y{k}", 2 * k + 1)
+        node = CustomGate(chip, definition=definition)
+        bench.gate(node, (x, y), 1, 2 * k)
+        bench.bulb(f"S{k}", node.outputs[0], 2, 2 * k)
+        bench.bulb(f"C{k}", node.outputs[1], 2, 2 * k + 1)
+    return bench
+
+
+def random_dag(gates: int, inputs: int = 16, outputs: int = 16, window: int = 64, seed: int = 1) -> Bench:
+    """``gates`` random gates, each reading signals from the previous
+    ``window`` gates or switches, so the logic depth grows with size.
+    The last ``outputs`` gates drive bulbs."""
+    rng = random.Random(seed)
+    bench = Bench(f"random_dag_{gates}")
+    signals = [bench.switch(f"I{k}", k) for k in range(inputs)]
+    depth = [0] * inputs
+    rows = {}
+    kinds = (AndGate, OrGate, XorGate, NandGate, NorGate, NotGate)
+    for _ in range(gates):
+        node = rng.choice(kinds)()
+        picks = [rng.randrange(max(0, len(signals) - window), len(signals)) for _ in node.inputs]
+        level = 1 + max(depth[k] for k in picks)
+        row = rows.get(level, 0)
+        rows[level] = row + 1
+        signals.append(bench.gate(node, [signals[k] for k in picks], level, row))
+        depth.append(level)
+    last = max(depth) + 1
+    for k, signal in enumerate(signals[-outputs:]):
+        bench.bulb(f"O{k}", signal, last, k)
+    return bench
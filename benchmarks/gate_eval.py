@@ -0,0 +1,255 @@
+"""Per-gate evaluation cost of every built-in gate type.
+
+Usage:
+    python benchmarks/gate_eval.py [--number N] [--json out.json]
+
+Each gate is wired to switches in a one-gate circuit and evaluated over
+all of its input combinations (LOW/HIGH/UNDEFINED) four ways:
+
+    baseline the compute() each gate had before compiled netlists, on
+             LogicState pins (copied below, since the gates now share
+             table-driven code)
+    kernel   CompiledNetlist.evaluate as it was before truth tables: the
+             branchy reference kernel on a list of input values
+    table    CompiledNetlist.evaluate, one lookup by packed input word
+    compute  Node.compute() on the pin objects
+
+Times are nanoseconds per evaluation; speedups are of the table path over
+the baseline and over the kernel. Gates wider than MAX_TABLE_INPUTS have
+no table and run their kernel on both paths; they are listed with their
+input count. Baseline gates had fixed input counts, so the wider
+variants have no baseline.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model.circuit import Circuit
+from src.model.gates import (AndGate, InputSwitch, NandGate, NorGate, NotGate,
+                             OrGate, SevenSegmentDecoder, SevenSegmentDisplay,
+                             TriStateBuffer, XorGate)
+from src.model.logic import SEGMENTS, STATES
+from src.model.node import LogicState
+from src.simulation.netlist import KERNELS, CompiledNetlist
+
+# The baseline gates' compute() bodies, called with the gate as ``self``.
+
+def _base_and(self):
+    all_high = True
+    for pin in self.inputs:
+        if pin.value == LogicState.UNDEFINED:
+            self.outputs[0].set_value(LogicState.LOW)
+
+        if pin.value == LogicState.LOW:
+            all_high = False
+
+    result = LogicState.HIGH if all_high else LogicState.LOW
+
+    self.outputs[0].set_value(result)
+
+
+def _base_or(self):
+    any_high = False
+    for pin in self.inputs:
+        if pin.value == LogicState.HIGH:
+            any_high = True
+        elif pin.value == LogicState.UNDEFINED:
+            self.outputs[0].set_value(LogicState.LOW)
+
+    result = LogicState.HIGH if any_high else LogicState.LOW
+    self.outputs[0].set_value(result)
+
+
+def _base_xor(self):
+    vals = [p.value for p in self.inputs]
+    if LogicState.UNDEFINED in vals:
+        self.outputs[0].set_value(LogicState.UNDEFINED)
+        return
+    a = 1 if vals[0] == LogicState.HIGH else 0
+    b = 1 if vals[1] == LogicState.HIGH else 0
+    res = a ^ b
+    self.outputs[0].set_value(LogicState.HIGH if res == 1 else LogicState.LOW)
+
+
+def _base_nand(self):
+    vals = [p.value for p in self.inputs]
+    if LogicState.UNDEFINED in vals:
+        self.outputs[0].set_value(LogicState.UNDEFINED)
+        return
+    res = all(v == LogicState.HIGH for v in vals)
+    self.outputs[0].set_value(LogicState.LOW if res else LogicState.HIGH)
+
+
+def _base_nor(self):
+    vals = [p.value for p in self.inputs]
+    if LogicState.UNDEFINED in vals:
+        self.outputs[0].set_value(LogicState.UNDEFINED)
+        return
+    res = any(v == LogicState.HIGH for v in vals)
+    self.outputs[0].set_value(LogicState.LOW if res else LogicState.HIGH)
+
+
+def _base_not(self):
+    inp = self.inputs[0].value
+    if inp == LogicState.HIGH:
+        self.outputs[0].set_value(LogicState.LOW)
+    elif inp == LogicState.LOW:
+        self.outputs[0].set_value(LogicState.HIGH)
+    else:
+        self.outputs[0].set_value(LogicState.HIGH)
+
+
+def _base_bufz(self):
+    d = self.inputs[0].value
+    en = self.inputs[1].value
+    if en == LogicState.UNDEFINED or d == LogicState.UNDEFINED:
+        self.outputs[0].set_value(LogicState.UNDEFINED)
+        return
+    if en == LogicState.HIGH:
+        self.outputs[0].set_value(LogicState.HIGH if d == LogicState.HIGH else LogicState.LOW)
+    else:
+        self.outputs[0].set_value(LogicState.UNDEFINED)
+
+
+def _base_7seg(self):
+    on = any(p.value == LogicState.HIGH for p in self.inputs)
+    self.outputs[0].set_value(LogicState.HIGH if on else LogicState.LOW)
+
+
+def _base_7dec(self):
+    vals = [pin.value for pin in self.inputs]
+    if any(v == LogicState.UNDEFINED for v in vals):
+        for o in self.outputs:
+            o.set_value(LogicState.UNDEFINED)
+        return
+    b0 = 1 if vals[0] == LogicState.HIGH else 0
+    b1 = 1 if vals[1] == LogicState.HIGH else 0
+    b2 = 1 if vals[2] == LogicState.HIGH else 0
+    b3 = 1 if vals[3] == LogicState.HIGH else 0
+    n = (b3 << 3) | (b2 << 2) | (b1 << 1) | b0
+    table = dict(SEGMENTS)
+    segs = table.get(n, (0, 0, 0, 0, 0, 0, 0))
+    for i, val in enumerate(segs):
+        self.outputs[i].set_value(LogicState.HIGH if val == 1 else LogicState.LOW)
+
+
+# (name, factory, baseline compute or None)
+GATES = (
+    ("AndGate", AndGate, _base_and),
+    ("OrGate", OrGate, _base_or),
+    ("XorGate", XorGate, _base_xor),
+    ("NandGate", NandGate, _base_nand),
+    ("NorGate", NorGate, _base_nor),
+    ("NotGate", NotGate, _base_not),
+    ("TriStateBuffer", TriStateBuffer, _base_bufz),
+    ("SevenSegmentDisplay", SevenSegmentDisplay, _base_7seg),
+    ("SevenSegmentDecoder", SevenSegmentDecoder, _base_7dec),
+    ("AndGate/6", lambda: AndGate(6), None),
+    ("AndGate/8", lambda: AndGate(8), None),
+    ("OrGate/32", lambda: OrGate(32), None),
+    ("XorGate/32", lambda: XorGate(32), None),
+    ("NorGate/64", lambda: NorGate(64), None),
+)
+
+def kernel_evaluate(netlist, i):
+    values = netlist.net_values
+    a, b = netlist.in_offsets[i], netlist.in_offsets[i + 1]
+    return KERNELS[netlist.type_codes[i]]([values[n] for n in netlist.in_nets[a:b]])
+
+
+# Input vectors timed per gate.
+SAMPLES = 81
+
+
+def _setup(factory):
+    circuit = Circuit()
+    gate = factory()
+    circuit.add_node(gate)
+    switches = []
+    for pin in gate.inputs:
+        switch = InputSwitch()
+        circuit.add_node(switch)
+        circuit.connect(switch.outputs[0], pin)
+        switches.append(switch)
+    netlist = CompiledNetlist.compile(circuit)
+    index = netlist.index_of(gate)
+    nets = netlist.node_inputs[index]
+    if 3 ** len(nets) <= SAMPLES:
+        combos = list(itertools.product(range(3), repeat=len(nets)))
+    else:
+        rng = random.Random(len(nets))
+        combos = [tuple(rng.choice((0, 1, 1, 1, 2)) for _ in nets) for _ in range(SAMPLES)]
+    return gate, netlist, index, nets, combos
+
+
+def measure(factory, number: int, baseline=None) -> dict:
+    gate, netlist, index, nets, combos = _setup(factory)
+    values = netlist.net_values
+    evaluate = netlist.evaluate
+
+    def apply(combo):
+        for n, v in zip(nets, combo):
+            values[n] = v
+        for pin, v in zip(gate.inputs, combo):
+            pin.value = STATES[v]
+
+    def run_kernel():
+        kernel_evaluate(netlist, index)
+
+    def run_table():
+        evaluate(index)
+
+    def run_baseline():
+        baseline(gate)
+
+    result = {"inputs": len(nets), "baseline": None}
+    runs = [("kernel", run_kernel), ("table", run_table), ("compute", gate.compute)]
+    if baseline is not None:
+        runs.insert(0, ("baseline", run_baseline))
+    for name, fn in runs:
+        # Warm up so lazily built tables are not timed.
+        apply(combos[0])
+        fn()
+        total = 0.0
+        for combo in combos:
+            apply(combo)
+            total += timeit.timeit(fn, number=number)
+        result[name] = total / (number * len(combos)) * 1e9
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time one evaluation of each built-in gate.")
+    parser.add_argument("--number", type=int, default=20000, help="evaluations per input combination")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(
+        f"{'gate':<22}{'inputs':>7}{'baseline ns':>13}{'kernel ns':>11}{'table ns':>10}"
+        f"{'vs base':>9}{'vs kernel':>11}{'compute ns':>12}"
+    )
+    for name, factory, baseline in GATES:
+        r = measure(factory, args.number, baseline)
+        results[name] = r
+        if r["baseline"] is None:
+            base, speedup = f"{'-':>13}", f"{'-':>9}"
+        else:
+            base, speedup = f"{r['baseline']:>13.1f}", f"{r['baseline'] / r['table']:>8.2f}x"
+        print(
+            f"{name:<22}{r['inputs']:>7}{base}{r['kernel']:>11.1f}{r['table']:>10.1f}"
+            f"{speedup}{r['kernel'] / r['table']:>10.2f}x{r['compute']:>12.1f}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
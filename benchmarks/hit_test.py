@@ -0,0 +1,115 @@
+"""Hit-test latency against scene size.
+
+Usage:
+    python benchmarks/hit_test.py [--sizes 1000 5000 20000] [--queries N] [--json out.json]
+
+Fills an offscreen LogicScene with a grid of 2-input gates and times,
+per query, in microseconds:
+
+    port_index   LogicScene._find_port_near through the port spatial hash
+    port_scan    the previous lookup: QGraphicsScene.items(rect) over the
+                 whole unindexed scene, filtered to PortItems
+    band_index   LogicScene.items_in_rect for a 400x300 rubber band
+    band_scan    QGraphicsScene.items(rect) for the same band
+    move         moving one gate, which re-files it and its ports
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QPointF, QRectF
+from PySide6.QtWidgets import QApplication
+
+from src.graphics.items.base import GateItem
+from src.graphics.items.port import PortItem
+from src.graphics.scene import LogicScene
+from src.model.gates import AndGate
+
+PITCH = 120
+
+
+def build(size: int):
+    scene = LogicScene()
+    side = int(size ** 0.5) + 1
+    gates = []
+    for k in range(size):
+        item = GateItem(AndGate())
+        item.setPos((k % side) * PITCH, (k // side) * PITCH)
+        scene.addItem(item)
+        gates.append(item)
+    return scene, gates, side * PITCH
+
+
+def _time(fn, args) -> float:
+    start = time.perf_counter()
+    for a in args:
+        fn(*a)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def measure(size: int, queries: int) -> dict:
+    scene, gates, extent = build(size)
+    rng = random.Random(size)
+    ports = [p for g in gates for p in g.input_ports + g.output_ports]
+    # Half the probes land on a port, half on empty canvas.
+    points = []
+    for k in range(queries):
+        if k % 2:
+            p = rng.choice(ports).get_scene_pos()
+            points.append((QPointF(p.x() + rng.uniform(-4, 4), p.y() + rng.uniform(-4, 4)),))
+        else:
+            points.append((QPointF(rng.uniform(0, extent), rng.uniform(0, extent)),))
+    bands = [
+        (QRectF(rng.uniform(0, extent), rng.uniform(0, extent), 400, 300),)
+        for _ in range(max(1, queries // 10))
+    ]
+
+    def port_scan(pos, radius=8.0):
+        rect = QRectF(pos.x() - radius, pos.y() - radius, radius * 2, radius * 2)
+        return [it for it in scene.items(rect) if isinstance(it, PortItem)]
+
+    moves = [(rng.choice(gates), QPointF(rng.uniform(0, extent), rng.uniform(0, extent))) for _ in range(queries)]
+    result = {
+        "gates": size,
+        "ports": len(ports),
+        "port_index": _time(scene._find_port_near, points),
+        "port_scan": _time(port_scan, points),
+        "band_index": _time(scene.items_in_rect, bands),
+        "band_scan": _time(scene.items, bands),
+        "move": _time(lambda g, pos: g.setPos(pos), moves),
+    }
+    scene.clear()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time port hit-tests and band queries by scene size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000], help="gate counts")
+    parser.add_argument("--queries", type=int, default=200, help="queries per measurement")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication([])
+    results = []
+    print(f"{'gates':>7}{'ports':>8}{'port idx us':>13}{'port scan us':>14}{'band idx us':>13}{'band scan us':>14}{'move us':>9}")
+    for size in args.sizes:
+        r = measure(size, args.queries)
+        results.append(r)
+        print(
+            f"{r['gates']:>7}{r['ports']:>8}{r['port_index']:>13.1f}{r['port_scan']:>14.1f}"
+            f"{r['band_index']:>13.1f}{r['band_scan']:>14.1f}{r['move']:>9.1f}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Engine, serializer and renderer benchmarks on generated circuits.
+
+Usage:
+    python benchmarks/suite.py [--quick] [--only NAME ...] [--engines event,cycle]
+                               [--no-render] [--json out.json] [--compare old.json]
+
+For each circuit from circuits.py this measures:
+
+    build_ms         generating the circuit
+    bytes_per_node   memory held by the model, per node (ICs counted inside)
+    netlist_bytes_per_node   memory of the event engine's compiled netlist
+    save_ms/load_ms  CircuitSerializer.serialize + json.dumps, and back
+    <engine>         per engine: events/sec over random input toggles and
+                     the median and worst time to settle after one; the
+                     ring oscillator never settles and reports events/sec
+                     and simulated time per second over a fixed wall time
+    render           offscreen CPU frame time of the whole circuit fitted
+                     to a 1280x800 view, and at 1:1 zoom
+
+Seeds are fixed, so results differ between commits only through the code
+(and the machine). Write them with --json and pass an earlier file to
+--compare to print the ratio of every number to it.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuits import (array_multiplier, cla_adder, nested_ic, node_count,
+                      not_chain, random_dag, ring_oscillator, ripple_adder,
+                      use_library)
+
+from src.model.circuit import Circuit
+from src.model.node import LogicState
+from src.model.serializer import CircuitSerializer
+from src.simulation.engine import ENGINE_KINDS, create_engine
+from src.simulation.netlist import CompiledNetlist
+
+CASES = {
+    "full": (
+        ("ripple_adder_32", lambda: ripple_adder(32)),
+        ("cla_adder_32", lambda: cla_adder(32)),
+        ("array_multiplier_8", lambda: array_multiplier(8)),
+        ("ring_oscillator_101", lambda: ring_oscillator(101)),
+        ("not_chain_2000", lambda: not_chain(2000)),
+        ("nested_ic_4x16", lambda: nested_ic(4, 16)),
+        ("random_dag_5000", lambda: random_dag(5000)),
+    ),
+    "quick": (
+        ("ripple_adder_8", lambda: ripple_adder(8)),
+        ("cla_adder_8", lambda: cla_adder(8)),
+        ("array_multiplier_4", lambda: array_multiplier(4)),
+        ("ring_oscillator_11", lambda: ring_oscillator(11)),
+        ("not_chain_200", lambda: not_chain(200)),
+        ("nested_ic_2x4", lambda: nested_ic(2, 4)),
+        ("random_dag_500", lambda: random_dag(500)),
+    ),
+}
+
+# Random input toggles timed per circuit and engine.
+TOGGLES = 200
+# Wall time the ring oscillator runs per engine, in seconds.
+OSCILLATE_SECONDS = 1.0
+# Steps after which a toggle is reported as not settling.
+MAX_STEPS = 1_000_000
+RENDER_FRAMES = 20
+RENDER_SIZE = (1280, 800)
+
+
+def _set(switch, high: bool):
+    switch.state = LogicState.HIGH if high else LogicState.LOW
+
+
+def _settle(engine) -> int:
+    steps = 0
+    while engine.step():
+        steps += 1
+        if steps >= MAX_STEPS:
+            break
+    return steps
+
+
+def measure_memory(factory) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    bench = factory()
+    model = tracemalloc.get_traced_memory()[0]
+    netlist = CompiledNetlist.compile(bench.circuit)
+    compiled = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    nodes = node_count(bench.circuit)
+    del netlist
+    return {
+        "bytes_per_node": model / nodes,
+        "netlist_bytes_per_node": (compiled - model) / nodes,
+    }
+
+
+def measure_save_load(bench) -> dict:
+    start = time.perf_counter()
+    text = json.dumps(CircuitSerializer.serialize(bench.circuit))
+    saved = time.perf_counter()
+    CircuitSerializer.load_model(json.loads(text), Circuit())
+    loaded = time.perf_counter()
+    return {
+        "save_ms": (saved - start) * 1e3,
+        "load_ms": (loaded - saved) * 1e3,
+        "file_bytes": len(text),
+    }
+
+
+def measure_engine(bench, kind: str, toggles: int) -> dict:
+    engine = create_engine(bench.circuit, kind)
+    oscillator = bench.name.startswith("ring_oscillator")
+    for switch in bench.inputs:
+        _set(switch, False)
+        engine.trigger_update(switch)
+    _settle(engine)
+    stats = engine.stats
+
+    if oscillator:
+        _set(bench.inputs[0], True)
+        engine.trigger_update(bench.inputs[0])
+        events, t0 = stats.events, engine.simulation_time
+        start = time.perf_counter()
+        end = start + OSCILLATE_SECONDS
+        while time.perf_counter() < end:
+            for _ in range(1000):
+                engine.step()
+        elapsed = time.perf_counter() - start
+        return {
+            "events_per_second": (stats.events - events) / elapsed,
+            "sim_time_per_second": (engine.simulation_time - t0) / elapsed,
+        }
+
+    rng = random.Random(len(bench.inputs))
+    settle = []
+    events = stats.events
+    unsettled = 0
+    for _ in range(toggles):
+        switch = rng.choice(bench.inputs)
+        start = time.perf_counter()
+        switch.toggle()
+        engine.trigger_update(switch)
+        if _settle(engine) >= MAX_STEPS:
+            unsettled += 1
+        settle.append(time.perf_counter() - start)
+    total = sum(settle)
+    result = {
+        "events_per_second": (stats.events - events) / total if total else 0.0,
+        "events_per_toggle": (stats.events - events) / toggles,
+        "settle_ms_median": statistics.median(settle) * 1e3,
+        "settle_ms_max": max(settle) * 1e3,
+    }
+    if unsettled:
+        result["unsettled"] = unsettled
+    return result
+
+
+_app = None
+
+
+def measure_render(bench) -> dict:
+    """Median offscreen frame time; None if Qt cannot be started."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+
+        from src.graphics.scene import LogicScene
+        from src.graphics.view import LogicView
+    except ImportError as e:
+        print(f"Render benchmark unavailable: {e}")
+        return None
+    if _app is None:
+        _app = QApplication.instance() or QApplication([])
+
+    scene = LogicScene()
+    view = LogicView(scene)
+    view.set_backend("CPU")
+    view.resize(*RENDER_SIZE)
+    CircuitSerializer.attach_graphics(bench.circuit, scene)
+    view.show()
+    _app.processEvents()
+
+    def frames():
+        view.grab()
+        times = []
+        for _ in range(RENDER_FRAMES):
+            start = time.perf_counter()
+            view.grab()
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1e3
+
+    bounds = scene.itemsBoundingRect()
+    view.fitInView(bounds)
+    fit = frames()
+    view.resetTransform()
+    view.centerOn(bounds.center())
+    one = frames()
+    items = len(scene.items())
+    view.close()
+    scene.clear()
+    view.deleteLater()
+    scene.deleteLater()
+    _app.processEvents()
+    return {"fit_frame_ms": fit, "frame_ms": one, "items": items}
+
+
+def run_case(name, factory, engines, toggles, render) -> dict:
+    start = time.perf_counter()
+    bench = factory()
+    result = {
+        "nodes": node_count(bench.circuit),
+        "build_ms": (time.perf_counter() - start) * 1e3,
+    }
+    result.update(measure_memory(factory))
+    result.update(measure_save_load(bench))
+    for kind in engines:
+        result[kind] = measure_engine(factory(), kind, toggles)
+    if render:
+        result["render"] = measure_render(bench)
+    return result
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+
+def compare(results: dict, baseline: dict):
+    """Print each number next to the same number in ``baseline``."""
+    old = dict(_flatten(baseline.get("results", {})))
+    print(f"\n{'metric':<52}{'before':>14}{'after':>14}{'ratio':>9}")
+    for key, value in _flatten(results):
+        before = old.get(key)
+        if before is None:
+            continue
+        ratio = f"{value / before:>8.2f}x" if before else f"{'-':>9}"
+        print(f"{key:<52}{before:>14.3f}{value:>14.3f}{ratio}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the engines, serializer and renderer.")
+    parser.add_argument("--quick", action="store_true", help="small circuits and fewer toggles")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run only cases whose name starts with NAME")
+    parser.add_argument("--engines", default=",".join(ENGINE_KINDS), help="comma-separated engine kinds")
+    parser.add_argument("--no-render", action="store_true", help="skip the offscreen render benchmark")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="earlier --json output to compare against")
+    args = parser.parse_args(argv)
+
+    engines = [kind for kind in args.engines.split(",") if kind]
+    for kind in engines:
+        if kind not in ENGINE_KINDS:
+            parser.error(f"unknown engine: {kind}")
+    toggles = TOGGLES // 4 if args.quick else TOGGLES
+    cases = CASES["quick" if args.quick else "full"]
+    if args.only:
+        cases = [(name, f) for name, f in cases if any(name.startswith(o) for o in args.only)]
+
+    # Nested-IC chips go to a scratch library, not the user's.
+    use_library(tempfile.mkdtemp(prefix="bench_chips_"))
+
+    results = {}
+    for name, factory in cases:
+        print(f"{name} ...", flush=True)
+        r = run_case(name, factory, engines, toggles, not args.no_render)
+        results[name] = r
+        print(
+            f"  nodes {r['nodes']}  build {r['build_ms']:.1f} ms  {r['bytes_per_node']:.0f} B/node"
+            f" (+{r['netlist_bytes_per_node']:.0f} netlist)  save {r['save_ms']:.1f} ms  load {r['load_ms']:.1f} ms"
+        )
+        for kind in engines:
+            e = r[kind]
+            if "settle_ms_median" in e:
+                print(
+                    f"  {kind:<10} {e['events_per_second']:>12,.0f} events/s  settle"
+                    f" {e['settle_ms_median']:.3f} ms median, {e['settle_ms_max']:.3f} ms max"
+                )
+            else:
+                print(
+                    f"  {kind:<10} {e['events_per_second']:>12,.0f} events/s"
+                    f"  {e['sim_time_per_second']:,.0f} time units/s"
+                )
+        if r.get("render"):
+            print(f"  render     {r['render']['fit_frame_ms']:.2f} ms fitted, {r['render']['frame_ms']:.2f} ms at 1:1")
+
+    data = {
+        "meta": {
+            "commit": _git_commit(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "toggles": toggles,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(data, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
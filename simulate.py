@@ -0,0 +1,194 @@
+"""Run a saved circuit without Qt.
+
+Usage:
+    python simulate.py circuit.json [--stimulus toggles.txt] [--until N]
+                       [--engine event|levelized|cycle] [--flatten]
+                       [--format json|csv] [--output out.json]
+                       [--vcd trace.vcd]
+
+The stimulus file holds one toggle per line, ``<time> <switch> [HIGH|LOW]``,
+where ``<switch>`` is an InputSwitch name or id. Without a value the
+switch is toggled. Blank lines and ``#`` comments are ignored.
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.model.circuit import Circuit
+from src.model.gates import InputSwitch, OutputBulb
+from src.model.node import LogicState
+from src.model.serializer import CircuitSerializer
+from src.simulation.engine import ENGINE_KINDS, create_engine
+from src.simulation.recorder import VcdRecorder
+
+
+def load_stimulus(path):
+    events = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) not in (2, 3):
+                raise ValueError(f"{path}:{line_no}: expected '<time> <switch> [HIGH|LOW]'")
+            value = LogicState[parts[2].upper()] if len(parts) == 3 else None
+            events.append((int(parts[0]), parts[1], value))
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def output_names(circuit):
+    """Unique column names for the circuit's bulbs, in circuit order."""
+    names = []
+    seen = {}
+    for node in circuit.nodes:
+        if isinstance(node, OutputBulb):
+            count = seen.get(node.name, 0)
+            seen[node.name] = count + 1
+            names.append((node.name if count == 0 else f"{node.name}#{count}", node))
+    return names
+
+
+class HeadlessRunner:
+    def __init__(self, circuit: Circuit, kind: str = "event", flatten: bool = False, max_steps: int = 1_000_000):
+        self.circuit = circuit
+        self.engine = create_engine(circuit, kind, flatten)
+        self.max_steps = max_steps
+        self.steps = 0
+        self.outputs = output_names(circuit)
+        self.samples = []
+        switches = [n for n in circuit.nodes if isinstance(n, InputSwitch)]
+        self.switches = {}
+        for node in switches:
+            self.switches.setdefault(node.name, []).append(node)
+            self.switches.setdefault(node.id, []).append(node)
+        # Every switch drives its initial value into the circuit at time 0.
+        for node in switches:
+            self.engine.queue_update(node)
+
+    def run_until(self, limit=None) -> bool:
+        """Process events with time < ``limit`` (all if None). False if cut short."""
+        engine = self.engine
+        while True:
+            engine.compile_if_needed()
+            t = engine.scheduler.next_time()
+            if t is None or (limit is not None and t >= limit):
+                return True
+            if self.steps >= self.max_steps:
+                print(f"Stopped after {self.steps} steps without settling", file=sys.stderr)
+                return False
+            engine.step()
+            self.steps += 1
+
+    def sample(self, time: int):
+        """Record the bulb values under ``time``, the stimulus or end time asked for."""
+        self.engine.sync_pins()
+        row = {"time": time}
+        for name, node in self.outputs:
+            row[name] = node.inputs[0].value.name if node.inputs else LogicState.UNDEFINED.name
+        self.samples.append(row)
+
+    def apply(self, t, group):
+        self.engine.scheduler.advance_to(t)
+        for _, key, value in group:
+            nodes = self.switches.get(key)
+            if not nodes:
+                print(f"Unknown switch in stimulus: {key}", file=sys.stderr)
+                continue
+            for node in nodes:
+                if value is None:
+                    node.toggle()
+                else:
+                    node.state = value
+                self.engine.queue_update(node, delay=max(0, t - self.engine.simulation_time))
+
+    def run(self, stimulus=(), until=None):
+        """Apply ``stimulus`` and simulate.
+
+        One row per stimulus time, and one for time 0 where the switches
+        drive their initial values, holds the values the circuit reached
+        in response: it runs until the next stimulus time before sampling.
+        A last row holds the values at ``until``, or at quiescence.
+        """
+        groups = [(t, list(group)) for t, group in itertools.groupby(stimulus, key=lambda e: e[0])]
+        groups = [(t, group) for t, group in groups if until is None or t <= until]
+        if not groups or groups[0][0] > 0:
+            groups.insert(0, (0, []))
+        end = None if until is None else until + 1
+        for k, (t, group) in enumerate(groups):
+            self.apply(t, group)
+            limit = groups[k + 1][0] if k + 1 < len(groups) else end
+            settled = self.run_until(limit)
+            self.sample(t)
+            if not settled:
+                break
+        self.sample(self.engine.simulation_time if until is None else until)
+        return self.samples
+
+
+def format_results(samples, names, fmt):
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=["time"] + names, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(samples)
+        return buf.getvalue()
+    final = samples[-1] if samples else {"time": 0}
+    return json.dumps(
+        {
+            "time": final["time"],
+            "outputs": {k: v for k, v in final.items() if k != "time"},
+            "samples": samples,
+        },
+        indent=4,
+    ) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a circuit JSON file without a GUI.")
+    parser.add_argument("circuit", help="circuit JSON saved by the editor")
+    parser.add_argument("--stimulus", help="file of timed switch toggles")
+    parser.add_argument("--until", type=int, help="stop after this simulation time instead of at quiescence")
+    parser.add_argument("--engine", choices=ENGINE_KINDS, help="defaults to the circuit's saved engine, else event")
+    parser.add_argument("--flatten", action="store_true", help="inline IC internals into one netlist")
+    parser.add_argument("--max-steps", type=int, default=1_000_000, help="give up on circuits that never settle")
+    parser.add_argument("--format", choices=("json", "csv"), help="defaults to the output file extension, else json")
+    parser.add_argument("--output", help="write results here instead of stdout")
+    parser.add_argument("--vcd", help="record every net change to this VCD file")
+    args = parser.parse_args(argv)
+
+    with open(args.circuit, "r") as f:
+        data = json.load(f)
+    circuit = Circuit()
+    CircuitSerializer.load_model(data, circuit)
+    stimulus = load_stimulus(args.stimulus) if args.stimulus else []
+
+    kind = args.engine or circuit.engine or "event"
+    runner = HeadlessRunner(circuit, kind, args.flatten, args.max_steps)
+    recorder = VcdRecorder(args.vcd) if args.vcd else None
+    if recorder:
+        runner.engine.add_recorder(recorder)
+    samples = runner.run(stimulus, args.until)
+    if recorder:
+        runner.engine.remove_recorder(recorder)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "csv" if args.output and args.output.lower().endswith(".csv") else "json"
+    text = format_results(samples, [name for name, _ in runner.outputs], fmt)
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
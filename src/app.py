@@ -6,19 +6,24 @@ from PySide6.QtGui import QAction, QUndoStack
 from PySide6.QtWidgets import (QFileDialog, QInputDialog, QMainWindow,
                                QMessageBox, QToolBar)
 
-from src.commands.actions import AddGateCommand, DeleteGateCommand
+from src.commands.actions import (AddGateCommand, DeleteGateCommand,
+                                  SetGateInputsCommand)
 from src.graphics.items.base import GateItem
 from src.graphics.items.wire import WireItem
 from src.graphics.scene import LogicScene
 from src.graphics.view import LogicView
+from src.model.chips import ChipRegistry
 from src.model.circuit import Circuit
-from src.model.gates import (AndGate, CustomGate, InputSwitch, NotGate, OrGate,
+from src.model.gates import (AndGate, BusAndGate, BusMerger, BusOrGate,
+                             BusSplitter, BusXorGate, Clock, CustomGate,
+                             DFlipFlop, InputSwitch, NotGate, OrGate,
                              OutputBulb, SevenSegmentDecoder,
                              SevenSegmentDisplay, TriStateBuffer)
 from src.model.serializer import CircuitSerializer
-from src.simulation.engine import SimulationEngine
+from src.simulation.engine import create_engine
 from src.ui.library import ComponentLibrary
 from src.ui.properties import PropertyInspector
+from src.ui.waveform import WaveformDock
 
 
 class MainWindow(QMainWindow):
@@ -30,9 +35,11 @@ class MainWindow(QMainWindow):
 
         self.circuit = Circuit()
         self.undo_stack = QUndoStack(self)
-        self.simulation = SimulationEngine(self.circuit)
+        self.simulation = self._create_engine()
+        self.vcd_recorder = None
 
         self.scene = LogicScene(self)
+        self.scene.set_snapshot(self.simulation.snapshot)
         self.view = LogicView(self.scene, self)
         self.setCentralWidget(self.view)
 
@@ -107,6 +114,24 @@ class MainWindow(QMainWindow):
         self.overlay_toggle_act.triggered.connect(self._toggle_overlay)
         self.theme_toggle_act = QAction("Toggle Theme", self)
         self.theme_toggle_act.triggered.connect(self._toggle_theme)
+        self.engine_event_act = QAction("Engine: Event-driven", self)
+        self.engine_event_act.triggered.connect(lambda: self._set_engine("event"))
+        self.engine_levelized_act = QAction("Engine: Levelized", self)
+        self.engine_levelized_act.triggered.connect(lambda: self._set_engine("levelized"))
+        self.engine_cycle_act = QAction("Engine: Cycle-based", self)
+        self.engine_cycle_act.triggered.connect(lambda: self._set_engine("cycle"))
+        self.flatten_act = QAction("Flatten ICs", self)
+        self.flatten_act.setCheckable(True)
+        self.flatten_act.setChecked(self.simulation.flatten)
+        self.flatten_act.triggered.connect(self._toggle_flatten)
+        self.record_vcd_act = QAction("Record Waveform (VCD)…", self)
+        self.record_vcd_act.setCheckable(True)
+        self.record_vcd_act.triggered.connect(self._toggle_recording)
+        self.profile_act = QAction("Profile Node Evaluations", self)
+        self.profile_act.setCheckable(True)
+        self.profile_act.triggered.connect(lambda checked: self.simulation.set_profiling(checked))
+        self.export_stats_act = QAction("Export Engine Stats…", self)
+        self.export_stats_act.triggered.connect(self._export_stats)
 
     def _create_menus(self):
         file_menu = self.menuBar().addMenu("File")
@@ -134,6 +159,18 @@ class MainWindow(QMainWindow):
         view_menu.addSeparator()
         view_menu.addAction(self.theme_toggle_act)
 
+        sim_menu = self.menuBar().addMenu("Simulation")
+        sim_menu.addAction(self.engine_event_act)
+        sim_menu.addAction(self.engine_levelized_act)
+        sim_menu.addAction(self.engine_cycle_act)
+        sim_menu.addSeparator()
+        sim_menu.addAction(self.flatten_act)
+        sim_menu.addSeparator()
+        sim_menu.addAction(self.record_vcd_act)
+        sim_menu.addSeparator()
+        sim_menu.addAction(self.profile_act)
+        sim_menu.addAction(self.export_stats_act)
+
     def _create_toolbars(self):
         toolbar = QToolBar("Tools")
         self.addToolBar(toolbar)
@@ -154,6 +191,8 @@ class MainWindow(QMainWindow):
         toolbar.addAction("7-Seg").triggered.connect(lambda: self.add_gate("7SEG"))
         toolbar.addAction("7-Dec").triggered.connect(lambda: self.add_gate("7DEC"))
         toolbar.addAction("BUFZ").triggered.connect(lambda: self.add_gate("BUFZ"))
+        toolbar.addAction("CLK").triggered.connect(lambda: self.add_gate("CLK"))
+        toolbar.addAction("DFF").triggered.connect(lambda: self.add_gate("DFF"))
 
     def _create_docks(self):
         self.library = ComponentLibrary(self)
@@ -161,8 +200,13 @@ class MainWindow(QMainWindow):
         self.library.list_widget.itemDoubleClicked.connect(self.on_library_double_click)
 
         self.props = PropertyInspector(self)
+        self.props.input_count_changed.connect(self.set_gate_inputs)
         self.addDockWidget(Qt.RightDockWidgetArea, self.props)
 
+        self.waveforms = WaveformDock(self)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.waveforms)
+        self.waveforms.set_engine(self.simulation)
+
     def set_tool(self, tool):
         self.current_tool = tool
         self.scene.set_mode(tool)
@@ -180,6 +224,7 @@ class MainWindow(QMainWindow):
         val, ok = QInputDialog.getInt(self, "FPS Cap", "Frames per second:", 60, 10, 240, 1)
         if ok:
             self.view.set_fps_cap(val)
+            self.simulation.set_publish_rate(val)
             self.settings.setValue("ui/fps_cap", val)
             self.statusBar().showMessage(f"FPS cap set to {val}")
     def _toggle_overlay(self, checked):
@@ -187,6 +232,78 @@ class MainWindow(QMainWindow):
         self.settings.setValue("ui/overlay", checked)
         self.scene.update()
 
+    def _create_engine(self):
+        # A circuit saved with an engine choice overrides the global default.
+        kind = self.circuit.engine or self.settings.value("sim/engine", "event")
+        flatten = self.settings.value("sim/flatten", False)
+        flatten = bool(flatten) and str(flatten).lower() != "false"
+        engine = create_engine(self.circuit, kind, flatten)
+        # Publish simulation state as often as frames are drawn.
+        engine.set_publish_rate(int(self.settings.value("ui/fps_cap", 60)))
+        return engine
+
+    def _restart_simulation(self):
+        self._stop_vcd_recording()
+        self.waveforms.set_engine(None)
+        self.simulation.stop()
+        self.simulation = self._create_engine()
+        self.simulation.set_profiling(self.profile_act.isChecked())
+        self.scene.set_snapshot(self.simulation.snapshot)
+        self.waveforms.set_engine(self.simulation)
+        self.simulation.start()
+
+    def _set_engine(self, kind):
+        self.settings.setValue("sim/engine", kind)
+        self.circuit.engine = kind
+        self._restart_simulation()
+        self.statusBar().showMessage(f"Simulation engine: {type(self.simulation).__name__}")
+
+    def _toggle_flatten(self, checked):
+        self.settings.setValue("sim/flatten", checked)
+        self._restart_simulation()
+
+    def _toggle_recording(self, checked):
+        if not checked:
+            self._stop_vcd_recording()
+            self.statusBar().showMessage("Waveform recording stopped")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Record Waveform", "", "VCD Files (*.vcd)"
+        )
+        if not path:
+            self.record_vcd_act.setChecked(False)
+            return
+        from src.simulation.recorder import VcdRecorder
+        self.vcd_recorder = VcdRecorder(path)
+        self.simulation.add_recorder(self.vcd_recorder)
+        self.statusBar().showMessage(f"Recording waveform to {path}")
+
+    def _export_stats(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Engine Stats", "", "JSON Files (*.json)"
+        )
+        if not path:
+            return
+        try:
+            self.simulation.dump_stats(path)
+        except OSError as e:
+            print(f"Error exporting engine stats: {e}")
+            return
+        self.statusBar().showMessage(f"Engine stats written to {path}")
+
+    def _stop_vcd_recording(self):
+        self.record_vcd_act.setChecked(False)
+        if self.vcd_recorder is not None:
+            self.simulation.remove_recorder(self.vcd_recorder)
+            self.vcd_recorder = None
+
+    def closeEvent(self, event):
+        # Flush an active waveform recording before the process exits.
+        self._stop_vcd_recording()
+        self.waveforms.set_engine(None)
+        self.simulation.stop()
+        super().closeEvent(event)
+
     def _toggle_theme(self):
         cur = self.settings.value("ui/theme", "dark")
         nxt = "light" if cur == "dark" else "dark"
@@ -220,6 +337,20 @@ class MainWindow(QMainWindow):
             node = SevenSegmentDecoder()
         elif gate_type == "BUFZ":
             node = TriStateBuffer()
+        elif gate_type == "Clock" or gate_type == "CLK":
+            node = Clock()
+        elif gate_type == "DFlipFlop" or gate_type == "DFF":
+            node = DFlipFlop()
+        elif gate_type == "BusSplitter" or gate_type == "SPLIT":
+            node = BusSplitter()
+        elif gate_type == "BusMerger" or gate_type == "MERGE":
+            node = BusMerger()
+        elif gate_type == "BusAndGate" or gate_type == "BAND":
+            node = BusAndGate()
+        elif gate_type == "BusOrGate" or gate_type == "BOR":
+            node = BusOrGate()
+        elif gate_type == "BusXorGate" or gate_type == "BXOR":
+            node = BusXorGate()
 
         if node:
             cmd = AddGateCommand(self.scene, self.circuit, node, QPointF(100, 100))
@@ -297,7 +428,8 @@ class MainWindow(QMainWindow):
 
                 CircuitSerializer.deserialize(data, self.circuit, self.scene)
                 self.undo_stack.clear()
-                self.simulation.start()
+                # Picks up the circuit's saved engine and restarts its clocks.
+                self._restart_simulation()
                 self.statusBar().showMessage(f"Loaded from {path}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Could not load file: {e}")
@@ -329,6 +461,7 @@ class MainWindow(QMainWindow):
             filename = os.path.join(lib_path, f"{name}.json")
             with open(filename, "w") as f:
                 json.dump(data, f, indent=4)
+            ChipRegistry.invalidate(name)
 
             self.library.refresh_custom_chips()
 
@@ -339,18 +472,15 @@ class MainWindow(QMainWindow):
         if text.startswith("IC: "):
             chip_name = text[4:]
 
-            lib_path = os.path.join(os.path.dirname(__file__), "..", "library")
-            filename = os.path.join(lib_path, f"{chip_name}.json")
-
-            if os.path.exists(filename):
-                with open(filename, "r") as f:
-                    chip_data = json.load(f)
+            definition = ChipRegistry.load(chip_name)
 
-                node = CustomGate(chip_name, chip_data)
+            if definition:
+                node = CustomGate(chip_name, definition=definition)
 
                 cmd = AddGateCommand(self.scene, self.circuit, node, QPointF(100, 100))
                 self.undo_stack.push(cmd)
             else:
+                filename = ChipRegistry.path_for(chip_name)
                 QMessageBox.warning(self, "Error", f"Chip file not found: {filename}")
 
         else:
@@ -363,10 +493,20 @@ class MainWindow(QMainWindow):
                 "NAND": "NandGate",
                 "NOR": "NorGate",
                 "NOT": "NotGate",
+                "Clock": "Clock",
+                "D Flip-Flop": "DFlipFlop",
+                "Bus Splitter": "BusSplitter",
+                "Bus Merger": "BusMerger",
+                "Bus AND": "BusAndGate",
+                "Bus OR": "BusOrGate",
+                "Bus XOR": "BusXorGate",
             }
             gate_type = type_map.get(text, text)
             self.add_gate(gate_type)
 
+    def set_gate_inputs(self, item, count):
+        self.undo_stack.push(SetGateInputsCommand(self.scene, item, count))
+
     def delete_selection(self):
         for item in self.scene.selectedItems():
             if isinstance(item, GateItem):
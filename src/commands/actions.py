@@ -107,3 +107,35 @@ class WireConnectCommand(QUndoCommand):
         a.disconnect(b)
         if self.item and self.item.scene():
             self.scene.removeItem(self.item)
+
+
+class SetGateInputsCommand(QUndoCommand):
+    def __init__(self, scene: LogicScene, item: GateItem, count: int):
+        super().__init__(f"Set {item.node.name} Inputs")
+        self.scene = scene
+        self.item = item
+        self.count = count
+        self.old_count = item.node.input_count
+        self.wires = []
+
+    def redo(self):
+        # Wires on the inputs that go away are removed with them.
+        self.wires = [w for port in self.item.input_ports[self.count:] for w in port.wires]
+        for w in self.wires:
+            w.start_port.pin.disconnect(w.end_port.pin)
+            w.start_port.wires.remove(w)
+            w.end_port.wires.remove(w)
+            if w.scene():
+                self.scene.removeItem(w)
+        self.item.node.set_inputs(self.count)
+        self.item.sync_ports()
+
+    def undo(self):
+        self.item.node.set_inputs(self.old_count)
+        self.item.sync_ports()
+        for w in self.wires:
+            w.start_port.wires.append(w)
+            w.end_port.wires.append(w)
+            w.start_port.pin.connect(w.end_port.pin)
+            self.scene.addItem(w)
+            w.update_geometry()
@@ -5,10 +5,16 @@ WIRE_GRID_SIZE = GRID_SIZE // 2
 GRID_COLOR_LIGHT = QColor(60, 60, 60)
 GRID_COLOR_DARK = QColor(40, 40, 40)
 BACKGROUND_COLOR = QColor(30, 30, 30)
+# The background dot grid is drawn into tiles at least this many pixels
+# wide, one per zoom level, keeping the most recent GRID_TILE_CACHE.
+GRID_TILE_MIN_PIXELS = 256
+GRID_TILE_CACHE = 8
+GRID_TILE_MIN_SCALE = 0.05
 
 SIGNAL_HIGH_COLOR = QColor(16, 185, 129)  # Green
 SIGNAL_LOW_COLOR = QColor(220, 38, 38)    # Red
 SIGNAL_UNDEFINED_COLOR = QColor(128, 128, 128)  # Grey
+SIGNAL_BUS_COLOR = QColor(59, 130, 246)  # Blue
 
 
 WIRE_COLOR_OFF = QColor(200, 0, 0)
@@ -16,6 +22,7 @@ WIRE_COLOR_ON = QColor(0, 255, 0)
 WIRE_COLOR_UNDEFINED = QColor(100, 100, 100)
 WIRE_COLOR_SELECTED = QColor(255, 255, 0)
 WIRE_WIDTH = 3
+BUS_WIRE_WIDTH = 6
 
 
 GATE_BODY_COLOR = QColor(50, 50, 50)
@@ -35,5 +42,31 @@ Z_VAL_PORT = 30
 # UI/UX global settings
 SHOW_DISPLAY_LABELS = False
 DEFAULT_FPS_CAP = 60
+# Longest frame, in ms, that color fades advance by at once.
+ANIMATION_MAX_STEP_MS = 50
 OVERLAY_BG = QColor(11, 18, 32, 180)
 OVERLAY_TEXT = QColor(226, 232, 240)
+# Seconds between refreshes of the performance overlay text.
+OVERLAY_REFRESH_INTERVAL = 0.5
+OVERLAY_MAX_LINES = 8
+
+# Cell sizes of the scene's spatial hashes: port positions, and the
+# bounding rects of gates and wires.
+PORT_INDEX_CELL = 64
+ITEM_INDEX_CELL = 128
+
+# Level of detail, in device pixels per scene unit. Below LOD_SIMPLE,
+# labels, glows, pulses and drop shadows are skipped; below LOD_FLAT,
+# gates are flat rectangles, ports are not drawn and wires are thin grey
+# lines.
+LOD_SIMPLE = 0.5
+LOD_FLAT = 0.25
+
+# Gate drop shadow, in scene units, pre-rendered into shared sprites.
+GATE_SHADOW_BLUR = 16
+GATE_SHADOW_OFFSET = 4
+# Memory the gate sprites may hold before the least recently used go.
+SPRITE_CACHE_BYTES = 32 * 1024 * 1024
+# Sprites are rendered at a power-of-two zoom in this range.
+SPRITE_MIN_SCALE = LOD_SIMPLE
+SPRITE_MAX_SCALE = 4.0
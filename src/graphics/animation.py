@@ -0,0 +1,68 @@
+from PySide6.QtCore import QObject, QTimer
+
+from src.constants import DEFAULT_FPS_CAP
+
+
+class AnimationManager(QObject):
+    """Frame timer that runs only while something on screen is changing.
+
+    Items that are mid-transition or pulsing call ``animate(item)`` while
+    painting and are repainted on the next tick. Only painted items ask
+    again, so once nothing pulsing is in view (scrolled away, hidden or
+    in a minimized window) the requests stop. ``poll`` is called every
+    tick for other work, such as newly published simulation snapshots, and
+    returns True if it found any. A tick with no items to repaint and
+    nothing from ``poll`` stops the timer; ``animate`` or ``wake`` starts
+    it again.
+
+    ``sleeping`` may be read from other threads to decide whether ``wake``
+    needs to be queued to this object's thread.
+    """
+
+    def __init__(self, poll=None, fps: int = DEFAULT_FPS_CAP, parent=None):
+        super().__init__(parent)
+        self.poll = poll
+        self.sleeping = True
+        self.ticks = 0
+        self._items = set()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._tick)
+        self.set_fps(fps)
+
+    def set_fps(self, fps: int):
+        self.timer.setInterval(int(1000 / max(1, fps)))
+
+    def animate(self, item):
+        """Repaint ``item`` on the next tick."""
+        self._items.add(item)
+        self.wake()
+
+    def wake(self):
+        self.sleeping = False
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def clear(self):
+        self._items.clear()
+
+    def _tick(self):
+        self.ticks += 1
+        items = self._items
+        self._items = set()
+        for item in items:
+            try:
+                if item.scene() is not None and item.isVisible():
+                    item.update()
+            except RuntimeError:
+                # Deleted by Qt after it asked to be animated.
+                pass
+        busy = self.poll() if self.poll is not None else False
+        if items or busy or self._items:
+            return
+        self.sleeping = True
+        # Work posted just before ``sleeping`` was set saw the timer
+        # running and did not wake it, so look once more.
+        if self.poll is not None and self.poll():
+            self.sleeping = False
+            return
+        self.timer.stop()
@@ -1,15 +1,21 @@
 from PySide6.QtCore import QPointF, QRectF, Qt
-from PySide6.QtGui import QBrush, QFont, QPen
+from PySide6.QtGui import QBrush, QColor, QFont, QPen
 from PySide6.QtWidgets import (QGraphicsItem, QGraphicsRectItem,
                                QGraphicsTextItem, QMenu, QInputDialog,
-                               QColorDialog, QGraphicsDropShadowEffect)
+                               QColorDialog)
 
 from src.constants import *
-from src.graphics.items.port import PortItem
+from src.graphics.items.port import PortItem, detail_level, shown_value
+from src.graphics.sprites import SHADOW_MARGIN, sprite_atlas, zoom_bucket
 from src.model.gates import SevenSegmentDisplay, InputSwitch, OutputBulb
 from src.model.node import LogicState, Node
 
 
+class _Label(QGraphicsTextItem):
+    def paint(self, painter, option, widget):
+        # Unreadable when zoomed out, and text is slow to draw.
+        if detail_level(painter, option) >= LOD_SIMPLE:
+            super().paint(painter, option, widget)
 
 
 class GateItem(QGraphicsRectItem):
@@ -25,17 +31,13 @@ class GateItem(QGraphicsRectItem):
         )
         self.setCacheMode(QGraphicsItem.CacheMode.NoCache)
 
-        self.body_color = GATE_BODY_COLOR
+        body = getattr(node, "body_color", None)
+        self.body_color = QColor(*body) if body else GATE_BODY_COLOR
         self.setBrush(QBrush(self.body_color))
         self.setPen(QPen(GATE_BORDER_COLOR, 2))
         self.setZValue(Z_VAL_GATE)
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(16)
-        shadow.setOffset(0, 4)
-        shadow.setColor(Qt.black)
-        self.setGraphicsEffect(shadow)
 
-        self.label = QGraphicsTextItem(node.name, self)
+        self.label = _Label(node.name, self)
         self.label.setDefaultTextColor(Qt.white)
         font = QFont("Segoe UI", 10, QFont.Bold)
         self.label.setFont(font)
@@ -48,19 +50,51 @@ class GateItem(QGraphicsRectItem):
         self._layout()
 
     def _create_ports(self):
+        self._ports = {}
         for pin in self.node.inputs:
             port = PortItem(pin, self)
+            self._ports[pin] = port
             self.input_ports.append(port)
 
         for pin in self.node.outputs:
             port = PortItem(pin, self)
+            self._ports[pin] = port
             self.output_ports.append(port)
 
+    def sync_ports(self):
+        """Match the ports to the node's pins after its pin count changed.
+
+        Ports of removed pins are detached but kept, so a pin that comes
+        back gets its old port (and the wires that refer to it) again.
+        """
+        pins = set(self.node.inputs) | set(self.node.outputs)
+        for port in self.input_ports + self.output_ports:
+            if port.pin not in pins:
+                port.setParentItem(None)
+                if port.scene():
+                    port.scene().removeItem(port)
+
+        def port_for(pin):
+            port = self._ports.get(pin)
+            if port is None:
+                port = self._ports[pin] = PortItem(pin, self)
+            elif port.parentItem() is not self:
+                port.setParentItem(self)
+            return port
+
+        self.input_ports = [port_for(pin) for pin in self.node.inputs]
+        self.output_ports = [port_for(pin) for pin in self.node.outputs]
+        self.prepareGeometryChange()
+        self._layout()
+
     def _layout(self):
         max_ports = max(len(self.input_ports), len(self.output_ports))
         self.height = max(40, max_ports * 20 + 20)
 
         self.setRect(0, 0, self.width, self.height)
+        scene = self.scene()
+        if scene is not None and hasattr(scene, "index_item"):
+            scene.index_item(self)
 
         brect = self.label.boundingRect()
         self.label.setPos(
@@ -83,41 +117,69 @@ class GateItem(QGraphicsRectItem):
             self.update()
         super().mouseDoubleClickEvent(event)
 
+    def boundingRect(self):
+        # Room for the drop shadow drawn with the body sprite.
+        m = SHADOW_MARGIN
+        return self.rect().adjusted(-m, -m, m, m)
+
+    def _draw_sprite(self, painter, lod, shape, rect: QRectF, body=None, border=None):
+        """Blit the shared sprite of ``shape`` filling ``rect``, with its shadow."""
+        key = (shape, rect.width(), rect.height(), body, border, zoom_bucket(lod))
+        pixmap = sprite_atlas().get(key)
+        m = SHADOW_MARGIN
+        painter.drawPixmap(rect.adjusted(-m, -m, m, m), pixmap, QRectF(pixmap.rect()))
+
+    def _state_color(self):
+        """Fill showing a switch's or bulb's state, or None for other gates."""
+        if isinstance(self.node, InputSwitch):
+            return QColor(Qt.green if self.node.state == LogicState.HIGH else Qt.red)
+        if isinstance(self.node, OutputBulb):
+            v = shown_value(self, self.node.inputs[0]) if self.node.inputs else LogicState.UNDEFINED
+            if v == LogicState.HIGH:
+                return QColor(Qt.yellow)
+            if v == LogicState.LOW:
+                return QColor(Qt.black)
+            return QColor(90, 90, 90)
+        return None
+
     def paint(self, painter, option, widget):
+        lod = detail_level(painter, option)
+        if lod < LOD_FLAT:
+            painter.setPen(QPen(GATE_SELECTED_COLOR, 0) if self.isSelected() else Qt.NoPen)
+            painter.setBrush(self._state_color() or self.body_color)
+            painter.drawRect(self.rect())
+            return
         if isinstance(self.node, (InputSwitch, OutputBulb)):
             painter.save()
             painter.setPen(Qt.NoPen)
-            if isinstance(self.node, InputSwitch):
-                color = Qt.green if self.node.state == LogicState.HIGH else Qt.red
-                painter.setBrush(QBrush(color))
-            else:
-                v = self.node.inputs[0].value if self.node.inputs else LogicState.UNDEFINED
-                if v == LogicState.HIGH:
-                    painter.setBrush(QBrush(Qt.yellow))
-                elif v == LogicState.LOW:
-                    painter.setBrush(QBrush(Qt.black))
-                else:
-                    painter.setBrush(QBrush(QColor(90, 90, 90)))
+            painter.setBrush(QBrush(self._state_color()))
             r = min(self.width, self.height) - 20
             r = max(16, int(r))
             cx = self.width / 2
             cy = self.height / 2
+            if lod >= LOD_SIMPLE:
+                self._draw_sprite(painter, lod, "ellipse", QRectF(cx - r / 2, cy - r / 2, r, r))
             painter.drawEllipse(QPointF(cx, cy), r / 2, r / 2)
             painter.restore()
             if self.isSelected():
                 scene = self.scene()
-                pulse = scene.get_pulse() if scene and hasattr(scene, "get_pulse") else 0.5
+                pulsing = lod >= LOD_SIMPLE and scene and hasattr(scene, "get_pulse")
+                pulse = scene.get_pulse() if pulsing else 0.5
                 sel = QPen(GATE_SELECTED_COLOR, 2 + pulse * 2)
                 painter.setPen(sel)
                 painter.setBrush(Qt.NoBrush)
                 painter.drawEllipse(QPointF(cx, cy), r / 2 + 2, r / 2 + 2)
+                if pulsing and hasattr(scene, "animate"):
+                    scene.animate(self)
             return
+        elif lod >= LOD_SIMPLE:
+            border = GATE_SELECTED_COLOR if self.isSelected() else GATE_BORDER_COLOR
+            self._draw_sprite(painter, lod, "rect", self.rect(), self.body_color.getRgb(), border.getRgb())
         else:
-            if self.isSelected():
-                self.setPen(QPen(GATE_SELECTED_COLOR, 2))
-            else:
-                self.setPen(QPen(GATE_BORDER_COLOR, 2))
-            super().paint(painter, option, widget)
+            # No shadow this far out; the plain body is cheaper than a sprite.
+            painter.setPen(QPen(GATE_SELECTED_COLOR if self.isSelected() else GATE_BORDER_COLOR, 2))
+            painter.setBrush(QBrush(self.body_color))
+            painter.drawRect(self.rect())
 
         if isinstance(self.node, SevenSegmentDisplay):
             seg_w = self.width - 16
@@ -134,9 +196,12 @@ class GateItem(QGraphicsRectItem):
             segs.append(QRectF(base_x + 10, base_y + seg_h - 6, seg_w - 20, 6))  # G bottom
             painter.setPen(Qt.NoPen)
             for i, rect in enumerate(segs):
-                val = self.node.inputs[i].value if i < len(self.node.inputs) else LogicState.LOW
+                val = shown_value(self, self.node.inputs[i]) if i < len(self.node.inputs) else LogicState.LOW
                 painter.setBrush(QBrush(SEGMENT_ON_COLOR if val == LogicState.HIGH else SEGMENT_OFF_COLOR))
-                painter.drawRoundedRect(rect, 2, 2)
+                if lod < LOD_SIMPLE:
+                    painter.drawRect(rect)
+                else:
+                    painter.drawRoundedRect(rect, 2, 2)
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemPositionChange:
@@ -145,6 +210,14 @@ class GateItem(QGraphicsRectItem):
             x = round(new_pos.x() / grid_size) * grid_size
             y = round(new_pos.y() / grid_size) * grid_size
             return QPointF(x, y)
+        if change == QGraphicsItem.ItemSceneChange:
+            old = self.scene()
+            if old is not None and hasattr(old, "unindex_item"):
+                old.unindex_item(self)
+        elif change == QGraphicsItem.ItemSceneHasChanged or change == QGraphicsItem.ItemPositionHasChanged:
+            scene = self.scene()
+            if scene is not None and hasattr(scene, "index_item"):
+                scene.index_item(self)
         return super().itemChange(change, value)
 
     def contextMenuEvent(self, event):
@@ -161,4 +234,5 @@ class GateItem(QGraphicsRectItem):
             col = QColorDialog.getColor(self.body_color, None, "Component Color")
             if col.isValid():
                 self.body_color = col
+                self.node.body_color = (col.red(), col.green(), col.blue(), col.alpha())
                 self.setBrush(QBrush(self.body_color))
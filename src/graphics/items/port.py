@@ -3,7 +3,36 @@ from PySide6.QtGui import QBrush, QPainterPath, QPen, QColor
 from PySide6.QtWidgets import QGraphicsItem, QGraphicsPathItem
 
 from src.constants import *
-from src.model.node import Pin, LogicState
+from src.model.node import BusValue, LogicState, Pin
+
+
+def shown_value(item, pin: Pin):
+    """Value to paint for ``pin``: the scene's published snapshot, if any."""
+    scene = item.scene()
+    if scene is not None and hasattr(scene, "pin_value"):
+        return scene.pin_value(pin)
+    return pin.value
+
+
+def ease_color(color: QColor, target: QColor, t: float) -> bool:
+    """Move ``color`` a fraction ``t`` of the way to ``target``, at least
+    one step per channel; True while it has not arrived."""
+    def step(c, goal):
+        d = goal - c
+        return c + (int(d * t) or (d > 0) - (d < 0))
+
+    color.setRgb(
+        step(color.red(), target.red()),
+        step(color.green(), target.green()),
+        step(color.blue(), target.blue()),
+        255,
+    )
+    return color.rgb() != target.rgb()
+
+
+def detail_level(painter, option) -> float:
+    """Zoom ``painter`` draws at, compared against LOD_SIMPLE and LOD_FLAT."""
+    return option.levelOfDetailFromTransform(painter.worldTransform())
 
 
 class PortItem(QGraphicsPathItem):
@@ -11,14 +40,14 @@ class PortItem(QGraphicsPathItem):
         super().__init__(parent)
         self.pin = pin
         self.radius = PORT_SIZE / 2
-        self.setAcceptHoverEvents(True)
         self.setFlag(QGraphicsItem.ItemSendsScenePositionChanges)
 
         path = QPainterPath()
         path.addEllipse(-self.radius, -self.radius, PORT_SIZE, PORT_SIZE)
         self.setPath(path)
 
-        self.base_color = getattr(self.pin, "color", None) or SIGNAL_HIGH_COLOR
+        color = getattr(self.pin, "color", None)
+        self.base_color = QColor(*color) if color else SIGNAL_HIGH_COLOR
         self._current_color = QColor(SIGNAL_UNDEFINED_COLOR)
         self.setBrush(QBrush(self._current_color))
         self.setPen(QPen(Qt.NoPen))
@@ -28,21 +57,34 @@ class PortItem(QGraphicsPathItem):
 
         self.wires = []
 
-    def hoverEnterEvent(self, event):
-        self.hovered = True
-        self.setBrush(QBrush(PORT_HOVER_COLOR))
-        state = self.pin.value.name if hasattr(self.pin.value, "name") else str(self.pin.value)
-        ptype = "Input" if self.pin.type.name == "INPUT" else "Output"
-        self.setToolTip(f"{ptype} pin\nName: {self.pin.name}\nState: {state}")
-        super().hoverEnterEvent(event)
+    def set_hovered(self, hovered: bool):
+        """Called by the scene, which finds the port under the mouse in its
+        port index rather than through Qt hover events."""
+        self.hovered = hovered
+        if hovered:
+            self.setBrush(QBrush(PORT_HOVER_COLOR))
+            state = self.pin.value.name if hasattr(self.pin.value, "name") else str(self.pin.value)
+            ptype = "Input" if self.pin.type.name == "INPUT" else "Output"
+            self.setToolTip(f"{ptype} pin\nName: {self.pin.name}\nState: {state}")
+        else:
+            self.setBrush(QBrush(self._current_color))
 
-    def hoverLeaveEvent(self, event):
-        self.hovered = False
-        self.setBrush(QBrush(self._current_color))
-        super().hoverLeaveEvent(event)
+    def boundingRect(self):
+        # Room for the HIGH glow drawn around the port.
+        glow = 8
+        return super().boundingRect().adjusted(-glow, -glow, glow, glow)
 
     def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemSceneChange:
+            old = self.scene()
+            if old is not None and hasattr(old, "unregister_port"):
+                old.unregister_port(self)
+            if value is not None and hasattr(value, "register_port"):
+                value.register_port(self)
         if change == QGraphicsItem.ItemScenePositionHasChanged:
+            scene = self.scene()
+            if scene is not None and hasattr(scene, "index_port"):
+                scene.index_port(self)
             for wire in self.wires:
                 wire.update_geometry()
         return super().itemChange(change, value)
@@ -66,29 +108,33 @@ class PortItem(QGraphicsPathItem):
             col = QColorDialog.getColor(self.base_color, None, "Pin Color")
             if col.isValid():
                 self.base_color = col
-                self.pin.color = col
+                self.pin.color = (col.red(), col.green(), col.blue(), col.alpha())
 
     def paint(self, painter, option, widget):
+        lod = detail_level(painter, option)
+        if lod < LOD_FLAT:
+            return
+        value = shown_value(self, self.pin)
         target = SIGNAL_UNDEFINED_COLOR
-        if self.pin.value == LogicState.HIGH:
+        if isinstance(value, BusValue):
+            if not value.undefined:
+                target = SIGNAL_BUS_COLOR
+        elif value == LogicState.HIGH:
             target = self.base_color
-        elif self.pin.value == LogicState.LOW:
+        elif value == LogicState.LOW:
             target = SIGNAL_LOW_COLOR
 
         scene = self.scene()
         dt = scene.get_frame_ms() if scene and hasattr(scene, "get_frame_ms") else 16.0
         t = max(0.0, min(1.0, dt / 120.0))
-        self._current_color.setRed(int(self._current_color.red() + (target.red() - self._current_color.red()) * t))
-        self._current_color.setGreen(int(self._current_color.green() + (target.green() - self._current_color.green()) * t))
-        self._current_color.setBlue(int(self._current_color.blue() + (target.blue() - self._current_color.blue()) * t))
-        self._current_color.setAlpha(255)
+        animating = ease_color(self._current_color, target, t)
 
         if self.hovered:
             self.setBrush(QBrush(PORT_HOVER_COLOR))
         else:
             self.setBrush(QBrush(self._current_color))
 
-        if self.pin.value == LogicState.HIGH:
+        if value == LogicState.HIGH and lod >= LOD_SIMPLE:
             painter.save()
             painter.setPen(Qt.NoPen)
             pulse = scene.get_pulse() if scene and hasattr(scene, "get_pulse") else 0.5
@@ -98,6 +144,9 @@ class PortItem(QGraphicsPathItem):
             painter.setBrush(glow)
             painter.drawEllipse(-r, -r, r * 2, r * 2)
             painter.restore()
+            animating = True
+        if animating and scene and hasattr(scene, "animate"):
+            scene.animate(self)
         super().paint(painter, option, widget)
 
     def set_port_size(self, size: int):
@@ -4,8 +4,8 @@ from PySide6.QtWidgets import (QGraphicsEllipseItem, QGraphicsItem,
                                QGraphicsPathItem)
 
 from src.constants import *
-from src.graphics.items.port import PortItem
-from src.model.node import LogicState
+from src.graphics.items.port import PortItem, detail_level, ease_color, shown_value
+from src.model.node import BusValue, LogicState
 
 
 class WireItem(QGraphicsPathItem):
@@ -50,6 +50,9 @@ class WireItem(QGraphicsPathItem):
             path.lineTo(p)
 
         self.setPath(path)
+        scene = self.scene()
+        if scene is not None and hasattr(scene, "index_item"):
+            scene.index_item(self)
         self._update_color()
         self._refresh_handles()
 
@@ -62,8 +65,11 @@ class WireItem(QGraphicsPathItem):
             src_pin = self.start_port.pin
             if self.end_port and self.end_port.pin.type.name == "OUTPUT":
                 src_pin = self.end_port.pin
-            state = src_pin.value
-            if state == LogicState.HIGH:
+            state = shown_value(self, src_pin)
+            if isinstance(state, BusValue):
+                if not state.undefined:
+                    target = SIGNAL_BUS_COLOR
+            elif state == LogicState.HIGH:
                 target = SIGNAL_HIGH_COLOR
             elif state == LogicState.LOW:
                 target = SIGNAL_LOW_COLOR
@@ -73,12 +79,10 @@ class WireItem(QGraphicsPathItem):
         scene = self.scene()
         dt = scene.get_frame_ms() if scene and hasattr(scene, "get_frame_ms") else 16.0
         t = max(0.0, min(1.0, dt / 140.0))
-        self._current_color.setRed(int(self._current_color.red() + (target.red() - self._current_color.red()) * t))
-        self._current_color.setGreen(int(self._current_color.green() + (target.green() - self._current_color.green()) * t))
-        self._current_color.setBlue(int(self._current_color.blue() + (target.blue() - self._current_color.blue()) * t))
-        self._current_color.setAlpha(255)
+        if ease_color(self._current_color, target, t) and scene and hasattr(scene, "animate"):
+            scene.animate(self)
 
-        pen = QPen(self._current_color, WIRE_WIDTH)
+        pen = QPen(self._current_color, BUS_WIRE_WIDTH if self.start_port.pin.width > 1 else WIRE_WIDTH)
         if self.end_port is None:
             if self.preview_valid:
                 pen.setStyle(Qt.SolidLine)
@@ -86,9 +90,22 @@ class WireItem(QGraphicsPathItem):
                 pen.setStyle(Qt.DashLine)
         self.setPen(pen)
 
+    def boundingRect(self):
+        # The HIGH glow is drawn with a pen slightly wider than the wire's.
+        return super().boundingRect().adjusted(-2, -2, 2, 2)
+
     def paint(self, painter, option, widget):
+        lod = detail_level(painter, option)
+        if lod < LOD_FLAT and self.end_port is not None:
+            color = WIRE_COLOR_SELECTED if self.isSelected() else WIRE_COLOR_UNDEFINED
+            painter.setPen(QPen(color, 0))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(self.path())
+            return
         self._update_color()
         super().paint(painter, option, widget)
+        if lod < LOD_SIMPLE:
+            return
         # Draw glow and directional arrow based on source pin value
         # Determine source (OUTPUT) and destination (INPUT) ports to orient arrow correctly
         src_port = self.start_port
@@ -97,7 +114,7 @@ class WireItem(QGraphicsPathItem):
             if self.start_port.pin.type.name == "INPUT" and self.end_port.pin.type.name == "OUTPUT":
                 src_port = self.end_port
                 dst_port = self.start_port
-        src_val = src_port.pin.value if src_port else LogicState.UNDEFINED
+        src_val = shown_value(self, src_port.pin) if src_port else LogicState.UNDEFINED
         if src_val == LogicState.HIGH:
             scene = self.scene()
             pulse = scene.get_pulse() if scene and hasattr(scene, "get_pulse") else 0.5
@@ -109,6 +126,8 @@ class WireItem(QGraphicsPathItem):
             glow.setWidth(WIRE_WIDTH + 2)
             painter.setPen(glow)
             painter.drawPath(self.path())
+            if scene and hasattr(scene, "animate"):
+                scene.animate(self)
 
     def add_control_point(self, pos: QPointF):
         snapped = self._snap_to_grid(pos)
@@ -121,6 +140,14 @@ class WireItem(QGraphicsPathItem):
         super().mouseDoubleClickEvent(event)
 
     def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemSceneChange:
+            old = self.scene()
+            if old is not None and hasattr(old, "unindex_item"):
+                old.unindex_item(self)
+        elif change == QGraphicsItem.ItemSceneHasChanged:
+            scene = self.scene()
+            if scene is not None and hasattr(scene, "index_item"):
+                scene.index_item(self)
         if change == QGraphicsItem.ItemSelectedHasChanged:
             self._refresh_handles(force=True)
         return super().itemChange(change, value)
@@ -1,17 +1,23 @@
-from PySide6.QtCore import QLineF, QPointF, QRectF, Qt, Signal
-from PySide6.QtGui import QKeyEvent, QPainter, QPen, QTransform, QPolygonF, QColor
+from PySide6.QtCore import QLineF, QPointF, QRectF, Qt, QTimer, Signal
+from PySide6.QtGui import QKeyEvent, QPainter, QPainterPath, QPen, QPixmap, QTransform, QPolygonF, QColor
 import math
+from collections import OrderedDict
 from PySide6.QtWidgets import QGraphicsScene, QGraphicsSceneMouseEvent
 
 from src.constants import *
+from src.graphics.animation import AnimationManager
 from src.graphics.items.port import PortItem
 from src.graphics.items.wire import WireItem
+from src.graphics.spatial import SpatialHash
+from src.model.gates import OutputBulb, SevenSegmentDisplay
 
 
 class LogicScene(QGraphicsScene):
     wire_connected = Signal(object, object, object)
     node_triggered = Signal(object)
     mode_changed = Signal(str)
+    # Emitted on the simulation thread to wake a sleeping frame timer.
+    snapshot_published = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -25,10 +31,44 @@ class LogicScene(QGraphicsScene):
         self.start_port = None
         self.hover_port = None
         self.active_draw = False
-        self.overlay_enabled = True
         self._fps = 0.0
         self._frame_ms = 0.0
         self._time_ms = 0.0
+        # Published simulation state and the buffer held for this frame.
+        self.snapshot = None
+        self.frame = None
+        self._seen_generation = -1
+        # PortItem of each pin in the scene, for mapping changed nets to items.
+        self._ports = {}
+        # Frame ticks for pulses, fades and new snapshots; idle otherwise.
+        self.animations = AnimationManager(self.update_changed, parent=self)
+        self.snapshot_published.connect(self.animations.wake)
+        self._overlay_timer = QTimer(self)
+        self._overlay_timer.setInterval(int(OVERLAY_REFRESH_INTERVAL * 1000))
+        self._overlay_timer.timeout.connect(self._refresh_overlay)
+        self.overlay_enabled = True
+        # Qt's own index is off (NoIndex) because items move constantly;
+        # these grids answer port hit-tests, hover and rubber-band queries.
+        self.port_index = SpatialHash(PORT_INDEX_CELL)
+        self.item_index = SpatialHash(ITEM_INDEX_CELL)
+        self.hovered_port = None
+        # Dot grid pixmaps by zoom, most recently drawn last.
+        self._grid_tiles = OrderedDict()
+
+    @property
+    def overlay_enabled(self) -> bool:
+        return self._overlay_enabled
+
+    @overlay_enabled.setter
+    def overlay_enabled(self, enabled: bool):
+        self._overlay_enabled = enabled
+        if enabled:
+            self._overlay_timer.start()
+        else:
+            self._overlay_timer.stop()
+
+    def _refresh_overlay(self):
+        self.invalidate(self.overlay_rect(), QGraphicsScene.ForegroundLayer)
 
     def set_mode(self, mode):
         self.mode = mode
@@ -70,6 +110,7 @@ class LogicScene(QGraphicsScene):
         super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event: QGraphicsSceneMouseEvent):
+        self._set_hovered_port(self._find_port_near(event.scenePos(), 0.0))
         if self.mode == "Wire" and self.temp_wire and self.active_draw:
             raw_pos = event.scenePos()
             pos = self.wire_snap_to_grid(raw_pos)
@@ -87,71 +128,75 @@ class LogicScene(QGraphicsScene):
         super().mouseReleaseEvent(event)
 
     def drawBackground(self, painter: QPainter, rect: QRectF):
-        super().drawBackground(painter, rect)
+        # The dot grid repeats every tile, so it is drawn once per zoom and
+        # tiled; the view caches the result between frames.
+        tile = self._grid_tile(max(GRID_TILE_MIN_SCALE, painter.worldTransform().m11()))
+        span = tile.width() / tile.devicePixelRatio()
+        painter.drawTiledPixmap(rect, tile, QPointF(rect.left() % span, rect.top() % span))
+
+    def _grid_tile(self, scale: float) -> QPixmap:
+        """Background and dots of a square of the grid starting at a major
+        dot, at ``scale`` device pixels per scene unit."""
+        color = self.backgroundBrush().color()
+        key = (round(scale, 4), color.rgba())
+        tile = self._grid_tiles.get(key)
+        if tile is not None:
+            self._grid_tiles.move_to_end(key)
+            return tile
 
-        left = int(rect.left()) - (int(rect.left()) % self.grid_size)
-        top = int(rect.top()) - (int(rect.top()) % self.grid_size)
+        step = self.grid_size
+        period = step * 5
+        span = period * max(1, math.ceil(GRID_TILE_MIN_PIXELS / (period * scale)))
+        size = max(1, math.ceil(span * scale))
+        tile = QPixmap(size, size)
+        tile.fill(color)
+        tile.setDevicePixelRatio(size / span)
 
         dots_minor = []
         dots_major = []
-        scale = 1.0
-        try:
-            views = self.views()
-            if views:
-                t = views[0].transform()
-                scale = max(0.1, t.m11())
-        except Exception:
-            scale = 1.0
-
-        step = self.grid_size
-        x = left
-        while x < rect.right():
-            y = top
-            while y < rect.bottom():
-                if (x // step) % 5 == 0 and (y // step) % 5 == 0:
+        for x in range(0, span, step):
+            for y in range(0, span, step):
+                if x % period == 0 and y % period == 0:
                     dots_major.append(QPointF(x, y))
                 else:
                     dots_minor.append(QPointF(x, y))
-                y += step
-            x += step
 
-        c_light = GRID_COLOR_LIGHT
-        c_dark = GRID_COLOR_DARK
-        cl = QColor(c_light)
-        cd = QColor(c_dark)
+        cl = QColor(GRID_COLOR_LIGHT)
+        cd = QColor(GRID_COLOR_DARK)
         fade = max(0.12, min(1.0, scale))
         cl.setAlphaF(fade)
         cd.setAlphaF(min(1.0, fade * 1.2))
+        painter = QPainter(tile)
         painter.setPen(QPen(cl, 0))
-        if dots_minor:
-            painter.setBrush(cl)
-            painter.drawPoints(QPolygonF(dots_minor))
+        painter.drawPoints(QPolygonF(dots_minor))
         painter.setPen(QPen(cd, 0))
-        if dots_major:
-            painter.setBrush(cd)
-            painter.drawPoints(QPolygonF(dots_major))
-
-        # Performance overlay
-        if self.overlay_enabled:
-            painter.save()
-            painter.setRenderHint(QPainter.TextAntialiasing, True)
-            painter.setPen(Qt.NoPen)
-            painter.setBrush(OVERLAY_BG)
-            panel_rect = QRectF(rect.right() - 220, rect.top() + 10, 210, 80)
-            painter.drawRoundedRect(panel_rect, 6, 6)
-            painter.setPen(QPen(OVERLAY_TEXT))
-            nodes = len(getattr(self.parent(), "circuit", None).nodes) if getattr(self.parent(), "circuit", None) else 0
-            lines = [
-                f"FPS: {self._fps:.1f}",
-                f"Frame: {self._frame_ms:.2f} ms",
-                f"Nodes: {nodes}",
-            ]
-            x = panel_rect.x() + 10
-            y = panel_rect.y() + 22
-            for s in lines:
-                painter.drawText(QPointF(x, y), s)
-                y += 20
-            painter.restore()
+        painter.drawPoints(QPolygonF(dots_major))
+        painter.end()
+
+        self._grid_tiles[key] = tile
+        if len(self._grid_tiles) > GRID_TILE_CACHE:
+            self._grid_tiles.popitem(last=False)
+        return tile
+
+    def drawForeground(self, painter: QPainter, rect: QRectF):
+        # Performance overlay, kept out of the background so refreshing it
+        # leaves the view's background cache alone.
+        if not self.overlay_enabled:
+            return
+        painter.save()
+        painter.setRenderHint(QPainter.TextAntialiasing, True)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(OVERLAY_BG)
+        lines = self._overlay_lines()
+        panel_rect = self.overlay_rect(len(lines))
+        painter.drawRoundedRect(panel_rect, 6, 6)
+        painter.setPen(QPen(OVERLAY_TEXT))
+        x = panel_rect.x() + 10
+        y = panel_rect.y() + 22
+        for s in lines:
+            painter.drawText(QPointF(x, y), s)
+            y += 20
+        painter.restore()
 
     def snap_to_grid(self, pos: QPointF) -> QPointF:
         x = round(pos.x() / self.grid_size) * self.grid_size
@@ -219,22 +264,160 @@ class LogicScene(QGraphicsScene):
             return False
         a = self.start_port.pin
         b = port.pin
-        return a.node != b.node and a.type != b.type
+        return a.node != b.node and a.type != b.type and a.width == b.width
 
     def _find_port_near(self, pos: QPointF, radius: float = 8.0):
-        rect = QRectF(pos.x() - radius, pos.y() - radius, radius * 2, radius * 2)
-        candidates = [it for it in self.items(rect) if isinstance(it, PortItem)]
-        if not candidates:
-            return None
-        best = None
-        best_d = None
-        for it in candidates:
-            sp = it.get_scene_pos()
-            d = (sp.x() - pos.x()) ** 2 + (sp.y() - pos.y()) ** 2
-            if best is None or d < best_d:
-                best = it
-                best_d = d
-        return best
+        """Closest port whose circle lies within ``radius`` of ``pos``."""
+        return self.port_index.nearest(pos.x(), pos.y(), radius + PORT_SIZE / 2)
+
+    def _set_hovered_port(self, port):
+        if port is self.hovered_port:
+            return
+        if self.hovered_port is not None:
+            self.hovered_port.set_hovered(False)
+        self.hovered_port = port
+        if port is not None:
+            port.set_hovered(True)
+
+    def items_in_rect(self, rect: QRectF):
+        """Gates and wires whose shape intersects ``rect``."""
+        path = QPainterPath()
+        path.addRect(rect)
+        candidates = self.item_index.query(rect.left(), rect.top(), rect.right(), rect.bottom())
+        return [item for item in candidates if item.collidesWithPath(path)]
+
+    def select_rect(self, rect: QRectF, add: bool = False):
+        """Rubber-band selection of what ``rect`` touches; ``add`` keeps the
+        current selection."""
+        if not add:
+            self.clearSelection()
+        for item in self.items_in_rect(rect):
+            if item.isVisible() and item.flags() & item.GraphicsItemFlag.ItemIsSelectable:
+                item.setSelected(True)
+
+    def set_snapshot(self, snapshot):
+        if self.snapshot is not None:
+            self.snapshot.listener = None
+        self.snapshot = snapshot
+        self.frame = None
+        self._seen_generation = -1
+        if snapshot is not None:
+            snapshot.listener = self._snapshot_published
+        self.animations.wake()
+
+    def _snapshot_published(self):
+        # Simulation thread. A running frame timer polls for the snapshot.
+        if self.animations.sleeping:
+            self.snapshot_published.emit()
+
+    def clear(self):
+        # Items deleted here get no ItemSceneChange, so drop them ourselves.
+        self._ports.clear()
+        self.animations.clear()
+        self.port_index.clear()
+        self.item_index.clear()
+        self.hovered_port = None
+        super().clear()
+
+    def register_port(self, port: PortItem):
+        self._ports[port.pin] = port
+        self.index_port(port)
+
+    def unregister_port(self, port: PortItem):
+        if self._ports.get(port.pin) is port:
+            del self._ports[port.pin]
+        self.port_index.remove(port)
+        if self.hovered_port is port:
+            self.hovered_port = None
+
+    def index_port(self, port: PortItem):
+        pos = port.get_scene_pos()
+        self.port_index.insert(port, pos.x(), pos.y())
+
+    def index_item(self, item):
+        """File ``item`` (a gate or wire) under its current scene bounding rect."""
+        r = item.sceneBoundingRect()
+        self.item_index.insert(item, r.left(), r.top(), r.right(), r.bottom())
+
+    def unindex_item(self, item):
+        self.item_index.remove(item)
+
+    def animate(self, item):
+        """Repaint ``item`` on the next frame tick."""
+        self.animations.animate(item)
+
+    def update_changed(self) -> bool:
+        """Schedule repaints for the ports, wires and displays on nets that
+        newly published snapshots report as changed; False if there were
+        none. A missed generation or a recompile repaints everything.
+        """
+        if self.snapshot is None:
+            return False
+        buffer = self.snapshot.read()
+        generation = buffer.generation
+        if generation == self._seen_generation:
+            return False
+        missed = generation != self._seen_generation + 1
+        self._seen_generation = generation
+        if missed or buffer.changed is None:
+            self.update()
+            return True
+
+        net_pins = buffer.netlist.net_pins
+        ports = self._ports
+        for n in buffer.changed:
+            for pin in net_pins[n]:
+                port = ports.get(pin)
+                if port is None:
+                    continue
+                port.update()
+                for wire in port.wires:
+                    wire.update()
+                gate = port.parentItem()
+                if isinstance(getattr(gate, "node", None), (OutputBulb, SevenSegmentDisplay)):
+                    gate.update()
+        return True
+
+    def _overlay_lines(self):
+        circuit = getattr(self.parent(), "circuit", None)
+        nodes = len(circuit.nodes) if circuit else 0
+        lines = [
+            f"FPS: {self._fps:.1f}",
+            f"Frame: {self._frame_ms:.2f} ms",
+            f"Nodes: {nodes}",
+        ]
+        engine = getattr(self.parent(), "simulation", None)
+        if hasattr(engine, "metrics"):
+            m = engine.metrics()
+            lines.append(f"Events/s: {m['events_per_second']:,.0f}")
+            lines.append(f"Coalesced: {m['coalesced_events']:,}")
+            lines.append(f"Queue: {m['queue_depth']} (peak {m['peak_queue_depth']})")
+            lines.append(f"Sim rate: {m['sim_time_rate']:,.0f} t/s")
+            if m["profiling"]:
+                hot = engine.stats.hot_spots(1, by_instance=True)
+                lines.append(f"Hot: {hot[0]['node']}" if hot else "Hot: -")
+        return lines
+
+    def overlay_rect(self, lines: int = OVERLAY_MAX_LINES) -> QRectF:
+        """Scene rect of the performance panel in the top-right corner of the view."""
+        views = self.views()
+        if not views:
+            return QRectF()
+        view = views[0]
+        visible = view.mapToScene(view.viewport().rect()).boundingRect()
+        return QRectF(visible.right() - 220, visible.top() + 10, 210, 20 * lines + 20)
+
+    def begin_frame(self):
+        """Take the latest published state; items paint from it all frame."""
+        self.frame = self.snapshot.read() if self.snapshot is not None else None
+
+    def pin_value(self, pin):
+        if self.frame is not None:
+            value = self.frame.value_of(pin)
+            if value is not None:
+                return value
+        # Not compiled by the simulation yet.
+        return pin.value
 
     def update_metrics(self, frame_ms: float, fps: float):
         self._frame_ms = frame_ms
@@ -245,4 +428,6 @@ class LogicScene(QGraphicsScene):
         return 0.5 + 0.5 * math.sin(self._time_ms * 0.01)
 
     def get_frame_ms(self) -> float:
-        return self._frame_ms
+        # The first frame after the timer slept spans the whole idle time;
+        # easing it by that much would skip the transition.
+        return min(self._frame_ms, ANIMATION_MAX_STEP_MS)
@@ -0,0 +1,128 @@
+import math
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+Bounds = Tuple[float, float, float, float]
+
+
+class SpatialHash:
+    """Uniform grid over scene coordinates for hit-testing items.
+
+    Each item is stored with its bounds ``(x0, y0, x1, y1)`` in every cell
+    those bounds overlap; a point is an item with ``x0 == x1`` and
+    ``y0 == y1``. Queries only look at the cells under the query rect, so
+    their cost depends on how crowded that area is, not on how many items
+    exist. Items spanning more than ``max_cells`` cells (long wires) are
+    kept in a separate list checked by every query instead.
+    """
+
+    def __init__(self, cell: float = 64.0, max_cells: int = 256):
+        self.cell = cell
+        self.max_cells = max_cells
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._bounds: Dict[Hashable, Bounds] = {}
+        # Cell range each item is filed under, or None when oversized.
+        self._ranges: Dict[Hashable, Optional[Tuple[int, int, int, int]]] = {}
+        self._oversized: Set[Hashable] = set()
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __contains__(self, item):
+        return item in self._bounds
+
+    def _range(self, x0, y0, x1, y1):
+        c = self.cell
+        return (math.floor(x0 / c), math.floor(y0 / c), math.floor(x1 / c), math.floor(y1 / c))
+
+    def insert(self, item, x0: float, y0: float, x1: float = None, y1: float = None):
+        """Add ``item`` or move it to new bounds (a point if only x0, y0 given)."""
+        if x1 is None:
+            x1, y1 = x0, y0
+        self._bounds[item] = (x0, y0, x1, y1)
+        cells = self._range(x0, y0, x1, y1)
+        if (cells[2] - cells[0] + 1) * (cells[3] - cells[1] + 1) > self.max_cells:
+            cells = None
+        old = self._ranges.get(item, False)
+        if old == cells:
+            return
+        if old is not False:
+            self._unfile(item, old)
+        self._ranges[item] = cells
+        if cells is None:
+            self._oversized.add(item)
+            return
+        table = self._cells
+        cx0, cy0, cx1, cy1 = cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = table.get((cx, cy))
+                if bucket is None:
+                    bucket = table[(cx, cy)] = set()
+                bucket.add(item)
+
+    def _unfile(self, item, cells):
+        if cells is None:
+            self._oversized.discard(item)
+            return
+        table = self._cells
+        cx0, cy0, cx1, cy1 = cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = table.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(item)
+                    if not bucket:
+                        del table[(cx, cy)]
+
+    def remove(self, item):
+        if item not in self._bounds:
+            return
+        self._unfile(item, self._ranges.pop(item))
+        del self._bounds[item]
+
+    def clear(self):
+        self._cells.clear()
+        self._bounds.clear()
+        self._ranges.clear()
+        self._oversized.clear()
+
+    def bounds(self, item) -> Optional[Bounds]:
+        return self._bounds.get(item)
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> Set[Hashable]:
+        """Items whose bounds intersect the rect ``(x0, y0)``-``(x1, y1)``."""
+        found = set()
+        table = self._cells
+        cx0, cy0, cx1, cy1 = self._range(x0, y0, x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(table):
+            # A query wider than the occupied area: walk the occupied cells.
+            for (cx, cy), bucket in table.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found |= bucket
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    bucket = table.get((cx, cy))
+                    if bucket:
+                        found |= bucket
+        found |= self._oversized
+        bounds = self._bounds
+        return {
+            item for item in found
+            if bounds[item][0] <= x1 and bounds[item][2] >= x0
+            and bounds[item][1] <= y1 and bounds[item][3] >= y0
+        }
+
+    def nearest(self, x: float, y: float, radius: float):
+        """Item whose bounds centre is closest to ``(x, y)`` within ``radius``, or None."""
+        best = None
+        best_d = radius * radius
+        for item in self.query(x - radius, y - radius, x + radius, y + radius):
+            x0, y0, x1, y1 = self._bounds[item]
+            dx = (x0 + x1) / 2 - x
+            dy = (y0 + y1) / 2 - y
+            d = dx * dx + dy * dy
+            if d <= best_d:
+                best = item
+                best_d = d
+        return best
@@ -0,0 +1,115 @@
+import math
+from collections import OrderedDict
+
+from PySide6.QtCore import QRectF, Qt
+from PySide6.QtGui import QBrush, QColor, QImage, QPainter, QPen, QPixmap
+from PySide6.QtWidgets import (QGraphicsDropShadowEffect, QGraphicsEllipseItem,
+                               QGraphicsRectItem, QGraphicsScene)
+
+from src.constants import (GATE_SHADOW_BLUR, GATE_SHADOW_OFFSET, SPRITE_CACHE_BYTES,
+                           SPRITE_MAX_SCALE, SPRITE_MIN_SCALE)
+
+# Room around a sprite's body for its shadow, in scene units.
+SHADOW_MARGIN = GATE_SHADOW_BLUR + GATE_SHADOW_OFFSET
+
+
+def zoom_bucket(lod: float) -> float:
+    """Power of two nearest ``lod``, so a sprite is redrawn only when the
+    zoom halves or doubles."""
+    lod = max(SPRITE_MIN_SCALE, min(SPRITE_MAX_SCALE, lod))
+    return 2.0 ** round(math.log2(lod))
+
+
+class SpriteAtlas:
+    """Pre-rendered static parts of gates: shadow, body and border.
+
+    A sprite is keyed by everything that shapes it, ``(shape, width,
+    height, body, border, scale)``; ``shape`` is "rect" or "ellipse" and
+    colors are rgba tuples (``body`` None for the shadow alone). Gates that
+    look alike share one pixmap. Sprites are rendered at ``scale`` device
+    pixels per scene unit and the least recently drawn are dropped once
+    they hold more than ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = SPRITE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.sprites: "OrderedDict[tuple, QPixmap]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._scene = None
+        self._item = None
+
+    def get(self, key: tuple) -> QPixmap:
+        pixmap = self.sprites.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return pixmap
+        self.misses += 1
+        pixmap = self._render(*key)
+        self.sprites[key] = pixmap
+        self.bytes += self._size(pixmap)
+        while self.bytes > self.max_bytes and len(self.sprites) > 1:
+            _, old = self.sprites.popitem(last=False)
+            self.bytes -= self._size(old)
+        return pixmap
+
+    def clear(self):
+        self.sprites.clear()
+        self.bytes = 0
+
+    @staticmethod
+    def _size(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * 4
+
+    def _render(self, shape, width, height, body, border, scale) -> QPixmap:
+        # Blurring is left to QGraphicsDropShadowEffect in a private scene,
+        # so sprites look the way the per-item effect used to.
+        if self._scene is None:
+            self._scene = QGraphicsScene()
+        if self._item is not None:
+            self._scene.removeItem(self._item)
+        if shape == "ellipse":
+            item = QGraphicsEllipseItem(0, 0, width, height)
+        else:
+            item = QGraphicsRectItem(0, 0, width, height)
+        if body is None:
+            # Shadow only; the body is drawn live over the black.
+            item.setBrush(QBrush(Qt.black))
+            item.setPen(QPen(Qt.NoPen))
+        else:
+            item.setBrush(QBrush(QColor(*body)))
+            item.setPen(QPen(QColor(*border), 2) if border else QPen(Qt.NoPen))
+        shadow = QGraphicsDropShadowEffect()
+        shadow.setBlurRadius(GATE_SHADOW_BLUR * scale)
+        shadow.setOffset(0, GATE_SHADOW_OFFSET * scale)
+        shadow.setColor(Qt.black)
+        item.setGraphicsEffect(shadow)
+        self._scene.addItem(item)
+        self._item = item
+
+        source = QRectF(0, 0, width, height).adjusted(
+            -SHADOW_MARGIN, -SHADOW_MARGIN, SHADOW_MARGIN, SHADOW_MARGIN
+        )
+        image = QImage(
+            math.ceil(source.width() * scale), math.ceil(source.height() * scale),
+            QImage.Format_ARGB32_Premultiplied,
+        )
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self._scene.render(painter, QRectF(image.rect()), source, Qt.IgnoreAspectRatio)
+        painter.end()
+        return QPixmap.fromImage(image)
+
+
+_atlas = None
+
+
+def sprite_atlas() -> SpriteAtlas:
+    """Atlas shared by every scene; created on first use, once Qt is up."""
+    global _atlas
+    if _atlas is None:
+        _atlas = SpriteAtlas()
+    return _atlas
@@ -1,31 +1,35 @@
-from PySide6.QtCore import Qt, QSize, QTimer, QPointF, QRectF
+from PySide6.QtCore import Qt, QRect, QSize, QTimer, QPointF
 from PySide6.QtGui import QMouseEvent, QPainter, QSurfaceFormat, QWheelEvent
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
-from PySide6.QtWidgets import QGraphicsScene, QGraphicsView
+from PySide6.QtWidgets import QGraphicsScene, QGraphicsView, QRubberBand
 from time import perf_counter
 from src.constants import DEFAULT_FPS_CAP
-from src.graphics.items.base import GateItem
-from src.model.gates import OutputBulb
 
 
 class LogicView(QGraphicsView):
     def __init__(self, scene: QGraphicsScene, parent=None):
         super().__init__(scene, parent)
+        self._rubber_band = False
+        self._band = None
+        self._band_origin = None
+        self._band_add = False
 
+        self._renderer_backend = "GPU"
         try:
-            fmt = QSurfaceFormat()
-            fmt.setSamples(4)
-            self.setViewport(QOpenGLWidget())
-            self.viewport().setFormat(fmt)
+            self.setViewport(self._gl_viewport())
             print("OpenGL Activated")
         except Exception as e:
+            self._renderer_backend = "CPU"
             print(f"OpenGL acceleration failed, falling back to raster: {e}")
 
         self.setRenderHint(QPainter.Antialiasing)
         self.setRenderHint(QPainter.TextAntialiasing)
         self.setRenderHint(QPainter.SmoothPixmapTransform)
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # Both backends repaint only the regions of items the scene marks
+        # as changed; the OpenGL viewport keeps its framebuffer for this.
+        self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
         self.setDragMode(QGraphicsView.RubberBandDrag)
+        self.viewport().setMouseTracking(True)
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.AnchorUnderMouse)
 
@@ -38,13 +42,8 @@ class LogicView(QGraphicsView):
         self._pan_vel = QPointF(0, 0)
         self._pan_inertia = QTimer(self)
         self._pan_inertia.timeout.connect(self._tick_inertia)
-        self._renderer_backend = "GPU"
         self._last_paint = perf_counter()
         self._fps_cap = DEFAULT_FPS_CAP
-        self._frame_timer = QTimer(self)
-        self._frame_timer.timeout.connect(self._tick_frame)
-        self._update_timer_interval()
-        self._frame_timer.start()
 
         self._target_zoom = 1.0
         self._zoom_anim = QTimer(self)
@@ -53,7 +52,9 @@ class LogicView(QGraphicsView):
         self.setOptimizationFlags(
             QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing
         )
-        # self.setCacheMode(QGraphicsView.NoCache)
+        # The background is only the dot grid, so it is kept between frames
+        # and redrawn for newly exposed areas or a new zoom.
+        self.setCacheMode(QGraphicsView.CacheBackground)
 
     def wheelEvent(self, event: QWheelEvent):
         if event.modifiers() & Qt.ControlModifier:
@@ -68,6 +69,28 @@ class LogicView(QGraphicsView):
         else:
             super().wheelEvent(event)
 
+    def scrollContentsBy(self, dx: int, dy: int):
+        super().scrollContentsBy(dx, dy)
+        # The overlay is pinned to the view, but scrolling the viewport
+        # moves its pixels: clear the moved copy and redraw it.
+        scene = self.scene()
+        if getattr(scene, "overlay_enabled", False) and hasattr(scene, "overlay_rect"):
+            rect = self.mapFromScene(scene.overlay_rect()).boundingRect()
+            self.viewport().update(rect.translated(dx, dy))
+            self.viewport().update(rect)
+
+    def setupViewport(self, widget):
+        super().setupViewport(widget)
+        # Ports are hovered through the scene's port index, which needs
+        # move events even when no button is held.
+        widget.setMouseTracking(True)
+
+    def setDragMode(self, mode):
+        # Rubber-band selection is done here through the scene's item index;
+        # Qt's own tests every item on each mouse move.
+        self._rubber_band = mode == QGraphicsView.RubberBandDrag
+        super().setDragMode(QGraphicsView.NoDrag if self._rubber_band else mode)
+
     def mousePressEvent(self, event: QMouseEvent):
         if event.button() == Qt.MiddleButton:
             self._panning = True
@@ -76,6 +99,21 @@ class LogicView(QGraphicsView):
             event.accept()
         else:
             super().mousePressEvent(event)
+            # Start a band only where no item took the press.
+            if (
+                self._rubber_band
+                and event.button() == Qt.LeftButton
+                and not event.isAccepted()
+                and hasattr(self.scene(), "select_rect")
+            ):
+                self._band_origin = event.pos()
+                self._band_add = bool(event.modifiers() & Qt.ControlModifier)
+                if not self._band_add:
+                    self.scene().clearSelection()
+                self._band = QRubberBand(QRubberBand.Rectangle, self.viewport())
+                self._band.setGeometry(QRect(self._band_origin, QSize()))
+                self._band.show()
+                event.accept()
 
     def mouseMoveEvent(self, event: QMouseEvent):
         if self._panning:
@@ -88,6 +126,11 @@ class LogicView(QGraphicsView):
                 self.verticalScrollBar().value() - delta.y()
             )
             event.accept()
+        elif self._band is not None:
+            rect = QRect(self._band_origin, event.pos()).normalized()
+            self._band.setGeometry(rect)
+            self.scene().select_rect(self.mapToScene(rect).boundingRect(), self._band_add)
+            event.accept()
         else:
             super().mouseMoveEvent(event)
 
@@ -96,19 +139,31 @@ class LogicView(QGraphicsView):
             self._panning = False
             self.setCursor(Qt.ArrowCursor)
             event.accept()
+        elif self._band is not None and event.button() == Qt.LeftButton:
+            self._band.hide()
+            self._band.deleteLater()
+            self._band = None
+            event.accept()
         else:
             super().mouseReleaseEvent(event)
 
+    @staticmethod
+    def _gl_viewport() -> QOpenGLWidget:
+        fmt = QSurfaceFormat()
+        fmt.setSamples(4)
+        widget = QOpenGLWidget()
+        widget.setFormat(fmt)
+        # Keep the last frame so minimal viewport updates can draw over it.
+        widget.setUpdateBehavior(QOpenGLWidget.PartialUpdate)
+        return widget
+
     def set_backend(self, backend: str):
         backend = backend.upper()
         if backend == self._renderer_backend:
             return
         if backend == "GPU":
             try:
-                fmt = QSurfaceFormat()
-                fmt.setSamples(4)
-                self.setViewport(QOpenGLWidget())
-                self.viewport().setFormat(fmt)
+                self.setViewport(self._gl_viewport())
                 self._renderer_backend = "GPU"
             except Exception as e:
                 print(f"Failed to switch to GPU: {e}")
@@ -120,35 +175,13 @@ class LogicView(QGraphicsView):
             print(f"Unknown backend: {backend}")
 
     def set_fps_cap(self, fps: int):
+        """Cap the frame rate of the scene's animations (see AnimationManager)."""
         if fps <= 0:
             return
         self._fps_cap = fps
-        self._update_timer_interval()
-
-    def _update_timer_interval(self):
-        interval_ms = int(1000 / max(1, self._fps_cap))
-        self._frame_timer.setInterval(interval_ms)
-
-    def _tick_frame(self):
         scene = self.scene()
-        if scene:
-            try:
-                rect = scene.sceneRect()
-            except Exception:
-                rect = None
-            if rect:
-                scene.invalidate(rect, QGraphicsScene.AllLayers)
-            else:
-                scene.invalidate(QRectF(), QGraphicsScene.AllLayers)
-            try:
-                for it in scene.items():
-                    if isinstance(it, GateItem) and isinstance(getattr(it, "node", None), OutputBulb):
-                        br = it.sceneBoundingRect()
-                        scene.invalidate(br, QGraphicsScene.ItemLayer)
-                        it.update()
-            except Exception:
-                pass
-        self.viewport().update()
+        if hasattr(scene, "animations"):
+            scene.animations.set_fps(fps)
 
     def paintEvent(self, event):
         now = perf_counter()
@@ -158,6 +191,8 @@ class LogicView(QGraphicsView):
         scene = self.scene()
         if hasattr(scene, "update_metrics"):
             scene.update_metrics(dt, fps)
+        if hasattr(scene, "begin_frame"):
+            scene.begin_frame()
         super().paintEvent(event)
 
     def _tick_inertia(self):
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from src.model.circuit import Circuit
+from src.model.gates import NODE_PARAMS, CustomGate, apply_params, create_node
+
+LIBRARY_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "library")
+
+
+class ChipDefinition:
+    """Parsed, Qt-free template of an IC built from its JSON data.
+
+    The JSON is walked once; ``instantiate`` then only creates nodes and
+    connects pins by index.
+    """
+
+    def __init__(self, name: str, data: Dict[str, Any]):
+        self.name = name
+        self.data = data
+        self.input_names = list(data.get("input_names", []))
+        self.output_names = list(data.get("output_names", []))
+        self._digest = None
+
+        # (type, name, source chip, input pin names, output pin names, params)
+        self.nodes = []
+        index_of = {}
+        for node_data in data.get("nodes", []):
+            index_of[node_data.get("id")] = len(self.nodes)
+            self.nodes.append(
+                (
+                    node_data.get("type"),
+                    node_data.get("name"),
+                    node_data.get("source_chip_name", node_data.get("name")),
+                    [p.get("name") for p in node_data.get("pin_inputs", [])],
+                    [p.get("name") for p in node_data.get("pin_outputs", [])],
+                    {key: node_data[key] for key in NODE_PARAMS if key in node_data},
+                )
+            )
+        # Chips this one places, loaded from the library when instantiated.
+        self.nested = sorted({
+            chip for type_name, _, chip, _, _, _ in self.nodes if type_name == "CustomGate" and chip
+        })
+
+        self.wires = []
+        for wire_data in data.get("wires", []):
+            a = index_of.get(wire_data.get("from_node"))
+            b = index_of.get(wire_data.get("to_node"))
+            if a is None or b is None:
+                print("Wire mapping error: Node not found")
+                continue
+            self.wires.append((a, wire_data["from_pin"], b, wire_data["to_pin"]))
+
+    @property
+    def key(self) -> tuple:
+        """Identity of the definition's content and of the library's current
+        version of every chip nested in it, so editing an inner chip
+        changes the key of each chip that contains it."""
+        return self._key_within(frozenset())
+
+    def _key_within(self, seen: frozenset) -> tuple:
+        if self._digest is None:
+            self._digest = hashlib.sha1(json.dumps(self.data, sort_keys=True).encode()).hexdigest()
+        nested = []
+        if self.name not in seen:
+            seen = seen | {self.name}
+            for chip_name in self.nested:
+                definition = ChipRegistry.load(chip_name)
+                nested.append(definition._key_within(seen) if definition else (chip_name, None))
+        return (self.name, self._digest, tuple(nested))
+
+    def instantiate(self) -> Circuit:
+        circuit = Circuit()
+        nodes = []
+        for type_name, name, chip_name, in_names, out_names, params in self.nodes:
+            if type_name == "CustomGate":
+                definition = ChipRegistry.load(chip_name) if chip_name else None
+                node = CustomGate(chip_name, definition=definition) if definition else None
+            else:
+                node = create_node(type_name)
+                if node is not None:
+                    apply_params(node, params)
+            nodes.append(node)
+            if node is None:
+                continue
+            if name:
+                node.name = name
+            for pin, pin_name in zip(node.inputs, in_names):
+                if isinstance(pin_name, str):
+                    pin.name = pin_name
+            for pin, pin_name in zip(node.outputs, out_names):
+                if isinstance(pin_name, str):
+                    pin.name = pin_name
+            circuit.add_node(node)
+
+        for a, from_pin, b, to_pin in self.wires:
+            if nodes[a] is None or nodes[b] is None:
+                continue
+            try:
+                circuit.connect(nodes[a].outputs[from_pin], nodes[b].inputs[to_pin])
+            except IndexError:
+                print("Wire mapping error: Pin index out of range")
+        return circuit
+
+
+class ChipRegistry:
+    """Process-wide cache of chip definitions loaded from the library folder.
+
+    A file is parsed once and reparsed only when its modification time or
+    size changes.
+    """
+
+    _definitions: Dict[str, tuple] = {}
+    _lock = threading.RLock()
+
+    @staticmethod
+    def path_for(name: str) -> str:
+        return os.path.join(LIBRARY_PATH, f"{name}.json")
+
+    @classmethod
+    def load(cls, name: str) -> Optional[ChipDefinition]:
+        filename = cls.path_for(name)
+        try:
+            st = os.stat(filename)
+        except OSError:
+            print(f"Custom gate file not found: {filename}")
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        with cls._lock:
+            cached = cls._definitions.get(name)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            try:
+                with open(filename, "r") as f:
+                    definition = ChipDefinition(name, json.load(f))
+            except Exception as e:
+                print(f"Error loading custom gate {name}: {e}")
+                return None
+            cls._definitions[name] = (stamp, definition)
+            return definition
+
+    @classmethod
+    def invalidate(cls, name: Optional[str] = None):
+        with cls._lock:
+            if name is None:
+                cls._definitions.clear()
+            else:
+                cls._definitions.pop(name, None)
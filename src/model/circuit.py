@@ -8,9 +8,15 @@ class Circuit:
         self.nodes: List[Node] = []
 
         self.wires: List[Dict] = []
+        # Preferred simulation engine kind saved with the circuit, or None.
+        self.engine = None
+        # Bumped whenever nodes or connections in this circuit change.
+        self.revision = 0
 
     def add_node(self, node: Node):
         self.nodes.append(node)
+        node.circuit = self
+        self.revision += 1
 
     def remove_node(self, node: Node):
         if node in self.nodes:
@@ -18,6 +24,8 @@ class Circuit:
                 for connected_pin in list(pin.connections):
                     pin.disconnect(connected_pin)
             self.nodes.remove(node)
+            node.circuit = None
+            self.revision += 1
 
     def connect(self, source_pin: Pin, target_pin: Pin):
         source_pin.connect(target_pin)
@@ -28,6 +36,8 @@ class Circuit:
     def clear(self):
         self.nodes.clear()
         self.wires.clear()
+        self.engine = None
+        self.revision += 1
 
     def serialize(self):
         return {
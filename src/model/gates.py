@@ -1,28 +1,36 @@
 from typing import Any, Dict
 
-from src.model.node import LogicState, Node
+from src.model.logic import (STATES, eval_7dec, eval_7seg, eval_and,
+                             eval_bufz, eval_nand, eval_nor, eval_not, eval_or,
+                             eval_xor, truth_table)
+from src.model.node import (MAX_BUS_WIDTH, BusValue, LogicState, Node,
+                            touch_topology)
+
+_UNSET = object()
 
 
 class CustomGate(Node):
-    def __init__(self, name: str, internal_data: Dict[str, Any]):
+    def __init__(self, name: str, internal_data: Dict[str, Any] = None, definition=None):
         super().__init__(name)
         self.source_chip_name = name
-        self.internal_data = internal_data
 
-        for inp_name in internal_data.get("input_names", []):
-            self.add_input()
+        from src.model.chips import ChipDefinition
 
-        for out_name in internal_data.get("output_names", []):
-            self.add_output()
+        if definition is None:
+            definition = ChipDefinition(name, internal_data or {})
+        self.definition = definition
+        self.internal_data = definition.data
 
-        from src.graphics.scene import LogicScene
-        from src.model.circuit import Circuit
-        from src.model.serializer import CircuitSerializer
+        for inp_name in definition.input_names:
+            self.add_input()
 
-        self.internal_circuit = Circuit()
+        for out_name in definition.output_names:
+            self.add_output()
 
-        dummy_scene = LogicScene()
-        CircuitSerializer.deserialize(internal_data, self.internal_circuit, dummy_scene)
+        self.internal_circuit = definition.instantiate()
+        # Taken right after instantiating, so it names the nested chips
+        # this instance was actually built from.
+        self.definition_key = definition.key
 
         self.input_nodes = []
         self.output_nodes = []
@@ -46,7 +54,21 @@ class CustomGate(Node):
         if len(self.output_nodes) != len(self.outputs):
             print(f"Warning: CustomGate {name} output count mismatch")
 
+        # Shared truth table, looked up on first compute; None means the
+        # chip has feedback and must be swept every time.
+        self._table = _UNSET
+
     def compute(self):
+        table = self._table
+        if table is _UNSET:
+            from src.simulation.memo import chip_table
+            table = self._table = chip_table(self)
+        if table is not None:
+            outs = table.lookup(tuple(pin.value.value for pin in self.inputs))
+            for pin, state in zip(self.outputs, outs):
+                pin.set_value(state)
+            return
+
         for i, pin in enumerate(self.inputs):
             if i < len(self.input_nodes):
                 val = pin.value
@@ -76,110 +98,109 @@ class CustomGate(Node):
                     self.outputs[i].set_value(LogicState.LOW)
 
 
-class AndGate(Node):
-    def __init__(self):
-        super().__init__("AND")
-        self.add_input()
-        self.add_input()
-        self.add_output()
+class _TableGate(Node):
+    """Node evaluated by one lookup: the input values are packed two bits
+    apiece into a word that indexes the truth table of ``KERNEL``
+    (see src/model/logic.py)."""
+
+    KERNEL = None
 
     def compute(self):
-        all_high = True
-        for pin in self.inputs:
-            if pin.value == LogicState.UNDEFINED:
-                self.outputs[0].set_value(LogicState.LOW)
+        inputs = self.inputs
+        table = truth_table(self.KERNEL, len(inputs))
+        if table is None:
+            outs = self.KERNEL([pin.value.value for pin in inputs])
+        else:
+            word = 0
+            shift = 0
+            for pin in inputs:
+                word |= pin.value.value << shift
+                shift += 2
+            outs = table[word]
+        for pin, value in zip(self.outputs, outs):
+            pin.set_value(STATES[value])
 
-            if pin.value == LogicState.LOW:
-                all_high = False
 
-        result = LogicState.HIGH if all_high else LogicState.LOW
+# Input count limits for the variadic gates below.
+MIN_GATE_INPUTS = 2
+MAX_GATE_INPUTS = 64
 
-        self.outputs[0].set_value(result)
 
+class _VariadicGate(_TableGate):
+    """Gate with a configurable number of inputs. Inputs removed by
+    ``set_inputs`` are disconnected and kept, so growing the gate again
+    brings back the same pins."""
 
-class OrGate(Node):
-    def __init__(self):
-        super().__init__("OR")
-        self.add_input()
-        self.add_input()
+    def __init__(self, name: str, inputs: int = MIN_GATE_INPUTS):
+        super().__init__(name)
+        self._spare_inputs = []
         self.add_output()
+        self.set_inputs(inputs)
 
-    def compute(self):
-        any_high = False
-        for pin in self.inputs:
-            if pin.value == LogicState.HIGH:
-                any_high = True
-            elif pin.value == LogicState.UNDEFINED:
-                self.outputs[0].set_value(LogicState.LOW)
+    @property
+    def input_count(self) -> int:
+        return len(self.inputs)
 
-        result = LogicState.HIGH if any_high else LogicState.LOW
-        self.outputs[0].set_value(result)
+    def set_inputs(self, count: int):
+        count = max(MIN_GATE_INPUTS, min(MAX_GATE_INPUTS, int(count)))
+        if count == len(self.inputs):
+            return
+        while len(self.inputs) > count:
+            pin = self.inputs.pop()
+            for other in list(pin.connections):
+                pin.disconnect(other)
+            self._spare_inputs.append(pin)
+        while len(self.inputs) < count:
+            if self._spare_inputs:
+                self.inputs.append(self._spare_inputs.pop())
+            else:
+                self.add_input()
+        touch_topology(self)
 
 
-class XorGate(Node):
-    def __init__(self):
-        super().__init__("XOR")
-        self.add_input()
-        self.add_input()
-        self.add_output()
+class AndGate(_VariadicGate):
+    KERNEL = staticmethod(eval_and)
 
-    def compute(self):
-        vals = [p.value for p in self.inputs]
-        if LogicState.UNDEFINED in vals:
-            self.outputs[0].set_value(LogicState.UNDEFINED)
-            return
-        a = 1 if vals[0] == LogicState.HIGH else 0
-        b = 1 if vals[1] == LogicState.HIGH else 0
-        res = a ^ b
-        self.outputs[0].set_value(LogicState.HIGH if res == 1 else LogicState.LOW)
+    def __init__(self, inputs: int = MIN_GATE_INPUTS):
+        super().__init__("AND", inputs)
 
 
-class NandGate(Node):
-    def __init__(self):
-        super().__init__("NAND")
-        self.add_input()
-        self.add_input()
-        self.add_output()
+class OrGate(_VariadicGate):
+    KERNEL = staticmethod(eval_or)
 
-    def compute(self):
-        vals = [p.value for p in self.inputs]
-        if LogicState.UNDEFINED in vals:
-            self.outputs[0].set_value(LogicState.UNDEFINED)
-            return
-        res = all(v == LogicState.HIGH for v in vals)
-        self.outputs[0].set_value(LogicState.LOW if res else LogicState.HIGH)
+    def __init__(self, inputs: int = MIN_GATE_INPUTS):
+        super().__init__("OR", inputs)
 
 
-class NorGate(Node):
-    def __init__(self):
-        super().__init__("NOR")
-        self.add_input()
-        self.add_input()
-        self.add_output()
+class XorGate(_VariadicGate):
+    KERNEL = staticmethod(eval_xor)
 
-    def compute(self):
-        vals = [p.value for p in self.inputs]
-        if LogicState.UNDEFINED in vals:
-            self.outputs[0].set_value(LogicState.UNDEFINED)
-            return
-        res = any(v == LogicState.HIGH for v in vals)
-        self.outputs[0].set_value(LogicState.LOW if res else LogicState.HIGH)
+    def __init__(self, inputs: int = MIN_GATE_INPUTS):
+        super().__init__("XOR", inputs)
+
+
+class NandGate(_VariadicGate):
+    KERNEL = staticmethod(eval_nand)
+
+    def __init__(self, inputs: int = MIN_GATE_INPUTS):
+        super().__init__("NAND", inputs)
+
+
+class NorGate(_VariadicGate):
+    KERNEL = staticmethod(eval_nor)
+
+    def __init__(self, inputs: int = MIN_GATE_INPUTS):
+        super().__init__("NOR", inputs)
+
+
+class NotGate(_TableGate):
+    KERNEL = staticmethod(eval_not)
 
-class NotGate(Node):
     def __init__(self):
         super().__init__("NOT")
         self.add_input()
         self.add_output()
 
-    def compute(self):
-        inp = self.inputs[0].value
-        if inp == LogicState.HIGH:
-            self.outputs[0].set_value(LogicState.LOW)
-        elif inp == LogicState.LOW:
-            self.outputs[0].set_value(LogicState.HIGH)
-        else:
-            self.outputs[0].set_value(LogicState.HIGH)
-
 
 class InputSwitch(Node):
     def __init__(self):
@@ -208,7 +229,9 @@ class OutputBulb(Node):
         self.active = self.inputs[0].value == LogicState.HIGH
 
 
-class SevenSegmentDisplay(Node):
+class SevenSegmentDisplay(_TableGate):
+    KERNEL = staticmethod(eval_7seg)
+
     def __init__(self):
         super().__init__("7SEG")
         self.is_seven_segment = True
@@ -216,12 +239,10 @@ class SevenSegmentDisplay(Node):
             self.add_input()
         self.add_output()
 
-    def compute(self):
-        on = any(p.value == LogicState.HIGH for p in self.inputs)
-        self.outputs[0].set_value(LogicState.HIGH if on else LogicState.LOW)
 
+class SevenSegmentDecoder(_TableGate):
+    KERNEL = staticmethod(eval_7dec)
 
-class SevenSegmentDecoder(Node):
     def __init__(self):
         super().__init__("7DEC")
         for _ in range(4):
@@ -229,48 +250,232 @@ class SevenSegmentDecoder(Node):
         for _ in range(7):
             self.add_output()
 
-    def compute(self):
-        vals = [pin.value for pin in self.inputs]
-        if any(v == LogicState.UNDEFINED for v in vals):
-            for o in self.outputs:
-                o.set_value(LogicState.UNDEFINED)
-            return
-        b0 = 1 if vals[0] == LogicState.HIGH else 0
-        b1 = 1 if vals[1] == LogicState.HIGH else 0
-        b2 = 1 if vals[2] == LogicState.HIGH else 0
-        b3 = 1 if vals[3] == LogicState.HIGH else 0
-        n = (b3 << 3) | (b2 << 2) | (b1 << 1) | b0
-        table = {
-            0: (1, 1, 1, 0, 1, 1, 1),
-            1: (0, 1, 1, 0, 0, 0, 0),
-            2: (1, 1, 0, 1, 1, 0, 1),
-            3: (1, 1, 1, 1, 0, 0, 1),
-            4: (0, 1, 1, 1, 0, 1, 0),
-            5: (1, 0, 1, 1, 0, 1, 1),
-            6: (1, 0, 1, 1, 1, 1, 1),
-            7: (1, 1, 1, 0, 0, 0, 0),
-            8: (1, 1, 1, 1, 1, 1, 1),
-            9: (1, 1, 1, 1, 0, 1, 1),
-        }
-        segs = table.get(n, (0, 0, 0, 0, 0, 0, 0))
-        for i, val in enumerate(segs):
-            self.outputs[i].set_value(LogicState.HIGH if val == 1 else LogicState.LOW)
-
-
-class TriStateBuffer(Node):
+
+class TriStateBuffer(_TableGate):
+    KERNEL = staticmethod(eval_bufz)
+
     def __init__(self):
         super().__init__("BUFZ")
         self.add_input()   # D
         self.add_input()   # EN
         self.add_output()  # Q
 
+
+class Clock(Node):
+    """Free-running clock; the engine calls ``tick`` every ``half_period``."""
+
+    def __init__(self):
+        super().__init__("CLK")
+        self.add_output()
+        self.state = LogicState.LOW
+        # Simulation time between edges.
+        self.half_period = 10
+        self.outputs[0].set_value(self.state)
+
+    def tick(self):
+        if self.state == LogicState.LOW:
+            self.state = LogicState.HIGH
+        else:
+            self.state = LogicState.LOW
+
+    def compute(self):
+        self.outputs[0].set_value(self.state)
+
+
+class DFlipFlop(Node):
+    """Rising-edge D flip-flop."""
+
+    def __init__(self):
+        super().__init__("DFF")
+        self.add_input()   # D
+        self.add_input()   # CLK
+        self.add_output()  # Q
+        self.inputs[0].name = "D"
+        self.inputs[1].name = "CLK"
+        self.outputs[0].name = "Q"
+        self.q = LogicState.LOW
+        self.last_clk = LogicState.UNDEFINED
+        self.outputs[0].set_value(self.q)
+
+    def clock(self, clk: LogicState, d: LogicState) -> LogicState:
+        """Apply a new clock value and return Q."""
+        if clk == LogicState.HIGH and self.last_clk == LogicState.LOW:
+            self.q = d
+        self.last_clk = clk
+        return self.q
+
     def compute(self):
-        d = self.inputs[0].value
-        en = self.inputs[1].value
-        if en == LogicState.UNDEFINED or d == LogicState.UNDEFINED:
-            self.outputs[0].set_value(LogicState.UNDEFINED)
+        self.outputs[0].set_value(self.clock(self.inputs[1].value, self.inputs[0].value))
+
+
+class _BusNode(Node):
+    """Component whose pins depend on a bus width; ``set_width`` rebuilds
+    them and is only meant for unconnected nodes (creation and loading)."""
+
+    DEFAULT_WIDTH = 8
+
+    def __init__(self, name: str, width: int = None):
+        super().__init__(name)
+        self.width = 0
+        self.set_width(width or self.DEFAULT_WIDTH)
+
+    def set_width(self, width: int):
+        width = max(2, min(MAX_BUS_WIDTH, int(width)))
+        if width == self.width:
             return
-        if en == LogicState.HIGH:
-            self.outputs[0].set_value(LogicState.HIGH if d == LogicState.HIGH else LogicState.LOW)
-        else:
-            self.outputs[0].set_value(LogicState.UNDEFINED)
+        self.width = width
+        self.inputs = []
+        self.outputs = []
+        self._build_pins(width)
+
+    def _build_pins(self, width: int):
+        pass
+
+
+class BusSplitter(_BusNode):
+    """Fans a bus out into one 1-bit output per bit, LSB first."""
+
+    def __init__(self, width: int = None):
+        super().__init__("SPLIT", width)
+
+    def _build_pins(self, width):
+        self.add_input(width)
+        for _ in range(width):
+            self.add_output()
+
+    def compute(self):
+        value = self.inputs[0].value
+        for i, pin in enumerate(self.outputs):
+            if (value.undefined >> i) & 1:
+                pin.set_value(LogicState.UNDEFINED)
+            else:
+                pin.set_value(LogicState.HIGH if (value.bits >> i) & 1 else LogicState.LOW)
+
+
+class BusMerger(_BusNode):
+    """Packs one 1-bit input per bit, LSB first, into a bus."""
+
+    def __init__(self, width: int = None):
+        super().__init__("MERGE", width)
+
+    def _build_pins(self, width):
+        for _ in range(width):
+            self.add_input()
+        self.add_output(width)
+
+    def compute(self):
+        bits = 0
+        undefined = 0
+        for i, pin in enumerate(self.inputs):
+            if pin.value == LogicState.HIGH:
+                bits |= 1 << i
+            elif pin.value == LogicState.UNDEFINED:
+                undefined |= 1 << i
+        self.outputs[0].set_value(BusValue(self.width, bits, undefined))
+
+
+class BusAndGate(_BusNode):
+    """Bitwise AND of two buses; like AndGate, a bit is LOW only if some
+    input bit is a defined LOW."""
+
+    def __init__(self, width: int = None):
+        super().__init__("BAND", width)
+
+    def _build_pins(self, width):
+        self.add_input(width)
+        self.add_input(width)
+        self.add_output(width)
+
+    def compute(self):
+        low = 0
+        for pin in self.inputs:
+            low |= ~(pin.value.bits | pin.value.undefined)
+        self.outputs[0].set_value(BusValue(self.width, ~low, 0))
+
+
+class BusOrGate(_BusNode):
+    """Bitwise OR of two buses; like OrGate, a bit is HIGH only if some
+    input bit is a defined HIGH."""
+
+    def __init__(self, width: int = None):
+        super().__init__("BOR", width)
+
+    def _build_pins(self, width):
+        self.add_input(width)
+        self.add_input(width)
+        self.add_output(width)
+
+    def compute(self):
+        high = 0
+        for pin in self.inputs:
+            high |= pin.value.bits
+        self.outputs[0].set_value(BusValue(self.width, high, 0))
+
+
+class BusXorGate(_BusNode):
+    """Bitwise XOR of two buses; unknown input bits give unknown output bits."""
+
+    def __init__(self, width: int = None):
+        super().__init__("BXOR", width)
+
+    def _build_pins(self, width):
+        self.add_input(width)
+        self.add_input(width)
+        self.add_output(width)
+
+    def compute(self):
+        bits = 0
+        undefined = 0
+        for pin in self.inputs:
+            bits ^= pin.value.bits
+            undefined |= pin.value.undefined
+        self.outputs[0].set_value(BusValue(self.width, bits, undefined))
+
+
+# Built-in node classes by serialized type name. CustomGate is absent on
+# purpose: it needs a chip definition, not just a constructor call.
+NODE_TYPES = {
+    cls.__name__: cls
+    for cls in (
+        AndGate,
+        OrGate,
+        XorGate,
+        NandGate,
+        NorGate,
+        NotGate,
+        InputSwitch,
+        OutputBulb,
+        SevenSegmentDisplay,
+        SevenSegmentDecoder,
+        TriStateBuffer,
+        Clock,
+        DFlipFlop,
+        BusSplitter,
+        BusMerger,
+        BusAndGate,
+        BusOrGate,
+        BusXorGate,
+    )
+}
+
+# Per-node settings saved alongside the type name.
+NODE_PARAMS = ("width", "input_count", "half_period")
+
+
+def create_node(type_name: str):
+    cls = NODE_TYPES.get(type_name)
+    return cls() if cls else None
+
+
+def node_params(node: Node) -> Dict[str, Any]:
+    return {key: getattr(node, key) for key in NODE_PARAMS if hasattr(node, key)}
+
+
+def apply_params(node: Node, params: Dict[str, Any]):
+    """Restore settings from ``node_params`` on a freshly created node."""
+    if params.get("width") is not None and hasattr(node, "set_width"):
+        node.set_width(params["width"])
+    if params.get("input_count") is not None and hasattr(node, "set_inputs"):
+        node.set_inputs(params["input_count"])
+    if params.get("half_period") is not None and hasattr(node, "half_period"):
+        node.half_period = max(1, int(params["half_period"]))
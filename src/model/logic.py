@@ -0,0 +1,117 @@
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from src.model.node import LogicState
+
+# Two-bit value encoding, the same numbers as LogicState.value. Input ``k``
+# of a gate sits in bits ``2k`` and ``2k + 1`` of its packed input word.
+LOW = LogicState.LOW.value
+HIGH = LogicState.HIGH.value
+UNDEFINED = LogicState.UNDEFINED.value
+BITS = 2
+
+STATES = (LogicState.LOW, LogicState.HIGH, LogicState.UNDEFINED)
+
+# Gates with more inputs than this have no table (it would need 4**n rows)
+# and call their kernel instead. Packing a wide word costs a Python loop
+# per input, so from seven inputs on (SevenSegmentDisplay) one membership
+# test over the gathered values is as fast or faster.
+MAX_TABLE_INPUTS = 6
+
+SEGMENTS = {
+    0: (1, 1, 1, 0, 1, 1, 1),
+    1: (0, 1, 1, 0, 0, 0, 0),
+    2: (1, 1, 0, 1, 1, 0, 1),
+    3: (1, 1, 1, 1, 0, 0, 1),
+    4: (0, 1, 1, 1, 0, 1, 0),
+    5: (1, 0, 1, 1, 0, 1, 1),
+    6: (1, 0, 1, 1, 1, 1, 1),
+    7: (1, 1, 1, 0, 0, 0, 0),
+    8: (1, 1, 1, 1, 1, 1, 1),
+    9: (1, 1, 1, 1, 0, 1, 1),
+}
+BLANK = (0, 0, 0, 0, 0, 0, 0)
+
+Kernel = Callable[[Sequence[int]], Tuple[int, ...]]
+
+
+# Kernels take the input values as ints and return a tuple of output ints.
+# They define gate behaviour; the tables below are built from them.
+
+def eval_and(v):
+    return (LOW if LOW in v else HIGH,)
+
+
+def eval_or(v):
+    return (HIGH if HIGH in v else LOW,)
+
+
+def eval_xor(v):
+    if UNDEFINED in v:
+        return (UNDEFINED,)
+    return (sum(v) & 1,)
+
+
+def eval_nand(v):
+    if UNDEFINED in v:
+        return (UNDEFINED,)
+    return (HIGH if LOW in v else LOW,)
+
+
+def eval_nor(v):
+    if UNDEFINED in v:
+        return (UNDEFINED,)
+    return (LOW if HIGH in v else HIGH,)
+
+
+def eval_not(v):
+    return (LOW if v[0] == HIGH else HIGH,)
+
+
+def eval_bufz(v):
+    d, en = v[0], v[1]
+    if en == UNDEFINED or d == UNDEFINED or en != HIGH:
+        return (UNDEFINED,)
+    return (d,)
+
+
+def eval_7seg(v):
+    return (HIGH if HIGH in v else LOW,)
+
+
+def eval_7dec(v):
+    if UNDEFINED in v:
+        return (UNDEFINED,) * 7
+    n = v[0] | (v[1] << 1) | (v[2] << 2) | (v[3] << 3)
+    return SEGMENTS.get(n, BLANK)
+
+
+def pack(values: Sequence[int]) -> int:
+    """Packed input word for a sequence of value ints."""
+    word = 0
+    for k, value in enumerate(values):
+        word |= value << (BITS * k)
+    return word
+
+
+_TABLES: Dict[tuple, Optional[tuple]] = {}
+
+
+def truth_table(kernel: Kernel, inputs: int) -> Optional[tuple]:
+    """Outputs of ``kernel`` for every packed input word, shared per
+    ``(kernel, inputs)``; None if ``inputs`` exceeds MAX_TABLE_INPUTS.
+
+    Words containing the unused code 3 map to None.
+    """
+    key = (kernel, inputs)
+    table = _TABLES.get(key, _TABLES)
+    if table is not _TABLES:
+        return table
+    table = None
+    if inputs <= MAX_TABLE_INPUTS:
+        rows = []
+        for word in range(1 << (BITS * inputs)):
+            values = [(word >> (BITS * k)) & 3 for k in range(inputs)]
+            rows.append(None if 3 in values else kernel(values))
+        table = tuple(rows)
+    _TABLES[key] = table
+    return table
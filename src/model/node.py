@@ -14,6 +14,64 @@ class LogicState(Enum):
     UNDEFINED = 2
 
 
+# Widest bus a pin can carry; a packed word then fits in 64 bits.
+MAX_BUS_WIDTH = 32
+
+
+class BusValue:
+    """Value of a multi-bit pin.
+
+    ``bits`` holds the defined bits and ``undefined`` marks unknown ones.
+    ``value`` packs both into one int, ``bits | undefined << width``,
+    which for a 1-bit pin is the same number as ``LogicState.value``.
+    """
+
+    __slots__ = ("width", "bits", "undefined")
+
+    def __init__(self, width: int, bits: int = 0, undefined: int = None):
+        mask = (1 << width) - 1
+        self.width = width
+        self.undefined = mask if undefined is None else undefined & mask
+        self.bits = bits & mask & ~self.undefined
+
+    @classmethod
+    def unpack(cls, word: int, width: int) -> "BusValue":
+        return cls(width, word, word >> width)
+
+    @property
+    def value(self) -> int:
+        return self.bits | (self.undefined << self.width)
+
+    @property
+    def name(self) -> str:
+        if not self.undefined:
+            return f"0x{self.bits:0{(self.width + 3) // 4}X}"
+        return "0b" + "".join(
+            "X" if (self.undefined >> i) & 1 else str((self.bits >> i) & 1)
+            for i in reversed(range(self.width))
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, BusValue)
+            and self.width == other.width
+            and self.bits == other.bits
+            and self.undefined == other.undefined
+        )
+
+    def __hash__(self):
+        return hash((self.width, self.bits, self.undefined))
+
+    def __repr__(self):
+        return f"BusValue({self.width}, {self.name})"
+
+
+def touch_topology(node: "Node"):
+    """Mark the circuit holding ``node``, if any, as changed."""
+    if node.circuit is not None:
+        node.circuit.revision += 1
+
+
 class Node:
     def __init__(self, name: str = "Node"):
         self.id = str(uuid.uuid4())
@@ -21,19 +79,21 @@ class Node:
         self.inputs: List["Pin"] = []
         self.outputs: List["Pin"] = []
         self.position = (0, 0)
+        # Circuit this node was added to, kept by Circuit.add_node.
+        self.circuit = None
 
     def compute(self):
         """Override this to implement gate logic."""
         pass
 
-    def add_input(self):
-        pin = Pin(self, PinType.INPUT, len(self.inputs))
+    def add_input(self, width: int = 1):
+        pin = Pin(self, PinType.INPUT, len(self.inputs), width)
         pin.name = f"In{len(self.inputs)+1}"
         self.inputs.append(pin)
         return pin
 
-    def add_output(self):
-        pin = Pin(self, PinType.OUTPUT, len(self.outputs))
+    def add_output(self, width: int = 1):
+        pin = Pin(self, PinType.OUTPUT, len(self.outputs), width)
         pin.name = f"Out{len(self.outputs)+1}"
         self.outputs.append(pin)
         return pin
@@ -50,24 +110,33 @@ class Node:
 
 
 class Pin:
-    def __init__(self, node: Node, pin_type: PinType, index: int):
+    def __init__(self, node: Node, pin_type: PinType, index: int, width: int = 1):
         self.id = str(uuid.uuid4())
         self.node = node
         self.type = pin_type
         self.index = index
         self.name = f"P{index}"
         self.connections: List["Pin"] = []
-        self.value = LogicState.UNDEFINED
+        # Pins wider than one bit carry a BusValue instead of a LogicState.
+        self.width = width
+        self.value = LogicState.UNDEFINED if width == 1 else BusValue(width)
 
     def connect(self, other: "Pin"):
+        if other.width != self.width:
+            print(f"Cannot connect a {self.width}-bit pin to a {other.width}-bit pin")
+            return
         if other not in self.connections:
             self.connections.append(other)
             other.connections.append(self)
+            touch_topology(self.node)
+            touch_topology(other.node)
 
     def disconnect(self, other: "Pin"):
         if other in self.connections:
             self.connections.remove(other)
             other.connections.remove(self)
+            touch_topology(self.node)
+            touch_topology(other.node)
 
     def set_value(self, value: LogicState):
         self.value = value
@@ -1,33 +1,49 @@
-import json
-import os
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
-from src.graphics.items.base import GateItem
-from src.graphics.items.wire import WireItem
-from src.graphics.scene import LogicScene
+from src.model.chips import ChipRegistry
 from src.model.circuit import Circuit
-from src.model.gates import AndGate, InputSwitch, NotGate, OrGate, OutputBulb
-from PySide6.QtCore import QPointF
-from PySide6.QtGui import QColor
+from src.model.gates import CustomGate, apply_params, create_node, node_params
+from src.model.node import Node
+
+if TYPE_CHECKING:
+    from src.graphics.scene import LogicScene
+
+
+def _rgba(value):
+    """Plain (r, g, b, a) tuple from a serialized color, or None."""
+    if isinstance(value, (list, tuple)) and len(value) == 4:
+        try:
+            return tuple(int(c) for c in value)
+        except (TypeError, ValueError):
+            return None
+    return None
 
 
 class CircuitSerializer:
     @staticmethod
-    def serialize(circuit: Circuit, scene: LogicScene) -> Dict[str, Any]:
+    def serialize(circuit: Circuit, scene: "LogicScene" = None) -> Dict[str, Any]:
+        """Serialize ``circuit``; layout comes from ``scene`` when given,
+        otherwise from the plain attributes set by ``load_model``."""
         data = {"nodes": [], "wires": []}
+        if circuit.engine:
+            data["engine"] = circuit.engine
 
         node_items = {}
-        for item in scene.items():
-            if isinstance(item, GateItem):
-                node_items[item.node.id] = item
         wire_items = []
-        for item in scene.items():
-            if isinstance(item, WireItem) and item.start_port and item.end_port:
-                wire_items.append(item)
+        if scene is not None:
+            from src.graphics.items.base import GateItem
+            from src.graphics.items.wire import WireItem
+
+            for item in scene.items():
+                if isinstance(item, GateItem):
+                    node_items[item.node.id] = item
+            for item in scene.items():
+                if isinstance(item, WireItem) and item.start_port and item.end_port:
+                    wire_items.append(item)
 
         for node in circuit.nodes:
             item = node_items.get(node.id)
-            pos = (item.pos().x(), item.pos().y()) if item else (0, 0)
+            pos = (item.pos().x(), item.pos().y()) if item else tuple(node.position)
 
             node_data = {
                 "id": node.id,
@@ -39,10 +55,13 @@ class CircuitSerializer:
             }
             if node.__class__.__name__ == "CustomGate":
                 node_data["source_chip_name"] = node.source_chip_name
+            node_data.update(node_params(node))
             # Persist component body color
             if item is not None and hasattr(item, "body_color"):
                 c = item.body_color
                 node_data["body_color"] = [c.red(), c.green(), c.blue(), c.alpha()]
+            elif getattr(node, "body_color", None):
+                node_data["body_color"] = list(node.body_color)
             # Persist pin names and colors (inputs/outputs)
             pin_inputs = []
             pin_outputs = []
@@ -61,24 +80,21 @@ class CircuitSerializer:
                     )
             else:
                 # Fallback when no item is present in the scene
-                for i, pin in enumerate(node.inputs):
+                for pin in node.inputs:
                     col = getattr(pin, "color", None)
-                    if isinstance(col, QColor):
-                        rgba = [col.red(), col.green(), col.blue(), col.alpha()]
-                    else:
-                        rgba = None
-                    pin_inputs.append({"name": pin.name, "color": rgba})
-                for i, pin in enumerate(node.outputs):
+                    pin_inputs.append({"name": pin.name, "color": list(col) if col else None})
+                for pin in node.outputs:
                     col = getattr(pin, "color", None)
-                    if isinstance(col, QColor):
-                        rgba = [col.red(), col.green(), col.blue(), col.alpha()]
-                    else:
-                        rgba = None
-                    pin_outputs.append({"name": pin.name, "color": rgba})
+                    pin_outputs.append({"name": pin.name, "color": list(col) if col else None})
             node_data["pin_inputs"] = pin_inputs
             node_data["pin_outputs"] = pin_outputs
             data["nodes"].append(node_data)
 
+        # Control points of wires loaded without a scene.
+        model_points = {
+            (w["from"].id, w["to"].id): w["points"] for w in circuit.wires if w.get("points")
+        }
+
         visited_wires = set()
 
         def _match_wire(from_node_id, from_pin_idx, to_node_id, to_pin_idx):
@@ -103,151 +119,121 @@ class CircuitSerializer:
                             "to_node": pin.node.id,
                             "to_pin": pin.index,
                         }
-                        w = _match_wire(connected_pin.node.id, connected_pin.index, pin.node.id, pin.index)
-                        if w and w.control_points:
-                            entry["points"] = [(p.x(), p.y()) for p in w.control_points]
+                        if scene is not None:
+                            w = _match_wire(connected_pin.node.id, connected_pin.index, pin.node.id, pin.index)
+                            if w and w.control_points:
+                                entry["points"] = [(p.x(), p.y()) for p in w.control_points]
+                        elif (connected_pin.id, pin.id) in model_points:
+                            entry["points"] = [tuple(p) for p in model_points[(connected_pin.id, pin.id)]]
                         data["wires"].append(entry)
 
         return data
 
     @staticmethod
-    def deserialize(data: Dict[str, Any], circuit: Circuit, scene: LogicScene):
+    def create_node(node_data: Dict[str, Any]) -> Node:
+        cls_name = node_data["type"]
+        if cls_name == "CustomGate":
+            chip_name = node_data.get("source_chip_name", node_data.get("name"))
+            if chip_name:
+                definition = ChipRegistry.load(chip_name)
+                if definition:
+                    return CustomGate(chip_name, definition=definition)
+            return None
+        node = create_node(cls_name)
+        if node:
+            apply_params(node, node_data)
+        return node
+
+    @staticmethod
+    def load_model(data: Dict[str, Any], circuit: Circuit) -> Dict[str, Node]:
+        """Rebuild ``circuit`` from ``data`` without touching Qt.
+
+        Layout and style are kept as plain attributes: ``node.position``,
+        ``node.body_color`` and ``pin.color`` (RGBA tuples), and wire
+        control points in ``circuit.wires``. Returns the saved-id to node map.
+        """
         circuit.clear()
-        scene.clear()
+        circuit.engine = data.get("engine")
 
         id_node_map = {}
-        id_item_map = {}
 
         for node_data in data["nodes"]:
-            cls_name = node_data["type"]
-            node = None
-            if cls_name == "AndGate":
-                node = AndGate()
-            elif cls_name == "OrGate":
-                node = OrGate()
-            elif cls_name == "NotGate":
-                node = NotGate()
-            elif cls_name == "InputSwitch":
-                node = InputSwitch()
-            elif cls_name == "OutputBulb":
-                node = OutputBulb()
-            elif cls_name == "XorGate":
-                from src.model.gates import XorGate
-                node = XorGate()
-            elif cls_name == "NandGate":
-                from src.model.gates import NandGate
-                node = NandGate()
-            elif cls_name == "NorGate":
-                from src.model.gates import NorGate
-                node = NorGate()
-            elif cls_name == "SevenSegmentDisplay":
-                from src.model.gates import SevenSegmentDisplay
-                node = SevenSegmentDisplay()
-            elif cls_name == "SevenSegmentDecoder":
-                from src.model.gates import SevenSegmentDecoder
-                node = SevenSegmentDecoder()
-            elif cls_name == "TriStateBuffer":
-                from src.model.gates import TriStateBuffer
-                node = TriStateBuffer()
-            elif cls_name == "CustomGate":
-                from src.model.gates import CustomGate
-                chip_name = node_data.get("source_chip_name", node_data.get("name"))
-                if chip_name:
-                    lib_path = os.path.join(
-                        os.path.dirname(__file__), "..", "..", "library"
-                    )
-                    filename = os.path.join(lib_path, f"{chip_name}.json")
-                    if os.path.exists(filename):
-                        try:
-                            with open(filename, "r") as f:
-                                chip_data = json.load(f)
-                            node = CustomGate(chip_name, chip_data)
-                        except Exception as e:
-                            print(f"Error loading custom gate {chip_name}: {e}")
-                    else:
-                        print(f"Custom gate file not found: {filename}")
-
-            if node:
-                old_id = node_data["id"]
-                node.name = node_data.get("name", node.name)
-                # Apply pin names and colors before creating graphics items
-                pin_inputs = node_data.get("pin_inputs", [])
-                pin_outputs = node_data.get("pin_outputs", [])
-                for i, info in enumerate(pin_inputs):
-                    if i < len(node.inputs):
-                        nm = info.get("name")
-                        if isinstance(nm, str):
-                            node.inputs[i].name = nm
-                        col = info.get("color")
-                        if isinstance(col, (list, tuple)) and len(col) == 4:
-                            try:
-                                node.inputs[i].color = QColor(int(col[0]), int(col[1]), int(col[2]), int(col[3]))
-                            except Exception:
-                                pass
-                for i, info in enumerate(pin_outputs):
-                    if i < len(node.outputs):
-                        nm = info.get("name")
-                        if isinstance(nm, str):
-                            node.outputs[i].name = nm
-                        col = info.get("color")
-                        if isinstance(col, (list, tuple)) and len(col) == 4:
-                            try:
-                                node.outputs[i].color = QColor(int(col[0]), int(col[1]), int(col[2]), int(col[3]))
-                            except Exception:
-                                pass
-
-                circuit.add_node(node)
-                id_node_map[old_id] = node
-
-                item = GateItem(node)
-                item.setPos(node_data["x"], node_data["y"])
-                # Apply persisted body color if present
-                body = node_data.get("body_color")
-                if isinstance(body, (list, tuple)) and len(body) == 4:
-                    try:
-                        bc = QColor(int(body[0]), int(body[1]), int(body[2]), int(body[3]))
-                        item.body_color = bc
-                        item.setBrush(bc)
-                    except Exception:
-                        pass
-                scene.addItem(item)
-                id_item_map[node] = item
+            node = CircuitSerializer.create_node(node_data)
+            if not node:
+                continue
+            old_id = node_data["id"]
+            node.name = node_data.get("name", node.name)
+            node.position = (node_data.get("x", 0), node_data.get("y", 0))
+            body = _rgba(node_data.get("body_color"))
+            if body:
+                node.body_color = body
+            for pins, infos in (
+                (node.inputs, node_data.get("pin_inputs", [])),
+                (node.outputs, node_data.get("pin_outputs", [])),
+            ):
+                for pin, info in zip(pins, infos):
+                    nm = info.get("name")
+                    if isinstance(nm, str):
+                        pin.name = nm
+                    col = _rgba(info.get("color"))
+                    if col:
+                        pin.color = col
+
+            circuit.add_node(node)
+            id_node_map[old_id] = node
 
         for wire_data in data["wires"]:
             from_node = id_node_map.get(wire_data["from_node"])
             to_node = id_node_map.get(wire_data["to_node"])
+            if not (from_node and to_node):
+                print("Wire mapping error: Node not found")
+                continue
+            try:
+                from_pin = from_node.outputs[wire_data["from_pin"]]
+                to_pin = to_node.inputs[wire_data["to_pin"]]
+            except IndexError:
+                print("Wire mapping error: Pin index out of range")
+                continue
+            circuit.connect(from_pin, to_pin)
+            circuit.wires.append(
+                {"from": from_pin, "to": to_pin, "points": [tuple(p) for p in wire_data.get("points", [])]}
+            )
+
+        return id_node_map
+
+    @staticmethod
+    def attach_graphics(circuit: Circuit, scene: "LogicScene"):
+        """Create scene items for a circuit built by ``load_model``."""
+        from PySide6.QtCore import QPointF
+
+        from src.graphics.items.base import GateItem
+        from src.graphics.items.wire import WireItem
 
-            if from_node and to_node:
-                try:
-                    from_pin = from_node.outputs[wire_data["from_pin"]]
-                    to_pin = to_node.inputs[wire_data["to_pin"]]
-
-                    circuit.connect(from_pin, to_pin)
-
-                    start_item = id_item_map[from_node]
-                    end_item = id_item_map[to_node]
-
-                    start_port_item = start_item.output_ports[wire_data["from_pin"]]
-                    end_port_item = end_item.input_ports[wire_data["to_pin"]]
-
-                    wire_item = WireItem(start_port_item, end_port_item)
-                    scene.addItem(wire_item)
-                    pts = wire_data.get("points", [])
-                    if pts:
-                        wire_item.control_points = [QPointF(x, y) for (x, y) in pts]
-                        wire_item.update_geometry()
-                except IndexError:
-                    print("Wire mapping error: Pin index out of range")
-                except KeyError:
-                    print("Wire mapping error: Node not found")
-                    end_item = id_item_map[to_node]
-
-                    start_port_item = start_item.output_ports[wire_data["from_pin"]]
-                    end_port_item = end_item.input_ports[wire_data["to_pin"]]
-
-                    wire_item = WireItem(start_port_item, end_port_item)
-                    scene.addItem(wire_item)
-                except IndexError:
-                    print("Wire mapping error: Pin index out of range")
-                except KeyError:
-                    print("Wire mapping error: Node not found")
+        scene.clear()
+        id_item_map = {}
+        for node in circuit.nodes:
+            item = GateItem(node)
+            item.setPos(node.position[0], node.position[1])
+            scene.addItem(item)
+            id_item_map[node] = item
+
+        for wire in circuit.wires:
+            from_pin, to_pin = wire["from"], wire["to"]
+            if to_pin not in from_pin.connections:
+                continue
+            start_item = id_item_map.get(from_pin.node)
+            end_item = id_item_map.get(to_pin.node)
+            if start_item is None or end_item is None:
+                continue
+            wire_item = WireItem(
+                start_item.output_ports[from_pin.index], end_item.input_ports[to_pin.index]
+            )
+            scene.addItem(wire_item)
+            if wire["points"]:
+                wire_item.control_points = [QPointF(x, y) for (x, y) in wire["points"]]
+                wire_item.update_geometry()
+
+    @staticmethod
+    def deserialize(data: Dict[str, Any], circuit: Circuit, scene: "LogicScene"):
+        CircuitSerializer.load_model(data, circuit)
+        CircuitSerializer.attach_graphics(circuit, scene)
@@ -0,0 +1,214 @@
+from typing import Dict, List, Sequence, Tuple
+
+from src.model.circuit import Circuit
+from src.model.gates import CustomGate, InputSwitch, OutputBulb
+from src.model.node import LogicState
+from src.simulation.netlist import (BLANK, SEGMENTS, T_7DEC, T_7SEG, T_AND,
+                                    T_BUFZ, T_NAND, T_NOR, T_NOT, T_OBJECT,
+                                    T_OR, T_XOR, CompiledNetlist)
+
+# A packed signal is a pair of ints ``(value, undefined)``: bit k of
+# ``undefined`` marks pattern k as LogicState.UNDEFINED, otherwise bit k of
+# ``value`` says HIGH or LOW. Python ints give any width, not just 64.
+Word = Tuple[int, int]
+
+
+def _and(ins, mask):
+    low = 0
+    for v, u in ins:
+        low |= ~(v | u)
+    return [(~low & mask, 0)]
+
+
+def _or(ins, mask):
+    high = 0
+    for v, u in ins:
+        high |= v & ~u
+    return [(high & mask, 0)]
+
+
+def _xor(ins, mask):
+    par = und = 0
+    for v, u in ins:
+        par ^= v
+        und |= u
+    return [(par & ~und & mask, und)]
+
+
+def _nand(ins, mask):
+    low = und = 0
+    for v, u in ins:
+        low |= ~(v | u)
+        und |= u
+    return [(low & ~und & mask, und)]
+
+
+def _nor(ins, mask):
+    high = und = 0
+    for v, u in ins:
+        high |= v & ~u
+        und |= u
+    return [(~(high | und) & mask, und)]
+
+
+def _not(ins, mask):
+    v, u = ins[0]
+    return [(~(v & ~u) & mask, 0)]
+
+
+def _bufz(ins, mask):
+    (dv, du), (ev, eu) = ins[0], ins[1]
+    defined = ev & ~eu & ~du
+    return [(dv & defined, ~defined & mask)]
+
+
+def _7dec(ins, mask):
+    und = 0
+    for _, u in ins:
+        und |= u
+    digits = []
+    for n in range(16):
+        m = mask & ~und
+        for bit, (v, _) in enumerate(ins[:4]):
+            m &= v if (n >> bit) & 1 else ~v
+        digits.append(m)
+    outs = []
+    for seg in range(7):
+        on = 0
+        for n, m in enumerate(digits):
+            if SEGMENTS.get(n, BLANK)[seg]:
+                on |= m
+        outs.append((on, und))
+    return outs
+
+
+_PACKED_KERNELS = {
+    T_AND: _and,
+    T_OR: _or,
+    T_XOR: _xor,
+    T_NAND: _nand,
+    T_NOR: _nor,
+    T_NOT: _not,
+    T_BUFZ: _bufz,
+    T_7SEG: _or,
+    T_7DEC: _7dec,
+}
+
+
+def constant(state: LogicState, width: int) -> Word:
+    mask = (1 << width) - 1
+    if state == LogicState.HIGH:
+        return (mask, 0)
+    if state == LogicState.LOW:
+        return (0, 0)
+    return (0, mask)
+
+
+def unpack(word: Word, k: int) -> LogicState:
+    v, u = word
+    if (u >> k) & 1:
+        return LogicState.UNDEFINED
+    return LogicState.HIGH if (v >> k) & 1 else LogicState.LOW
+
+
+def stripe(bit: int, width: int) -> int:
+    """Word whose pattern k carries bit ``bit`` of k, for k < width."""
+    run = 1 << bit
+    if run >= width:
+        return 0
+    word = ((1 << run) - 1) << run
+    period = run * 2
+    while period < width:
+        word |= word << period
+        period *= 2
+    return word & ((1 << width) - 1)
+
+
+class PackedSimulator:
+    """Evaluates many input patterns of a combinational circuit at once.
+
+    Inputs and outputs are the circuit's InputSwitch and OutputBulb nodes
+    sorted by name, the same ordering CustomGate uses for its pins.
+    """
+
+    MAX_SWEEPS = 100
+
+    def __init__(self, circuit: Circuit):
+        self.netlist = CompiledNetlist.compile(circuit)
+        self.order, self.acyclic = self.netlist.topological_order()
+        nodes = self.netlist.nodes
+        self.inputs = sorted((n for n in nodes if isinstance(n, InputSwitch)), key=lambda n: n.name)
+        self.outputs = sorted((n for n in nodes if isinstance(n, OutputBulb)), key=lambda n: n.name)
+        self._chips: Dict[int, PackedSimulator] = {}
+        for i, node in enumerate(nodes):
+            if self.netlist.type_codes[i] != T_OBJECT:
+                continue
+            if isinstance(node, CustomGate):
+                self._chips[i] = PackedSimulator(node.internal_circuit)
+            elif not isinstance(node, (InputSwitch, OutputBulb)):
+                raise ValueError(f"{type(node).__name__} is not supported in bit-parallel mode")
+
+    def run(self, input_words: Sequence[Word], width: int) -> List[Word]:
+        """Evaluate ``width`` patterns given one packed word per input."""
+        netlist = self.netlist
+        mask = (1 << width) - 1
+        values = [constant(LogicState(v), width) for v in netlist.net_values]
+        switch_words = {}
+        for node, word in zip(self.inputs, input_words):
+            switch_words[node] = word
+
+        sweeps = 1 if self.acyclic else self.MAX_SWEEPS
+        for _ in range(sweeps):
+            changed = False
+            for i in self.order:
+                node = netlist.nodes[i]
+                ins = [values[n] for n in netlist.in_nets[netlist.in_offsets[i]:netlist.in_offsets[i + 1]]]
+                code = netlist.type_codes[i]
+                if code != T_OBJECT:
+                    outs = _PACKED_KERNELS[code](ins, mask)
+                elif i in self._chips:
+                    chip_outs = self._chips[i].run(ins, width)
+                    # ICs report a bulb as HIGH only when it is lit, LOW otherwise.
+                    outs = [(v & ~u, 0) for v, u in chip_outs]
+                elif isinstance(node, InputSwitch):
+                    outs = [switch_words.get(node, constant(node.state, width))]
+                else:
+                    outs = []
+                for k, word in enumerate(outs):
+                    n = netlist.out_nets[netlist.out_offsets[i] + k]
+                    if values[n] != word:
+                        values[n] = word
+                        changed = True
+            if not changed:
+                break
+
+        results = []
+        for bulb in self.outputs:
+            i = netlist.node_index[bulb]
+            results.append(values[netlist.in_nets[netlist.in_offsets[i]]])
+        return results
+
+    def truth_table(self, width: int = 64) -> List[Tuple[LogicState, ...]]:
+        """Exhaustively evaluate every input combination.
+
+        Row ``p`` holds the outputs for the pattern where input ``b`` is
+        HIGH iff bit ``b`` of ``p`` is set. Patterns are evaluated
+        ``width`` at a time, rounded down to a power of two.
+        """
+        count = len(self.inputs)
+        total = 1 << count
+        width = 1 << (min(width, total).bit_length() - 1)
+        low_bits = [stripe(b, width) for b in range(count)]
+        mask = (1 << width) - 1
+        rows = []
+        for base in range(0, total, width):
+            words = []
+            for b in range(count):
+                if (1 << b) < width:
+                    words.append((low_bits[b], 0))
+                else:
+                    words.append((mask if (base >> b) & 1 else 0, 0))
+            outs = self.run(words, width)
+            for k in range(width):
+                rows.append(tuple(unpack(w, k) for w in outs))
+        return rows
@@ -0,0 +1,247 @@
+from src.simulation.engine import SimulationEngine
+from src.simulation.netlist import (HIGH, LOW, STATES, T_AND, T_NAND, T_NOR,
+                                    T_NOT, T_OR, T_XOR, CompiledNetlist)
+
+# Gates per generated sweep function; keeps each code object small.
+SWEEP_CHUNK = 1000
+
+
+def combinational_order(netlist: CompiledNetlist):
+    """Topological order of the gates between registers, or None on a loop.
+
+    Flip-flops and nodes without inputs (switches, clocks) are sources and
+    are left out, as are nodes without outputs (bulbs), which only display
+    their input nets. Edges into flip-flops are cut, so register feedback
+    is fine and only purely combinational loops fail.
+    """
+    skip = set(netlist.registers)
+    comb = [
+        i for i in range(len(netlist.nodes))
+        if i not in skip
+        and netlist.in_offsets[i + 1] > netlist.in_offsets[i]
+        and netlist.out_offsets[i + 1] > netlist.out_offsets[i]
+    ]
+    members = set(comb)
+    indegree = dict.fromkeys(comb, 0)
+    consumers = {}
+    for i in comb:
+        targets = []
+        for k in range(netlist.out_offsets[i], netlist.out_offsets[i + 1]):
+            n = netlist.out_nets[k]
+            targets.extend(
+                j for j in netlist.fanout[netlist.fanout_offsets[n]:netlist.fanout_offsets[n + 1]]
+                if j in members
+            )
+        consumers[i] = targets
+        for j in targets:
+            indegree[j] += 1
+
+    order = [i for i in comb if indegree[i] == 0]
+    head = 0
+    while head < len(order):
+        i = order[head]
+        head += 1
+        for j in consumers[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                order.append(j)
+    return order if len(order) == len(comb) else None
+
+
+def _expression(code: int, nets: list):
+    """Inline Python expression matching the kernel for ``code``, or None."""
+    refs = [f"v[{n}]" for n in nets]
+    any_low = " or ".join(f"{r} == 0" for r in refs)
+    any_high = " or ".join(f"{r} == 1" for r in refs)
+    any_undef = " or ".join(f"{r} == 2" for r in refs)
+    if code == T_AND:
+        return f"0 if {any_low} else 1"
+    if code == T_OR:
+        return f"1 if {any_high} else 0"
+    if code == T_XOR:
+        return f"2 if {any_undef} else ({' + '.join(refs)}) & 1"
+    if code == T_NAND:
+        return f"2 if {any_undef} else (1 if {any_low} else 0)"
+    if code == T_NOR:
+        return f"2 if {any_undef} else (0 if {any_high} else 1)"
+    if code == T_NOT:
+        return f"0 if {refs[0]} == 1 else 1"
+    return None
+
+
+def compile_sweep(netlist: CompiledNetlist, order: list):
+    """Generate straight-line functions that evaluate ``order`` once.
+
+    Each function takes the net value list ``v``, a callback ``ch`` that
+    receives every net whose value changed, and ``ev`` for nodes that have
+    no inline expression. Returns the list of functions to call in turn.
+    """
+    functions = []
+    for start in range(0, len(order), SWEEP_CHUNK):
+        lines = ["def sweep(v, ch, ev):"]
+        for i in order[start:start + SWEEP_CHUNK]:
+            ins = netlist.in_nets[netlist.in_offsets[i]:netlist.in_offsets[i + 1]]
+            outs = netlist.out_nets[netlist.out_offsets[i]:netlist.out_offsets[i + 1]]
+            expr = _expression(netlist.type_codes[i], ins)
+            if expr is not None:
+                results = [(outs[0], "r")]
+                lines.append(f"    r = {expr}")
+            else:
+                results = [(o, f"r[{k}]") for k, o in enumerate(outs)]
+                lines.append(f"    r = ev({i})")
+            for o, value in results:
+                lines.append(f"    if v[{o}] != {value}:")
+                lines.append(f"        v[{o}] = {value}")
+                lines.append(f"        ch({o})")
+        namespace = {}
+        exec(compile("\n".join(lines), f"<sweep {start}>", "exec"), namespace)
+        functions.append(namespace["sweep"])
+    return functions
+
+
+class CycleEngine(SimulationEngine):
+    """Cycle-based simulation for synchronous designs.
+
+    Time only advances on clock edges. On each edge the changed sources
+    are updated, every flip-flop that sees a rising clock captures its D
+    input (settled by the previous sweep), and the combinational logic is
+    swept once in topological order by generated straight-line code. No
+    per-gate events are scheduled, and edges that change nothing the logic
+    reads (such as falling clock edges) skip the sweep. Designs with
+    combinational loops fall back to event-driven stepping.
+    """
+
+    def __init__(self, circuit, flatten: bool = False):
+        super().__init__(circuit, flatten)
+        self.order = None
+        self.sweeps = []
+        self.registers = []
+        # Nets read by the combinational logic.
+        self.comb_inputs = set()
+        # True when some register clock comes out of combinational logic.
+        self.gated_clocks = False
+        self.edges = 0
+
+    def recompile(self):
+        super().recompile()
+        netlist = self.netlist
+        self.order = combinational_order(netlist)
+        if self.order is None:
+            print("Cycle engine: combinational loop found, using event-driven stepping")
+            return
+        self.sweeps = compile_sweep(netlist, self.order)
+        self.comb_inputs = {
+            n for i in self.order
+            for n in netlist.in_nets[netlist.in_offsets[i]:netlist.in_offsets[i + 1]]
+        }
+        comb_outputs = {
+            n for i in self.order
+            for n in netlist.out_nets[netlist.out_offsets[i]:netlist.out_offsets[i + 1]]
+        }
+        self.registers = []
+        for r in netlist.registers:
+            d_net, clk_net = netlist.in_nets[netlist.in_offsets[r]:netlist.in_offsets[r] + 2]
+            self.registers.append((netlist.nodes[r], d_net, clk_net, netlist.out_nets[netlist.out_offsets[r]]))
+        # Clock value each register saw last, kept as ints in step().
+        self.last_clocks = [node.last_clk.value for node, _, _, _ in self.registers]
+        self.gated_clocks = any(clk in comb_outputs for _, _, clk, _ in self.registers)
+        # Settle everything once against the current sources.
+        self._sweep(self.simulation_time, [])
+
+    def _sweep(self, now: int, changed: list):
+        ev = self.netlist.evaluate
+        if self.stats.profiling:
+            ev = self.stats.timed(ev)
+        for sweep in self.sweeps:
+            sweep(self.netlist.net_values, changed.append, ev)
+        self._dirty_nets.update(changed)
+        if self.recorder is not None:
+            values = self.netlist.net_values
+            for n in changed:
+                self.recorder.record(now, n, values[n])
+        self._since_sync += len(self.order)
+        self.stats.events += len(self.order)
+
+    def _store(self, now: int, n: int, value: int) -> bool:
+        values = self.netlist.net_values
+        if values[n] == value:
+            return False
+        values[n] = value
+        self._dirty_nets.add(n)
+        if self.recorder is not None:
+            self.recorder.record(now, n, value)
+        return True
+
+    def step(self) -> bool:
+        if self._recorder_requests:
+            self._apply_recorder_requests()
+        self.compile_if_needed()
+        if self.order is None:
+            return super().step()
+
+        batch = self.scheduler.pop_due()
+        if batch is None:
+            return False
+        now, events = batch
+
+        netlist = self.netlist
+        stats = self.stats
+        evaluate = stats.timed(netlist.evaluate) if stats.profiling else netlist.evaluate
+        values = netlist.net_values
+        in_offsets = netlist.in_offsets
+        out_offsets = netlist.out_offsets
+        out_nets = netlist.out_nets
+        comb_inputs = self.comb_inputs
+        store = self._store
+        needs_sweep = False
+
+        # Sources: clock ticks and externally triggered switches. Anything
+        # else that was triggered is covered by the sweep.
+        for item in dict.fromkeys(events):
+            if item < 0:
+                i = ~item
+                clock = netlist.nodes[i]
+                clock.tick()
+                self.scheduler.schedule(now + clock.half_period, item)
+                self.edges += 1
+            else:
+                i = item
+                if in_offsets[i + 1] != in_offsets[i]:
+                    needs_sweep = True
+                    continue
+            base = out_offsets[i]
+            stats.events += 1
+            for k, value in enumerate(evaluate(i)):
+                n = out_nets[base + k]
+                if store(now, n, value) and n in comb_inputs:
+                    needs_sweep = True
+
+        if self.gated_clocks and needs_sweep:
+            self._sweep(now, [])
+            needs_sweep = False
+
+        # Every register samples before any of them updates.
+        last_clocks = self.last_clocks
+        captured = []
+        for k, (node, d_net, clk_net, q_net) in enumerate(self.registers):
+            clk = values[clk_net]
+            if clk != last_clocks[k]:
+                if clk == HIGH and last_clocks[k] == LOW:
+                    captured.append((node, q_net, values[d_net]))
+                last_clocks[k] = clk
+                node.last_clk = STATES[clk]
+        for node, q_net, q in captured:
+            node.q = STATES[q]
+            if store(now, q_net, q) and q_net in comb_inputs:
+                needs_sweep = True
+
+        if needs_sweep:
+            self._sweep(now, [])
+
+        stats.events += len(captured)
+        stats.steps += 1
+        stats.note_queue(self.scheduler.pending)
+        self._since_sync += len(captured) + 1
+        if self._since_sync >= self.WRITE_BACK_INTERVAL:
+            self.sync_pins()
+        return True
@@ -1,21 +1,60 @@
-import queue
 import threading
-import time
+from time import perf_counter
 
 from src.model.circuit import Circuit
-from src.model.node import Node, PinType
+from src.model.node import Node
+from src.simulation.netlist import CompiledNetlist
+from src.simulation.scheduler import TimingWheel
+from src.simulation.snapshot import StateSnapshot
+from src.simulation.stats import EngineStats
 
 
 class SimulationEngine:
-    def __init__(self, circuit: Circuit):
+    """Event-driven simulation over a CompiledNetlist.
+
+    Scheduler items are node indexes; a negative item ``~i`` is a clock
+    tick for node ``i``, which toggles the clock, evaluates it and
+    schedules the next tick ``half_period`` later.
+    """
+
+    # Pin objects are refreshed from the net array after this many events
+    # even if the scheduler has not drained (e.g. oscillators).
+    WRITE_BACK_INTERVAL = 4096
+    # Snapshots published per second while the simulation is busy.
+    DEFAULT_PUBLISH_RATE = 60
+
+    def __init__(self, circuit: Circuit, flatten: bool = False):
         self.circuit = circuit
-        self.event_queue = queue.PriorityQueue()
+        # Inline IC internals into one netlist instead of calling CustomGate.compute.
+        self.flatten = flatten
+        self.scheduler = TimingWheel()
         self.running = False
         self.thread = None
         self.lock = threading.Lock()
-        self.simulation_time = 0
-        self.sequence = 0
         self.stop_event = threading.Event()
+        self.netlist = CompiledNetlist()
+        # Nodes triggered before the netlist knew about them.
+        self._unresolved = []
+        self._dirty_nets = set()
+        self._since_sync = 0
+        # Sinks for every net value change (see recorder.py). ``recorder``
+        # is what step() calls: None, the only recorder, or a tee over all.
+        self.recorders = []
+        self.recorder = None
+        self._recorder_requests = []
+        # Net values for painting; see snapshot.py.
+        self.snapshot = StateSnapshot()
+        self.publish_interval = 1.0 / self.DEFAULT_PUBLISH_RATE
+        self._next_publish = 0.0
+        # Nets changed since the last publish; None after a recompile,
+        # when net indexes mean something new.
+        self._unpublished = None
+        # Event rate, queue depth and optional per-node profile; see stats.py.
+        self.stats = EngineStats()
+
+    @property
+    def simulation_time(self) -> int:
+        return self.scheduler.now
 
     def start(self):
         if self.running:
@@ -28,43 +67,219 @@ class SimulationEngine:
     def stop(self):
         self.running = False
         self.stop_event.set()
+        self.scheduler.wake()
         if self.thread:
             self.thread.join()
+        self._apply_recorder_requests()
+
+    def add_recorder(self, recorder):
+        """Start feeding value changes to ``recorder``.
+
+        Recorders are attached and detached on the simulation thread
+        between steps so each one sees a consistent starting state.
+        """
+        self._request_recorder(True, recorder)
+
+    def remove_recorder(self, recorder):
+        """Stop feeding ``recorder`` and close it."""
+        self._request_recorder(False, recorder)
+
+    def _request_recorder(self, add: bool, recorder):
+        with self.lock:
+            self._recorder_requests.append((add, recorder))
+        if self.running:
+            self.scheduler.wake()
+        else:
+            self._apply_recorder_requests()
+
+    def _apply_recorder_requests(self):
+        with self.lock:
+            requests = self._recorder_requests
+            self._recorder_requests = []
+        if not requests:
+            return
+        self.compile_if_needed()
+        for add, recorder in requests:
+            if add and recorder not in self.recorders:
+                recorder.begin(self.netlist, self.simulation_time)
+                self.recorders.append(recorder)
+            elif not add and recorder in self.recorders:
+                self.recorders.remove(recorder)
+                recorder.close()
+        if len(self.recorders) > 1:
+            from src.simulation.recorder import RecorderTee
+            self.recorder = RecorderTee(self.recorders)
+        else:
+            self.recorder = self.recorders[0] if self.recorders else None
 
     def queue_update(self, node: Node, delay: int = 0):
         """Schedule a node update."""
+        indexes = self.netlist.indexes_of(node)
+        if not indexes or self.netlist.stale:
+            with self.lock:
+                self._unresolved.append((self.simulation_time + delay, node))
+            self.scheduler.wake()
+            return
+        self.scheduler.schedule_many(self.simulation_time + delay, indexes)
+
+    def recompile(self):
+        """Rebuild the netlist, carrying pending events over to the new indexes."""
+        old = self.netlist
+        pending = []
+        ticking = {}
+        for t, item in self.scheduler.drain():
+            if item < 0:
+                ticking[old.nodes[~item]] = t
+            else:
+                pending.append((t, old.nodes[item]))
         with self.lock:
-            self.sequence += 1
-            self.event_queue.put((self.simulation_time + delay, self.sequence, node))
+            pending.extend(self._unresolved)
+            self._unresolved = []
 
-    def run(self):
-        while self.running and not self.stop_event.is_set():
-            try:
-                if self.event_queue.empty():
-                    time.sleep(0.01)
-                    continue
+        self.sync_pins()
+        netlist = CompiledNetlist.compile(self.circuit, flatten=self.flatten)
+        self.netlist = netlist
+        self._unpublished = None
+        self.stats.bind(netlist)
+
+        for t, node in pending:
+            self.scheduler.schedule_many(t, netlist.indexes_of(node))
+        self.scheduler.schedule_many(self.simulation_time, netlist.stale_consumers())
+        # Clocks keep their phase; new ones start ticking half a period from now.
+        for i in netlist.clocks:
+            clock = netlist.nodes[i]
+            self.scheduler.schedule(ticking.get(clock, self.simulation_time + clock.half_period), ~i)
+        if self.recorder is not None:
+            self.recorder.remap(netlist)
+
+    def sync_pins(self):
+        """Publish changed net values to the Pin objects read by the UI."""
+        self._since_sync = 0
+        if self._dirty_nets:
+            dirty = self._dirty_nets
+            self._dirty_nets = set()
+            if self._unpublished is not None:
+                self._unpublished |= dirty
+            self.netlist.write_back(dirty)
+
+    def set_publish_rate(self, rate: float):
+        """Publish at most ``rate`` snapshots per second."""
+        self.publish_interval = 1.0 / max(1.0, rate)
+
+    def publish(self):
+        """Copy the current net values into the snapshot read by the UI."""
+        self._next_publish = perf_counter() + self.publish_interval
+        self.sync_pins()
+        changed = self._unpublished
+        if changed is not None and not changed:
+            return
+        self._unpublished = set()
+        self.snapshot.publish(self.netlist, self.simulation_time, self.netlist.net_values, changed)
+
+    def set_profiling(self, enabled: bool):
+        """Collect per-node evaluation counts and compute time."""
+        self.stats.profiling = enabled
+
+    def metrics(self) -> dict:
+        """Current engine counters and rates; see EngineStats.summary."""
+        self.stats.update_rates(self.simulation_time)
+        return self.stats.summary()
 
-                with self.lock:
-                    target_time, _, node = self.event_queue.get_nowait()
+    def dump_stats(self, path: str):
+        """Write the counters and the hottest nodes and ICs to ``path`` as JSON."""
+        self.stats.update_rates(self.simulation_time)
+        self.stats.dump(path)
 
-                self.simulation_time = max(self.simulation_time, target_time)
+    def compile_if_needed(self):
+        if self.netlist.stale or self._unresolved:
+            self.recompile()
 
-                old_outputs = [p.value for p in node.outputs]
-                node.compute()
+    def step(self) -> bool:
+        """Process the next occupied time step. Returns False when idle."""
+        if self._recorder_requests:
+            self._apply_recorder_requests()
+        self.compile_if_needed()
 
-                for i, out_pin in enumerate(node.outputs):
-                    if out_pin.value != old_outputs[i]:
-                        for conn in out_pin.connections:
-                            conn.set_value(out_pin.value)
+        batch = self.scheduler.pop_due()
+        if batch is None:
+            return False
+        now, events = batch
+        # Each node is evaluated at most once per time step. Fanout is
+        # already deduplicated when scheduled; this catches clock ticks and
+        # UI updates landing on the same step as it.
+        indexes = dict.fromkeys(events)
 
-                            if conn.type == PinType.INPUT:
-                                self.queue_update(conn.node, delay=1)
+        netlist = self.netlist
+        stats = self.stats
+        stats.coalesced_events += len(events) - len(indexes)
+        evaluate = stats.timed(netlist.evaluate) if stats.profiling else netlist.evaluate
+        values = netlist.net_values
+        out_offsets = netlist.out_offsets
+        out_nets = netlist.out_nets
+        fanout_offsets = netlist.fanout_offsets
+        fanout = netlist.fanout
+        dirty = self._dirty_nets
+        recorder = self.recorder
+        next_step = []
+        for index in indexes:
+            if index < 0:
+                index = ~index
+                clock = netlist.nodes[index]
+                clock.tick()
+                self.scheduler.schedule(now + clock.half_period, ~index)
+            new_outputs = evaluate(index)
+            base = out_offsets[index]
+            for k, value in enumerate(new_outputs):
+                n = out_nets[base + k]
+                if values[n] != value:
+                    values[n] = value
+                    dirty.add(n)
+                    if recorder is not None:
+                        recorder.record(now, n, value)
+                    next_step.extend(fanout[fanout_offsets[n]:fanout_offsets[n + 1]])
+        if next_step:
+            # All at now + 1, so schedule each node once.
+            unique = list(dict.fromkeys(next_step))
+            stats.coalesced_events += len(next_step) - len(unique)
+            self.scheduler.schedule_many(now + 1, unique)
 
-            except queue.Empty:
-                pass
+        stats.events += len(indexes)
+        stats.steps += 1
+        stats.note_queue(self.scheduler.pending)
+        self._since_sync += len(indexes)
+        if self._since_sync >= self.WRITE_BACK_INTERVAL:
+            self.sync_pins()
+        return True
+
+    def run(self):
+        while self.running and not self.stop_event.is_set():
+            try:
+                if not self.step():
+                    self.publish()
+                    self.scheduler.wait()
+                elif perf_counter() >= self._next_publish:
+                    self.publish()
             except Exception as e:
                 print(f"Simulation Error: {e}")
 
     def trigger_update(self, node: Node):
         """Manually trigger an update (e.g. from UI click)."""
         self.queue_update(node)
+
+
+ENGINE_KINDS = ("event", "levelized", "cycle")
+
+
+def create_engine(circuit: Circuit, kind: str = "event", flatten: bool = False) -> SimulationEngine:
+    """Build the simulation engine selected by ``kind``."""
+    if kind == "levelized":
+        try:
+            from src.simulation.levelized import LevelizedEngine
+        except ImportError as e:
+            print(f"Levelized engine unavailable, using event engine: {e}")
+        else:
+            return LevelizedEngine(circuit, flatten)
+    elif kind == "cycle":
+        from src.simulation.cycle import CycleEngine
+        return CycleEngine(circuit, flatten)
+    return SimulationEngine(circuit, flatten)
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.model.node import LogicState
+from src.simulation.bitparallel import PackedSimulator, constant
+
+# Chips with at most this many inputs get every binary input vector
+# precomputed; anything else is memoized on demand.
+FULL_TABLE_MAX_INPUTS = 10
+LRU_SIZE = 4096
+# Chip definitions (each edited version counts) whose tables are kept.
+TABLE_CACHE_SIZE = 64
+
+_tables: "OrderedDict[tuple, Optional[ChipTable]]" = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+class ChipTable:
+    """Output vectors of a combinational IC keyed by its input vector.
+
+    Keys are tuples of ``LogicState.value`` ints. Misses are evaluated with
+    a one-pattern PackedSimulator run, so results never depend on what the
+    chip computed before.
+    """
+
+    def __init__(self, sim: PackedSimulator):
+        self.sim = sim
+        self.full: Dict[tuple, Tuple[LogicState, ...]] = {}
+        self.recent: "OrderedDict[tuple, Tuple[LogicState, ...]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        count = len(sim.inputs)
+        if count <= FULL_TABLE_MAX_INPUTS:
+            for p, row in enumerate(sim.truth_table()):
+                key = tuple((p >> b) & 1 for b in range(count))
+                self.full[key] = tuple(
+                    LogicState.HIGH if v == LogicState.HIGH else LogicState.LOW for v in row
+                )
+
+    def lookup(self, key: tuple) -> Tuple[LogicState, ...]:
+        outs = self.full.get(key)
+        if outs is not None:
+            self.hits += 1
+            return outs
+        outs = self.recent.get(key)
+        if outs is not None:
+            self.hits += 1
+            self.recent.move_to_end(key)
+            return outs
+        self.misses += 1
+        words = self.sim.run([constant(LogicState(v), 1) for v in key], 1)
+        outs = tuple(LogicState.HIGH if v & ~u & 1 else LogicState.LOW for v, u in words)
+        self.recent[key] = outs
+        if len(self.recent) > LRU_SIZE:
+            self.recent.popitem(last=False)
+        return outs
+
+
+def chip_table(chip) -> Optional[ChipTable]:
+    """Shared table for every instance built from the same definition and
+    the same versions of the chips nested in it.
+
+    Returns None when the chip has feedback or cannot be simulated
+    bit-parallel, in which case it keeps its own fixed-point evaluation.
+    """
+    if len(chip.input_nodes) != len(chip.inputs):
+        return None
+    key = chip.definition_key
+    with _tables_lock:
+        if key in _tables:
+            _tables.move_to_end(key)
+            return _tables[key]
+        try:
+            sim = PackedSimulator(chip.internal_circuit)
+        except ValueError:
+            sim = None
+        table = ChipTable(sim) if sim is not None and sim.acyclic else None
+        _tables[key] = table
+        if len(_tables) > TABLE_CACHE_SIZE:
+            _tables.popitem(last=False)
+        return table
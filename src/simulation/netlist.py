@@ -0,0 +1,352 @@
+from typing import Dict, List, Optional
+
+from src.model.circuit import Circuit
+from src.model.gates import (AndGate, Clock, CustomGate, DFlipFlop, NandGate,
+                             NorGate, NotGate, OrGate, SevenSegmentDecoder,
+                             SevenSegmentDisplay, TriStateBuffer, XorGate)
+from src.model.logic import (BLANK, HIGH, LOW, SEGMENTS, STATES, UNDEFINED,
+                             eval_7dec, eval_7seg, eval_and, eval_bufz,
+                             eval_nand, eval_nor, eval_not, eval_or, eval_xor,
+                             truth_table)
+from src.model.node import BusValue, Node, Pin, PinType
+
+# LOW, HIGH, UNDEFINED, STATES, SEGMENTS and BLANK are also imported from
+# here by the engines.
+
+
+def to_state(word: int, width: int):
+    """Pin value for a net word: a LogicState, or a BusValue for buses."""
+    return STATES[word] if width == 1 else BusValue.unpack(word, width)
+
+
+# Node type codes. T_OBJECT nodes are evaluated through Node.compute().
+T_OBJECT = 0
+T_AND = 1
+T_OR = 2
+T_XOR = 3
+T_NAND = 4
+T_NOR = 5
+T_NOT = 6
+T_BUFZ = 7
+T_7SEG = 8
+T_7DEC = 9
+
+_TYPE_CODES = {
+    AndGate: T_AND,
+    OrGate: T_OR,
+    XorGate: T_XOR,
+    NandGate: T_NAND,
+    NorGate: T_NOR,
+    NotGate: T_NOT,
+    TriStateBuffer: T_BUFZ,
+    SevenSegmentDisplay: T_7SEG,
+    SevenSegmentDecoder: T_7DEC,
+}
+
+# Indexed by type code; T_OBJECT has no kernel.
+KERNELS = (
+    None,
+    eval_and,
+    eval_or,
+    eval_xor,
+    eval_nand,
+    eval_nor,
+    eval_not,
+    eval_bufz,
+    eval_7seg,
+    eval_7dec,
+)
+
+
+class CompiledNetlist:
+    """Flat, integer-indexed view of a Circuit.
+
+    Every connected group of pins becomes one net. Nodes, nets and the
+    relations between them are stored as lists of ints in CSR form:
+    the input nets of node ``i`` are ``in_nets[in_offsets[i]:in_offsets[i + 1]]``
+    and the consumers of net ``n`` are
+    ``fanout[fanout_offsets[n]:fanout_offsets[n + 1]]``.
+    """
+
+    def __init__(self):
+        # (circuit, revision) for the circuit compiled and, when
+        # flattened, every chip circuit inlined into it.
+        self.sources: List[tuple] = []
+        self.nodes: List[Node] = []
+        self.node_index: Dict[Node, int] = {}
+        self.type_codes: List[int] = []
+        # Truth table indexed by packed input word, or None (see logic.py).
+        self.tables: List[Optional[tuple]] = []
+        self.node_inputs: List[tuple] = []
+        self.in_offsets: List[int] = [0]
+        self.in_nets: List[int] = []
+        self.in_pins: List[Pin] = []
+        self.out_offsets: List[int] = [0]
+        self.out_nets: List[int] = []
+        self.fanout_offsets: List[int] = [0]
+        self.fanout: List[int] = []
+        # One int per net; buses pack ``bits | undefined << width``.
+        self.net_values: List[int] = []
+        self.net_widths: List[int] = []
+        self.net_pins: List[tuple] = []
+        self.pin_nets: Dict[Pin, int] = {}
+        # Chain of CustomGate instances enclosing each node (flattened only).
+        self.paths: List[tuple] = []
+        self.chip_members: Dict[Node, List[int]] = {}
+        # Indexes of Clock and DFlipFlop nodes.
+        self.clocks: List[int] = []
+        self.registers: List[int] = []
+
+    @classmethod
+    def compile(cls, circuit: Circuit, flatten: bool = False) -> "CompiledNetlist":
+        """Compile ``circuit``.
+
+        With ``flatten`` every CustomGate is replaced, recursively, by the
+        gates of its internal circuit: chip input pins are wired straight
+        to the internal switches' nets and each internal bulb drives its
+        chip output pin through a one-input OR, which reproduces the
+        chip's HIGH-if-lit-else-LOW outputs.
+        """
+        net = cls()
+        net.sources.append((circuit, circuit.revision))
+
+        # (node, type code, input pins, output pins, enclosing chips)
+        entries = []
+        pins = []
+        links = []
+
+        def collect(nodes, path):
+            for node in nodes:
+                pins.extend(node.inputs)
+                pins.extend(node.outputs)
+                if not (flatten and isinstance(node, CustomGate)):
+                    entries.append((node, _TYPE_CODES.get(type(node), T_OBJECT), node.inputs, node.outputs, path))
+                    continue
+                inner = path + (node,)
+                net.sources.append((node.internal_circuit, node.internal_circuit.revision))
+                first = len(entries)
+                switches = set()
+                for pin, switch in zip(node.inputs, node.input_nodes):
+                    links.append((pin, switch.outputs[0]))
+                    switches.add(switch)
+                bulbs = dict(zip(node.output_nodes, node.outputs))
+                for child in node.internal_circuit.nodes:
+                    if child in switches:
+                        pins.extend(child.outputs)
+                    elif child in bulbs:
+                        pins.extend(child.inputs)
+                        pins.append(bulbs[child])
+                        entries.append((child, T_OR, child.inputs[:1], [bulbs[child]], inner))
+                    else:
+                        collect([child], inner)
+                net.chip_members[node] = list(range(first, len(entries)))
+
+        collect(list(circuit.nodes), ())
+
+        # Union-find over pin connections gives one net per connected group.
+        parent = {pin: pin for pin in pins}
+
+        def find(pin):
+            root = pin
+            while parent[root] is not root:
+                root = parent[root]
+            while parent[pin] is not root:
+                parent[pin], pin = root, parent[pin]
+            return root
+
+        def union(a, b):
+            a, b = find(a), find(b)
+            if a is not b:
+                parent[b] = a
+
+        for pin in pins:
+            for other in pin.connections:
+                if other in parent:
+                    union(pin, other)
+        for a, b in links:
+            union(a, b)
+
+        net_of = net.pin_nets
+        groups = []
+        roots = {}
+        for pin in parent:
+            root = find(pin)
+            idx = roots.get(root)
+            if idx is None:
+                idx = len(groups)
+                roots[root] = idx
+                groups.append([])
+            net_of[pin] = idx
+            groups[idx].append(pin)
+
+        # A net starts at its first driver's value, or its own value if undriven.
+        for group in groups:
+            driver = next((p for p in group if p.type == PinType.OUTPUT), group[0])
+            net.net_values.append(driver.value.value)
+            net.net_widths.append(driver.width)
+            net.net_pins.append(tuple(group))
+
+        consumers = [[] for _ in groups]
+        for i, (node, code, in_pins, out_pins, path) in enumerate(entries):
+            net.nodes.append(node)
+            net.node_index[node] = i
+            net.type_codes.append(code)
+            net.tables.append(truth_table(KERNELS[code], len(in_pins)) if code != T_OBJECT else None)
+            net.paths.append(path)
+            if isinstance(node, Clock):
+                net.clocks.append(i)
+            elif isinstance(node, DFlipFlop):
+                net.registers.append(i)
+            for pin in in_pins:
+                n = net_of[pin]
+                net.in_nets.append(n)
+                net.in_pins.append(pin)
+                consumers[n].append(i)
+            net.in_offsets.append(len(net.in_nets))
+            net.node_inputs.append(tuple(net.in_nets[net.in_offsets[-2]:]))
+            for pin in out_pins:
+                net.out_nets.append(net_of[pin])
+            net.out_offsets.append(len(net.out_nets))
+
+        for fan in consumers:
+            net.fanout.extend(fan)
+            net.fanout_offsets.append(len(net.fanout))
+        return net
+
+    @property
+    def has_buses(self) -> bool:
+        return any(w > 1 for w in self.net_widths)
+
+    @property
+    def stale(self) -> bool:
+        return not self.sources or any(c.revision != r for c, r in self.sources)
+
+    def index_of(self, node: Node):
+        return self.node_index.get(node)
+
+    def indexes_of(self, node: Node) -> List[int]:
+        """Indexes evaluated for ``node``: itself, or a flattened chip's gates."""
+        index = self.node_index.get(node)
+        if index is not None:
+            return [index]
+        return self.chip_members.get(node, [])
+
+    def value_of(self, pin: Pin):
+        """Current value of any compiled pin, including pins inside flattened chips."""
+        return to_state(self.net_values[self.pin_nets[pin]], pin.width)
+
+    def stale_consumers(self) -> List[int]:
+        """Nodes whose input pins disagree with the net they sit on."""
+        values = self.net_values
+        result = []
+        for i in range(len(self.nodes)):
+            for k in range(self.in_offsets[i], self.in_offsets[i + 1]):
+                if self.in_pins[k].value.value != values[self.in_nets[k]]:
+                    result.append(i)
+                    break
+        return result
+
+    def evaluate(self, i: int, values=None) -> tuple:
+        """Compute node ``i`` and return its output values as ints.
+
+        ``values`` defaults to ``net_values`` but may be any int sequence
+        indexed by net, such as a NumPy state array.
+        """
+        if values is None:
+            values = self.net_values
+        nets = self.node_inputs[i]
+        table = self.tables[i]
+        if table is not None:
+            if len(nets) == 2:
+                return table[values[nets[0]] | values[nets[1]] << 2]
+            if len(nets) == 1:
+                return table[values[nets[0]]]
+            word = 0
+            shift = 0
+            for n in nets:
+                word |= values[n] << shift
+                shift += 2
+            return table[word]
+        kernel = KERNELS[self.type_codes[i]]
+        if kernel is not None:
+            return kernel([values[n] for n in nets])
+
+        a, b = self.in_offsets[i], self.in_offsets[i + 1]
+        for pin, n in zip(self.in_pins[a:b], self.in_nets[a:b]):
+            pin.value = STATES[values[n]] if pin.width == 1 else BusValue.unpack(values[n], pin.width)
+        node = self.nodes[i]
+        node.compute()
+        return tuple(p.value.value for p in node.outputs)
+
+    def write_back(self, nets):
+        """Copy the given net values onto their Pin objects."""
+        values = self.net_values
+        widths = self.net_widths
+        for n in nets:
+            state = to_state(values[n], widths[n])
+            for pin in self.net_pins[n]:
+                pin.value = state
+
+    def write_back_all(self):
+        self.write_back(range(len(self.net_values)))
+
+    def topological_order(self):
+        """Return ``(order, acyclic)``.
+
+        Nodes on feedback loops cannot be ordered and are appended at the
+        end in circuit order, in which case ``acyclic`` is False.
+        """
+        count = len(self.nodes)
+        indegree = [0] * count
+        for i in range(count):
+            for k in range(self.out_offsets[i], self.out_offsets[i + 1]):
+                n = self.out_nets[k]
+                for f in range(self.fanout_offsets[n], self.fanout_offsets[n + 1]):
+                    indegree[self.fanout[f]] += 1
+
+        order = [i for i in range(count) if indegree[i] == 0]
+        head = 0
+        while head < len(order):
+            i = order[head]
+            head += 1
+            for k in range(self.out_offsets[i], self.out_offsets[i + 1]):
+                n = self.out_nets[k]
+                for f in range(self.fanout_offsets[n], self.fanout_offsets[n + 1]):
+                    j = self.fanout[f]
+                    indegree[j] -= 1
+                    if indegree[j] == 0:
+                        order.append(j)
+
+        acyclic = len(order) == count
+        if not acyclic:
+            seen = set(order)
+            order.extend(i for i in range(count) if i not in seen)
+        return order, acyclic
+
+    def levels(self):
+        """Group nodes into levels for a single ordered sweep.
+
+        A node's level is one more than the deepest node driving any of its
+        inputs, so every level only depends on earlier ones. Returns None
+        if the circuit has feedback.
+        """
+        order, acyclic = self.topological_order()
+        if not acyclic:
+            return None
+        drivers = [[] for _ in self.net_values]
+        for i in range(len(self.nodes)):
+            for k in range(self.out_offsets[i], self.out_offsets[i + 1]):
+                drivers[self.out_nets[k]].append(i)
+
+        level = [0] * len(self.nodes)
+        result = []
+        for i in order:
+            depth = 0
+            for k in range(self.in_offsets[i], self.in_offsets[i + 1]):
+                for d in drivers[self.in_nets[k]]:
+                    depth = max(depth, level[d] + 1)
+            level[i] = depth
+            while len(result) <= depth:
+                result.append([])
+            result[depth].append(i)
+        return result
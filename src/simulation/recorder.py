@@ -0,0 +1,247 @@
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from src.model.node import Pin, PinType
+from src.simulation.netlist import CompiledNetlist
+
+VCD_VALUES = "01x"
+
+
+def _identifier(index: int) -> str:
+    """Short VCD identifier built from the printable ASCII range."""
+    chars = []
+    while True:
+        index, rem = divmod(index, 94)
+        chars.append(chr(33 + rem))
+        if index == 0:
+            return "".join(chars)
+        index -= 1
+
+
+def signal_name(pin: Pin) -> str:
+    node = pin.node
+    name = f"{node.name}_{str(node.id)[:4]}.{pin.name}"
+    return "".join(c if c.isalnum() or c in "._" else "_" for c in name)
+
+
+class ChangeRecorder:
+    """Base for consumers of the engine's net value changes.
+
+    The simulation thread writes ``(time, net, value)`` into three
+    preallocated arrays used as a single-producer ring buffer; a consumer
+    thread hands them to ``_consume``. When the buffer is full the producer
+    waits for the consumer, so memory stays bounded and no change is lost.
+
+    Every net that has pins when recording begins becomes a signal. After a
+    recompile, nets are mapped back to their signal through those pins.
+    """
+
+    def __init__(self, capacity: int = 1 << 16):
+        # Values are net words: 0/1/2 for single bits, packed for buses.
+        # Capacity is rounded up to a power of two so slots are a mask away.
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.capacity = size
+        self._mask = size - 1
+        self._times = array("q", bytes(8 * size))
+        self._nets = array("l", [0]) * size
+        self._values = array("Q", bytes(8 * size))
+        self._head = 0
+        self._tail = 0
+        self._ready = threading.Event()
+        self._space = threading.Event()
+        self._closing = False
+        self._thread = None
+        # Signal index of each net in the current netlist, or None.
+        self._signal_of: List[Optional[int]] = []
+        self._pin_signals: Dict[Pin, int] = {}
+        self.recorded = 0
+
+    def begin(self, netlist: CompiledNetlist, time: int):
+        """Register the current nets as signals and start the consumer thread."""
+        names = []
+        widths = []
+        initial = []
+        self._signal_of = []
+        for n, pins in enumerate(netlist.net_pins):
+            if not pins:
+                self._signal_of.append(None)
+                continue
+            signal = len(names)
+            driver = next((p for p in pins if p.type == PinType.OUTPUT), pins[0])
+            names.append(signal_name(driver))
+            widths.append(netlist.net_widths[n])
+            initial.append(netlist.net_values[n])
+            self._signal_of.append(signal)
+            for pin in pins:
+                self._pin_signals[pin] = signal
+        self._open(names, widths, initial, time)
+
+        self._thread = threading.Thread(target=self._consume_loop, daemon=True)
+        self._thread.start()
+
+    def record(self, time: int, net: int, value: int):
+        head = self._head
+        if head - self._tail > self._mask:
+            self._wait_for_space(head)
+        slot = head & self._mask
+        self._times[slot] = time
+        self._nets[slot] = net
+        self._values[slot] = value
+        self._head = head + 1
+        if head & (self._mask >> 1) == 0:
+            self._ready.set()
+
+    def _wait_for_space(self, head: int):
+        while head - self._tail > self._mask:
+            self._space.clear()
+            self._ready.set()
+            self._space.wait(0.1)
+
+    def remap(self, netlist: CompiledNetlist):
+        """Follow a recompiled netlist. Nets made only of new pins stay unrecorded."""
+        self.flush()
+        signal_of = []
+        for pins in netlist.net_pins:
+            signal = None
+            for pin in pins:
+                signal = self._pin_signals.get(pin)
+                if signal is not None:
+                    break
+            signal_of.append(signal)
+        self._signal_of = signal_of
+
+    def flush(self):
+        """Block until everything recorded so far has been consumed."""
+        head = self._head
+        while self._tail < head and self._thread is not None and self._thread.is_alive():
+            self._space.clear()
+            self._ready.set()
+            self._space.wait(0.1)
+
+    def close(self):
+        if self._thread is None:
+            return
+        self.flush()
+        self._closing = True
+        self._ready.set()
+        self._thread.join()
+        self._thread = None
+        self._close()
+
+    def _consume_loop(self):
+        while True:
+            self._ready.wait(0.05)
+            self._ready.clear()
+            self._drain()
+            self._space.set()
+            if self._closing:
+                self._drain()
+                return
+
+    def _drain(self):
+        tail, head = self._tail, self._head
+        if tail == head:
+            return
+        self._consume(tail, head)
+        self.recorded += head - tail
+        self._tail = head
+
+    def _changes(self, tail: int, head: int):
+        """Yield ``(time, signal, value)`` for buffered changes of known signals."""
+        mask = self._mask
+        times, nets, values = self._times, self._nets, self._values
+        signal_of = self._signal_of
+        count = len(signal_of)
+        for k in range(tail, head):
+            slot = k & mask
+            net = nets[slot]
+            signal = signal_of[net] if net < count else None
+            if signal is not None:
+                yield times[slot], signal, values[slot]
+
+    def _open(self, names: List[str], widths: List[int], initial: List[int], time: int):
+        pass
+
+    def _consume(self, tail: int, head: int):
+        pass
+
+    def _close(self):
+        pass
+
+
+class VcdRecorder(ChangeRecorder):
+    """Streams net value changes to a Value Change Dump file."""
+
+    def __init__(self, path: str, capacity: int = 1 << 16, timescale: str = "1ns"):
+        super().__init__(capacity)
+        self.path = path
+        self.timescale = timescale
+        self._file = None
+        self._codes: List[str] = []
+        self._widths: List[int] = []
+        self._last_time = None
+
+    def _format(self, signal: int, word: int) -> str:
+        width = self._widths[signal]
+        if width == 1:
+            return f"{VCD_VALUES[word]}{self._codes[signal]}"
+        bits = "".join(
+            "x" if (word >> (width + i)) & 1 else "01"[(word >> i) & 1]
+            for i in reversed(range(width))
+        )
+        return f"b{bits} {self._codes[signal]}"
+
+    def _open(self, names, widths, initial, time):
+        self._file = open(self.path, "w")
+        self._codes = [_identifier(s) for s in range(len(names))]
+        self._widths = widths
+        lines = [f"$timescale {self.timescale} $end", "$scope module circuit $end"]
+        for code, name, width in zip(self._codes, names, widths):
+            lines.append(f"$var wire {width} {code} {name} $end")
+        lines.append("$upscope $end")
+        lines.append("$enddefinitions $end")
+        lines.append(f"#{time}")
+        lines.append("$dumpvars")
+        for signal, value in enumerate(initial):
+            lines.append(self._format(signal, value))
+        lines.append("$end")
+        self._file.write("\n".join(lines) + "\n")
+        self._last_time = time
+
+    def _consume(self, tail, head):
+        codes = self._codes
+        widths = self._widths
+        last = self._last_time
+        lines = []
+        for t, signal, value in self._changes(tail, head):
+            if t != last:
+                lines.append(f"#{t}")
+                last = t
+            if widths[signal] == 1:
+                lines.append(f"{VCD_VALUES[value]}{codes[signal]}")
+            else:
+                lines.append(self._format(signal, value))
+        self._last_time = last
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+
+    def _close(self):
+        self._file.close()
+
+
+class RecorderTee:
+    """Forwards the engine's recorder calls to several recorders."""
+
+    def __init__(self, recorders: list):
+        self.recorders = list(recorders)
+
+    def record(self, time: int, net: int, value: int):
+        for recorder in self.recorders:
+            recorder.record(time, net, value)
+
+    def remap(self, netlist: CompiledNetlist):
+        for recorder in self.recorders:
+            recorder.remap(netlist)
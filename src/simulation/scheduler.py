@@ -0,0 +1,122 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class TimingWheel:
+    """Bucket queue keyed by integer simulation time.
+
+    Events within ``size`` steps of the current time live in a ring of
+    lists; anything further out waits in ``overflow`` until the wheel
+    reaches it. All state is guarded by one condition variable, so the
+    simulation thread can sleep until work arrives instead of polling.
+    """
+
+    def __init__(self, size: int = 64):
+        self.size = size
+        self.slots: List[list] = [[] for _ in range(size)]
+        self.overflow: Dict[int, list] = {}
+        self.now = 0
+        self.pending = 0
+        self.in_wheel = 0
+        self.condition = threading.Condition()
+        self._woken = False
+
+    def _put(self, time: int, items: list):
+        if time < self.now:
+            time = self.now
+        if time - self.now < self.size:
+            self.slots[time % self.size].extend(items)
+            self.in_wheel += len(items)
+        else:
+            self.overflow.setdefault(time, []).extend(items)
+        self.pending += len(items)
+
+    def schedule(self, time: int, item):
+        with self.condition:
+            self._put(time, [item])
+            self.condition.notify()
+
+    def schedule_many(self, time: int, items: list):
+        """Add a batch of events for one time step under a single lock."""
+        if not items:
+            return
+        with self.condition:
+            self._put(time, items)
+            self.condition.notify()
+
+    def pop_due(self) -> Optional[Tuple[int, list]]:
+        """Remove and return ``(time, items)`` for the earliest occupied step."""
+        with self.condition:
+            if not self.pending:
+                return None
+            size = self.size
+            while True:
+                slot_index = self.now % size
+                items = self.slots[slot_index]
+                if items:
+                    self.slots[slot_index] = []
+                    self.pending -= len(items)
+                    self.in_wheel -= len(items)
+                    return self.now, items
+                if not self.in_wheel:
+                    # Only far-future events remain; jump straight to them.
+                    self.now = max(self.now + 1, min(self.overflow) - size + 1)
+                else:
+                    self.now += 1
+                if self.overflow:
+                    self._refill()
+
+    def next_time(self) -> Optional[int]:
+        """Earliest time with pending events, or None when empty."""
+        with self.condition:
+            if not self.pending:
+                return None
+            if self.in_wheel:
+                for step in range(self.size):
+                    if self.slots[(self.now + step) % self.size]:
+                        return self.now + step
+            return min(self.overflow)
+
+    def _refill(self):
+        horizon = self.now + self.size
+        for time in [t for t in self.overflow if t < horizon]:
+            items = self.overflow.pop(time)
+            self.slots[time % self.size].extend(items)
+            self.in_wheel += len(items)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until events are pending or wake() is called."""
+        with self.condition:
+            if not self.pending and not self._woken:
+                self.condition.wait_for(lambda: self.pending or self._woken, timeout)
+            self._woken = False
+            return bool(self.pending)
+
+    def wake(self):
+        with self.condition:
+            self._woken = True
+            self.condition.notify_all()
+
+    def advance_to(self, time: int):
+        """Move the current time forward; only valid while nothing is pending."""
+        with self.condition:
+            if not self.pending and time > self.now:
+                self.now = time
+
+    def drain(self) -> List[Tuple[int, object]]:
+        """Remove every pending event, returning ``(time, item)`` pairs."""
+        with self.condition:
+            events = []
+            for i in range(self.size):
+                items = self.slots[i]
+                if items:
+                    # Slot i holds the unique time in [now, now + size) with t % size == i.
+                    time = self.now + (i - self.now) % self.size
+                    events.extend((time, item) for item in items)
+                    self.slots[i] = []
+            for time, items in self.overflow.items():
+                events.extend((time, item) for item in items)
+            self.overflow.clear()
+            self.pending = 0
+            self.in_wheel = 0
+            return events
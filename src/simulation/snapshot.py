@@ -0,0 +1,66 @@
+from typing import List, Optional, Set
+
+from src.model.node import Pin
+from src.simulation.netlist import CompiledNetlist, to_state
+
+
+class SnapshotBuffer:
+    __slots__ = ("generation", "netlist", "values", "time", "changed")
+
+    def __init__(self):
+        # -1 while the simulation thread is writing into this buffer.
+        self.generation = 0
+        self.netlist: Optional[CompiledNetlist] = None
+        self.values: List[int] = []
+        self.time = 0
+        # Nets that changed since the previous generation; None means any.
+        self.changed: Optional[Set[int]] = None
+
+    def value_of(self, pin: Pin):
+        """Published value of ``pin``, or None if it was not compiled yet."""
+        n = self.netlist.pin_nets.get(pin) if self.netlist is not None else None
+        if n is None or n >= len(self.values):
+            return None
+        return to_state(self.values[n], pin.width)
+
+
+class StateSnapshot:
+    """Net values published by the simulation thread for the UI to paint.
+
+    Two buffers take turns: ``publish`` fills the one that is not current
+    and then makes it current by storing the new ``generation``, a single
+    attribute write. Readers take no lock. A buffer returned by ``read``
+    is only overwritten two publishes later, so it stays consistent for a
+    whole frame at any sensible publish rate.
+
+    ``listener``, if set, is called with no arguments after each publish,
+    on the publishing thread.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._buffers = (SnapshotBuffer(), SnapshotBuffer())
+        self.listener = None
+
+    def publish(self, netlist: CompiledNetlist, time: int, values: List[int], changed: Set[int] = None):
+        generation = self.generation + 1
+        buffer = self._buffers[generation & 1]
+        buffer.generation = -1
+        buffer.netlist = netlist
+        buffer.values[:] = values
+        buffer.time = time
+        # The caller hands over ``changed`` and must not modify it after.
+        buffer.changed = changed
+        buffer.generation = generation
+        self.generation = generation
+        listener = self.listener
+        if listener is not None:
+            listener()
+
+    def read(self) -> SnapshotBuffer:
+        while True:
+            generation = self.generation
+            buffer = self._buffers[generation & 1]
+            # A mismatch means two publishes raced this read; try again.
+            if buffer.generation == generation:
+                return buffer
@@ -0,0 +1,210 @@
+import json
+import threading
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from src.model.node import Node
+from src.simulation.netlist import CompiledNetlist
+
+# Rates are averaged over at least this much wall time, in seconds.
+RATE_WINDOW = 0.5
+
+
+def _label(node: Node) -> str:
+    return f"{node.name} {str(node.id)[:4]}"
+
+
+class EngineStats:
+    """Counters the simulation thread keeps while it runs.
+
+    ``events`` counts node evaluations and ``steps`` occupied time steps;
+    ``coalesced_events`` counts duplicate same-step events dropped because
+    the node was already due then. ``queue_depth`` is the number of events still scheduled after the last
+    step. These cost a few integer updates per step and are always on.
+
+    Per-node evaluation counts and cumulative compute time are collected
+    only while ``profiling`` is set, since they time every evaluation.
+    They are kept per node of the current netlist and folded into totals
+    keyed by Node on recompile, so they survive edits. A flattened IC's
+    gates are also summed into the top-level IC instance that holds them.
+    Nodes evaluated in bulk (levelized NumPy sweeps, the cycle engine's
+    generated sweeps) are counted as events but not profiled one by one.
+
+    The integer counters are read by other threads without a lock and
+    may be a step behind. Everything else that spans several fields
+    (folding on recompile, ``reset``, ``update_rates`` and the per-node
+    readers) takes ``_lock``, since the GUI reads them while the
+    simulation thread recompiles.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self.steps = 0
+        self.coalesced_events = 0
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+        self.profiling = False
+        self._lock = threading.Lock()
+        self._netlist: Optional[CompiledNetlist] = None
+        self._counts: List[int] = []
+        self._times: List[float] = []
+        # node -> [evaluations, seconds] from earlier netlists.
+        self._totals: Dict[Node, list] = {}
+        # node -> enclosing CustomGate chain, outermost first.
+        self._paths: Dict[Node, tuple] = {}
+        self._started = perf_counter()
+        # (wall time, events, simulation time) at the start of the rate window.
+        self._sample = (self._started, 0, 0)
+        self.events_per_second = 0.0
+        self.sim_time_rate = 0.0
+
+    def bind(self, netlist: CompiledNetlist):
+        """Start per-node figures for a new netlist, keeping the old ones."""
+        with self._lock:
+            self._fold()
+            self._netlist = netlist
+            self._counts = [0] * len(netlist.nodes)
+            self._times = [0.0] * len(netlist.nodes)
+
+    def _fold(self):
+        netlist = self._netlist
+        if netlist is None:
+            return
+        for i, count in enumerate(self._counts):
+            if not count:
+                continue
+            node = netlist.nodes[i]
+            total = self._totals.setdefault(node, [0, 0.0])
+            total[0] += count
+            total[1] += self._times[i]
+            if netlist.paths and netlist.paths[i]:
+                self._paths[node] = netlist.paths[i]
+        self._counts = [0] * len(self._counts)
+        self._times = [0.0] * len(self._times)
+
+    def timed(self, evaluate):
+        """Wrap ``CompiledNetlist.evaluate`` to count and time each call."""
+        counts = self._counts
+        times = self._times
+
+        def run(i, values=None):
+            start = perf_counter()
+            result = evaluate(i, values)
+            times[i] += perf_counter() - start
+            counts[i] += 1
+            return result
+
+        return run
+
+    def note_queue(self, depth: int):
+        self.queue_depth = depth
+        if depth > self.peak_queue_depth:
+            self.peak_queue_depth = depth
+
+    def reset(self):
+        """Clear every counter; ``profiling`` stays as it is. The next
+        simulation time rate starts from the first window after this."""
+        with self._lock:
+            self.events = 0
+            self.steps = 0
+            self.coalesced_events = 0
+            self.queue_depth = 0
+            self.peak_queue_depth = 0
+            self._counts = [0] * len(self._counts)
+            self._times = [0.0] * len(self._times)
+            self._totals = {}
+            self._paths = {}
+            self._started = perf_counter()
+            self._sample = (self._started, 0, None)
+            self.events_per_second = 0.0
+            self.sim_time_rate = 0.0
+
+    def update_rates(self, sim_time: int):
+        """Refresh ``events_per_second`` and ``sim_time_rate`` (time units
+        per wall second) once at least RATE_WINDOW has passed."""
+        with self._lock:
+            now = perf_counter()
+            then, events, time = self._sample
+            elapsed = now - then
+            if elapsed < RATE_WINDOW:
+                return
+            self.events_per_second = (self.events - events) / elapsed
+            self.sim_time_rate = (sim_time - time) / elapsed if time is not None else 0.0
+            self._sample = (now, self.events, sim_time)
+
+    def _figures(self):
+        """Copies of the per-node figures and IC paths, taken under the lock."""
+        with self._lock:
+            figures = {node: list(total) for node, total in self._totals.items()}
+            paths = dict(self._paths)
+            netlist = self._netlist
+            counts, times = list(self._counts), list(self._times)
+        if netlist is not None:
+            for i, count in enumerate(counts):
+                if count:
+                    node = netlist.nodes[i]
+                    total = figures.setdefault(node, [0, 0.0])
+                    total[0] += count
+                    total[1] += times[i]
+                    if netlist.paths and netlist.paths[i]:
+                        paths.setdefault(node, netlist.paths[i])
+        return figures, paths
+
+    def node_figures(self) -> Dict[Node, list]:
+        """``[evaluations, seconds]`` per profiled node, all netlists included."""
+        return self._figures()[0]
+
+    def hot_spots(self, limit: int = 10, by_instance: bool = False) -> List[dict]:
+        """Profiled nodes by cumulative compute time, most expensive first.
+
+        With ``by_instance`` the gates of flattened ICs are summed into
+        their top-level IC, so each entry is something placed on the canvas.
+        """
+        figures, paths = self._figures()
+        if by_instance:
+            grouped = {}
+            for node, (count, seconds) in figures.items():
+                path = paths.get(node)
+                owner = path[0] if path else node
+                total = grouped.setdefault(owner, [0, 0.0])
+                total[0] += count
+                total[1] += seconds
+            figures = grouped
+        ranked = sorted(figures.items(), key=lambda item: (item[1][1], item[1][0]), reverse=True)
+        result = []
+        for node, (count, seconds) in ranked[:limit]:
+            path = () if by_instance else paths.get(node, ())
+            result.append({
+                "node": _label(node),
+                "type": type(node).__name__,
+                "ic": " / ".join(_label(chip) for chip in path) or None,
+                "evaluations": count,
+                "seconds": seconds,
+                "us_per_eval": seconds / count * 1e6 if count else 0.0,
+            })
+        return result
+
+    def summary(self) -> dict:
+        """Engine-wide counters and rates as plain numbers."""
+        return {
+            "events": self.events,
+            "steps": self.steps,
+            "coalesced_events": self.coalesced_events,
+            "events_per_second": self.events_per_second,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "sim_time_rate": self.sim_time_rate,
+            "wall_seconds": perf_counter() - self._started,
+            "profiling": self.profiling,
+        }
+
+    def to_dict(self, limit: int = 50) -> dict:
+        data = self.summary()
+        data["hot_nodes"] = self.hot_spots(limit)
+        data["hot_instances"] = self.hot_spots(limit, by_instance=True)
+        return data
+
+    def dump(self, path: str, limit: int = 50):
+        """Write ``to_dict()`` to ``path`` as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(limit), f, indent=2)
@@ -0,0 +1,148 @@
+from array import array
+from bisect import bisect_right
+from typing import List
+
+from src.simulation.recorder import ChangeRecorder
+
+# Values are stored as ranks so UNDEFINED sits between LOW and HIGH and a
+# min/max band over mixed values covers every level that occurred.
+LOW_RANK = 0
+UNDEFINED_RANK = 1
+HIGH_RANK = 2
+RANKS = (LOW_RANK, HIGH_RANK, UNDEFINED_RANK)
+
+
+def rank_of(word: int, width: int) -> int:
+    """Rank of a net word; a bus is HIGH when any bit is set and UNDEFINED
+    when any bit is unknown."""
+    if width == 1:
+        return RANKS[word]
+    if word >> width:
+        return UNDEFINED_RANK
+    return HIGH_RANK if word else LOW_RANK
+
+
+class Trace:
+    """Transition history of one signal with a min/max pyramid over it.
+
+    ``times[i]``/``ranks[i]`` is the i-th transition. Pyramid level ``k``
+    holds the min and max rank of each aligned block of ``2**k``
+    transitions, so the range of values inside any run of transitions is
+    found in O(log n). Appends are O(1) amortized. ``ranks`` is appended
+    last, so a reader that bounds itself by ``len(ranks)`` never sees a
+    transition whose pyramid entries are missing.
+    """
+
+    def __init__(self, name: str, time: int, value: int, width: int = 1):
+        self.name = name
+        self.width = width
+        self.times = array("q", [time])
+        self.ranks = array("b", [rank_of(value, width)])
+        self.mins: List[array] = [self.ranks]
+        self.maxs: List[array] = [self.ranks]
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def append(self, time: int, value: int):
+        rank = rank_of(value, self.width)
+        ranks = self.ranks
+        i = len(ranks)
+        if rank == ranks[i - 1]:
+            return
+        self.times.append(time)
+        lo = hi = rank
+        k = 1
+        while i & 1:
+            i >>= 1
+            lo = min(lo, self.mins[k - 1][2 * i])
+            hi = max(hi, self.maxs[k - 1][2 * i])
+            if k == len(self.mins):
+                self.mins.append(array("b"))
+                self.maxs.append(array("b"))
+            self.mins[k].append(lo)
+            self.maxs[k].append(hi)
+            k += 1
+        ranks.append(rank)
+
+    def index_at(self, time: float, count: int = None) -> int:
+        """Index of the last transition at or before ``time`` (-1 if none)."""
+        if count is None:
+            count = len(self.ranks)
+        return bisect_right(self.times, time, 0, count) - 1
+
+    def range(self, a: int, b: int):
+        """``(min, max)`` rank over transitions ``a`` to ``b - 1``."""
+        lo, hi = HIGH_RANK, LOW_RANK
+        k = 0
+        while a < b:
+            if a & 1:
+                lo = min(lo, self.mins[k][a])
+                hi = max(hi, self.maxs[k][a])
+                a += 1
+            if b & 1:
+                b -= 1
+                lo = min(lo, self.mins[k][b])
+                hi = max(hi, self.maxs[k][b])
+            a >>= 1
+            b >>= 1
+            k += 1
+        return lo, hi
+
+    def columns(self, start: float, per_pixel: float, width: int):
+        """Yield ``(first_px, last_px, lo, hi)`` runs covering ``width`` pixels.
+
+        ``lo == hi`` means the value was constant over the run; otherwise
+        every pixel of the run contains transitions spanning ranks ``lo``
+        to ``hi``.
+        Pixels before the first transition are skipped. The cost depends
+        on ``width``, not on the number of transitions.
+        """
+        count = len(self.ranks)
+        i = self.index_at(start, count)
+        run = None
+        for px in range(width):
+            j = self.index_at(start + (px + 1) * per_pixel, count)
+            if j < 0:
+                i = j
+                continue
+            if j == i or (i < 0 and j == 0):
+                lo = hi = self.ranks[j]
+            else:
+                lo, hi = self.range(max(i, 0), j + 1)
+            if run is not None and run[2] == lo and run[3] == hi:
+                run[1] = px
+            else:
+                if run is not None:
+                    yield tuple(run)
+                run = [px, px, lo, hi]
+            i = j
+        if run is not None:
+            yield tuple(run)
+
+
+class TraceStore(ChangeRecorder):
+    """In-memory signal histories for the waveform viewer, built while the
+    simulation runs."""
+
+    def __init__(self, capacity: int = 1 << 16):
+        super().__init__(capacity)
+        self.traces: List[Trace] = []
+        self.start_time = 0
+        self.end_time = 0
+        # Bumped after each batch so viewers know when to repaint.
+        self.revision = 0
+
+    def _open(self, names, widths, initial, time):
+        self.traces = [
+            Trace(name, time, value, width) for name, value, width in zip(names, initial, widths)
+        ]
+        self.start_time = self.end_time = time
+
+    def _consume(self, tail, head):
+        traces = self.traces
+        t = self.end_time
+        for t, signal, value in self._changes(tail, head):
+            traces[signal].append(t, value)
+        self.end_time = max(self.end_time, t)
+        self.revision += 1
@@ -22,6 +22,13 @@ class ComponentLibrary(QDockWidget):
         self.list_widget.addItem("NOT")
         self.list_widget.addItem("Input Switch")
         self.list_widget.addItem("Output Bulb")
+        self.list_widget.addItem("Clock")
+        self.list_widget.addItem("D Flip-Flop")
+        self.list_widget.addItem("Bus Splitter")
+        self.list_widget.addItem("Bus Merger")
+        self.list_widget.addItem("Bus AND")
+        self.list_widget.addItem("Bus OR")
+        self.list_widget.addItem("Bus XOR")
 
     def refresh_custom_chips(self):
         self.list_widget.clear()
@@ -1,12 +1,16 @@
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (QDockWidget, QFormLayout, QLabel, QLineEdit,
-                               QWidget)
+                               QSpinBox, QWidget)
 
 from src.graphics.items.base import GateItem
 from src.graphics.items.wire import WireItem
+from src.model.gates import MAX_GATE_INPUTS, MIN_GATE_INPUTS
 
 
 class PropertyInspector(QDockWidget):
+    # (gate item, new input count); the window applies it as an undoable command.
+    input_count_changed = Signal(object, int)
+
     def __init__(self, parent=None):
         super().__init__("Properties", parent)
         self.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
@@ -20,6 +24,11 @@ class PropertyInspector(QDockWidget):
         self.name_edit = QLineEdit()
         self.name_edit.editingFinished.connect(self.on_name_changed)
 
+        self.inputs_spin = QSpinBox()
+        self.inputs_spin.setRange(MIN_GATE_INPUTS, MAX_GATE_INPUTS)
+        self.inputs_spin.setKeyboardTracking(False)
+        self.inputs_spin.valueChanged.connect(self.on_inputs_changed)
+
         self.info_label = QLabel("Select an item")
 
         self._setup_ui()
@@ -27,11 +36,22 @@ class PropertyInspector(QDockWidget):
     def _setup_ui(self):
         self.layout.addRow("Info", self.info_label)
         self.layout.addRow("Name", self.name_edit)
+        self.layout.addRow("Inputs", self.inputs_spin)
         self.name_edit.hide()
+        self._show_inputs(False)
+
+    def _show_inputs(self, visible: bool):
+        self.inputs_spin.setVisible(visible)
+        self.layout.labelForField(self.inputs_spin).setVisible(visible)
 
     def set_item(self, item):
         self.current_item = item
         self.name_edit.blockSignals(True)
+        self.inputs_spin.blockSignals(True)
+        variadic = isinstance(item, GateItem) and hasattr(item.node, "set_inputs")
+        if variadic:
+            self.inputs_spin.setValue(item.node.input_count)
+        self._show_inputs(variadic)
 
         if isinstance(item, GateItem):
             self.info_label.setText(f"Type: {item.node.__class__.__name__}")
@@ -48,9 +68,15 @@ class PropertyInspector(QDockWidget):
             self.layout.labelForField(self.name_edit).hide()
 
         self.name_edit.blockSignals(False)
+        self.inputs_spin.blockSignals(False)
 
     def on_name_changed(self):
         if self.current_item and isinstance(self.current_item, GateItem):
             new_name = self.name_edit.text()
             self.current_item.node.name = new_name
             self.current_item.label.setPlainText(new_name)
+
+    def on_inputs_changed(self, count: int):
+        item = self.current_item
+        if isinstance(item, GateItem) and count != item.node.input_count:
+            self.input_count_changed.emit(item, count)
@@ -0,0 +1,210 @@
+from PySide6.QtCore import QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import (QCheckBox, QDockWidget, QHBoxLayout,
+                               QPushButton, QScrollBar, QVBoxLayout, QWidget)
+
+from src.constants import (BACKGROUND_COLOR, GRID_COLOR_LIGHT,
+                           OVERLAY_TEXT, SIGNAL_HIGH_COLOR,
+                           SIGNAL_UNDEFINED_COLOR)
+from src.simulation.trace import UNDEFINED_RANK, TraceStore
+
+ROW_HEIGHT = 22
+NAME_WIDTH = 160
+REFRESH_MS = 33
+
+
+class WaveformView(QWidget):
+    """Paints the signals of a TraceStore.
+
+    Each visible row asks its Trace for per-pixel runs, so a frame costs
+    the same however many transitions were recorded. Wheel zooms around
+    the cursor and dragging pans; panning turns off ``follow``.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = None
+        self.start = 0.0
+        self.per_pixel = 1.0
+        self.follow = True
+        self.first_row = 0
+        self._drag_x = None
+        self.setMinimumHeight(ROW_HEIGHT * 4)
+
+    def set_store(self, store: TraceStore):
+        self.store = store
+        self.start = float(store.start_time) if store else 0.0
+        self.per_pixel = 1.0
+        self.first_row = 0
+        self.update()
+
+    def plot_width(self) -> int:
+        return max(1, self.width() - NAME_WIDTH)
+
+    def visible_rows(self) -> int:
+        return max(1, self.height() // ROW_HEIGHT)
+
+    def fit(self):
+        if not self.store:
+            return
+        span = max(1, self.store.end_time - self.store.start_time)
+        self.start = float(self.store.start_time)
+        self.per_pixel = span / self.plot_width()
+        self.update()
+
+    def wheelEvent(self, event):
+        factor = 1 / 1.25 if event.angleDelta().y() > 0 else 1.25
+        x = event.position().x() - NAME_WIDTH
+        anchor = self.start + max(0.0, x) * self.per_pixel
+        self.per_pixel = max(1e-3, self.per_pixel * factor)
+        self.start = anchor - max(0.0, x) * self.per_pixel
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_x = event.position().x()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is None:
+            return
+        x = event.position().x()
+        self.start -= (x - self._drag_x) * self.per_pixel
+        self._drag_x = x
+        self.follow = False
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND_COLOR)
+        store = self.store
+        if not store or not store.traces:
+            painter.setPen(OVERLAY_TEXT)
+            painter.drawText(self.rect(), Qt.AlignCenter, "Press Record to capture signals")
+            return
+
+        width = self.plot_width()
+        if self.follow:
+            self.start = store.end_time - width * self.per_pixel
+        traces = store.traces
+        rows = range(self.first_row, min(len(traces), self.first_row + self.visible_rows()))
+        high_pen = QPen(SIGNAL_HIGH_COLOR, 1)
+        undef_pen = QPen(SIGNAL_UNDEFINED_COLOR, 1)
+        busy = QColor(SIGNAL_HIGH_COLOR)
+        busy.setAlpha(120)
+        grid_pen = QPen(GRID_COLOR_LIGHT, 1)
+
+        for r, index in enumerate(rows):
+            trace = traces[index]
+            top = r * ROW_HEIGHT
+            painter.setPen(grid_pen)
+            painter.drawLine(0, top + ROW_HEIGHT - 1, self.width(), top + ROW_HEIGHT - 1)
+            painter.setPen(OVERLAY_TEXT)
+            painter.drawText(
+                QRectF(4, top, NAME_WIDTH - 8, ROW_HEIGHT), Qt.AlignVCenter | Qt.AlignLeft, trace.name
+            )
+
+            y_of = (top + ROW_HEIGHT - 4, top + ROW_HEIGHT // 2, top + 4)
+            for first, last, lo, hi in trace.columns(self.start, self.per_pixel, width):
+                x0 = NAME_WIDTH + first
+                x1 = NAME_WIDTH + last + 1
+                if lo == hi:
+                    painter.setPen(undef_pen if lo == UNDEFINED_RANK else high_pen)
+                    painter.drawLine(x0, y_of[lo], x1, y_of[lo])
+                else:
+                    painter.fillRect(x0, y_of[hi], x1 - x0, y_of[lo] - y_of[hi] + 1, busy)
+
+        painter.setPen(OVERLAY_TEXT)
+        painter.drawText(
+            QRectF(NAME_WIDTH, 0, width - 4, ROW_HEIGHT),
+            Qt.AlignRight | Qt.AlignTop,
+            f"t={int(self.start)}..{int(self.start + width * self.per_pixel)}",
+        )
+        painter.end()
+
+
+class WaveformDock(QDockWidget):
+    def __init__(self, parent=None):
+        super().__init__("Waveforms", parent)
+        self.setAllowedAreas(Qt.BottomDockWidgetArea | Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
+        self.engine = None
+        self.store = None
+        self._seen_revision = -1
+
+        self.container = QWidget()
+        layout = QVBoxLayout(self.container)
+        layout.setContentsMargins(2, 2, 2, 2)
+
+        controls = QHBoxLayout()
+        self.record_button = QPushButton("Record")
+        self.record_button.setCheckable(True)
+        self.record_button.toggled.connect(self.set_recording)
+        self.follow_check = QCheckBox("Follow")
+        self.follow_check.setChecked(True)
+        self.follow_check.toggled.connect(self._set_follow)
+        self.fit_button = QPushButton("Fit")
+        self.fit_button.clicked.connect(self._fit)
+        controls.addWidget(self.record_button)
+        controls.addWidget(self.follow_check)
+        controls.addWidget(self.fit_button)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        body = QHBoxLayout()
+        self.view = WaveformView()
+        self.scroll = QScrollBar(Qt.Vertical)
+        self.scroll.valueChanged.connect(self._scroll_rows)
+        body.addWidget(self.view, 1)
+        body.addWidget(self.scroll)
+        layout.addLayout(body, 1)
+        self.setWidget(self.container)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._refresh)
+
+    def set_engine(self, engine):
+        """Follow a new simulation engine; any running recording stops."""
+        self.record_button.setChecked(False)
+        self.engine = engine
+
+    def set_recording(self, on: bool):
+        if on and self.engine is not None and self.store is None:
+            self.store = TraceStore()
+            self.engine.add_recorder(self.store)
+            # begin() runs on the simulation thread; traces appear on refresh.
+            self.view.set_store(self.store)
+            self.view.follow = self.follow_check.isChecked()
+            self.timer.start(REFRESH_MS)
+        elif not on and self.store is not None:
+            if self.engine is not None:
+                self.engine.remove_recorder(self.store)
+            self.store = None
+            self.timer.stop()
+            self.view.update()
+
+    def _set_follow(self, on: bool):
+        self.view.follow = on
+        self.view.update()
+
+    def _fit(self):
+        self.follow_check.setChecked(False)
+        self.view.fit()
+
+    def _scroll_rows(self, value: int):
+        self.view.first_row = value
+        self.view.update()
+
+    def _refresh(self):
+        store = self.view.store
+        if not store or not self.isVisible():
+            return
+        rows = max(0, len(store.traces) - self.view.visible_rows())
+        if self.scroll.maximum() != rows:
+            self.scroll.setMaximum(rows)
+        if store.revision != self._seen_revision:
+            self._seen_revision = store.revision
+            if self.view.follow != self.follow_check.isChecked():
+                self.follow_check.setChecked(self.view.follow)
+            self.view.update()